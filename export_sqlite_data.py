@@ -1,36 +1,42 @@
 #!/usr/bin/env python3
 """
-Export all data from SQLite database to JSON files for migration to PostgreSQL
+Export all data from SQLite database to NDJSON files for migration to PostgreSQL
+Rows are streamed with fetchmany, so memory use stays flat regardless of table size
 """
+import argparse
+import os
 import sqlite3
 import json
 from datetime import datetime
 
+from ndjson_backup import open_backup, write_schema, write_row
+
 DB_PATH = '/home/minnal/source/LegendLift/legendlift-backend/legendlift.db'
 BACKUP_DIR = '/home/minnal/source/LegendLift/backups/2025-11-19-sqlite-backup'
+CHUNK_SIZE = 1000
 
-def dict_factory(cursor, row):
-    """Convert row to dictionary"""
-    d = {}
-    for idx, col in enumerate(cursor.description):
-        d[col[0]] = row[idx]
-    return d
+def export_table(conn, table_name, backup_dir=BACKUP_DIR, compress=False, chunk_size=CHUNK_SIZE):
+    """Stream a table to an NDJSON file (schema header line, then one row per line)"""
+    columns = [(row[1], row[2]) for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+    column_names = [name for name, _ in columns]
 
-def export_table(conn, table_name):
-    """Export a table to JSON"""
-    conn.row_factory = dict_factory
     cursor = conn.cursor()
-
-    cursor.execute(f"SELECT * FROM {table_name}")
-    rows = cursor.fetchall()
-
-    # Save to JSON file
-    output_file = f"{BACKUP_DIR}/{table_name}.json"
-    with open(output_file, 'w') as f:
-        json.dump(rows, f, indent=2, default=str)
-
-    print(f"✅ Exported {table_name}: {len(rows)} records")
-    return len(rows)
+    cursor.execute(f'SELECT * FROM "{table_name}"')
+
+    output_file = os.path.join(backup_dir, f"{table_name}.ndjson" + (".gz" if compress else ""))
+    count = 0
+    with open_backup(output_file, "wt") as f:
+        write_schema(f, table_name, columns, exported_at=datetime.now().isoformat())
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                write_row(f, dict(zip(column_names, row)))
+            count += len(rows)
+
+    print(f"✅ Exported {table_name}: {count} records")
+    return count
 
 def get_all_tables(conn):
     """Get list of all tables"""
@@ -39,15 +45,24 @@ def get_all_tables(conn):
     return [row[0] for row in cursor.fetchall()]
 
 def main():
+    parser = argparse.ArgumentParser(description="Export the SQLite database to NDJSON backup files")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database")
+    parser.add_argument("--out", default=BACKUP_DIR, help="Backup directory")
+    parser.add_argument("--gzip", action="store_true", help="Write .ndjson.gz files")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per round trip")
+    args = parser.parse_args()
+
     print("=" * 80)
-    print("EXPORTING SQLITE DATABASE TO JSON")
+    print("EXPORTING SQLITE DATABASE TO NDJSON")
     print("=" * 80)
-    print(f"Database: {DB_PATH}")
-    print(f"Backup Dir: {BACKUP_DIR}")
+    print(f"Database: {args.db}")
+    print(f"Backup Dir: {args.out}")
     print("")
 
+    os.makedirs(args.out, exist_ok=True)
+
     # Connect to SQLite
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(args.db)
 
     # Get all tables
     tables = get_all_tables(conn)
@@ -60,7 +75,7 @@ def main():
 
     for table in tables:
         try:
-            count = export_table(conn, table)
+            count = export_table(conn, table, args.out, args.gzip, args.chunk_size)
             export_summary[table] = count
             total_records += count
         except Exception as e:
@@ -70,13 +85,14 @@ def main():
     # Save export summary
     summary = {
         "export_date": datetime.now().isoformat(),
-        "database": DB_PATH,
+        "database": args.db,
+        "format": "ndjson.gz" if args.gzip else "ndjson",
         "total_tables": len(tables),
         "total_records": total_records,
         "tables": export_summary
     }
 
-    with open(f"{BACKUP_DIR}/export_summary.json", 'w') as f:
+    with open(os.path.join(args.out, "export_summary.json"), 'w') as f:
         json.dump(summary, f, indent=2)
 
     print("")
@@ -91,7 +107,7 @@ def main():
         print(f"  {table}: {count}")
     print("")
     print("✅ Export completed successfully!")
-    print(f"📁 Backup location: {BACKUP_DIR}")
+    print(f"📁 Backup location: {args.out}")
 
     conn.close()
 
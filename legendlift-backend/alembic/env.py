@@ -0,0 +1,81 @@
+"""
+Alembic environment
+Uses DATABASE_URL from the app settings and the models' metadata, so
+`alembic revision --autogenerate` diffs the database against app/models
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import settings
+from app.db.session import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # Monthly technician_locations partitions are created at runtime, not by migrations
+    if type_ == "table" and reflected and compare_to is None and name.startswith("technician_locations_"):
+        return False
+    # GIN indexes on the JSONB columns only exist on PostgreSQL
+    if type_ == "index" and not reflected and context.get_context().dialect.name != "postgresql":
+        if obj.dialect_options["postgresql"].get("using") == "gin":
+            return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout (alembic upgrade head --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Run the migrations against the configured database, or against the
+    connection passed in config.attributes["connection"] by tools that
+    migrate another database (e.g. migrate_to_postgresql_copy.py)
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        _run_migrations(connection)
+
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things in place; batch mode copies the table
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
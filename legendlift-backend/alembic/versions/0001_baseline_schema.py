@@ -0,0 +1,479 @@
+"""baseline schema
+
+Schema as it was when the app still created tables with create_all at startup
+(including the columns and tables added by migrate_database.py,
+migrate_add_reports.py, migrate_service_technicians.py,
+migrate_callback_enhancements.py and migrate_add_job_ids_and_images.py).
+An existing database at that state is adopted with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 19:33:15.808167
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUM_TYPES = [
+    'amcstatus',
+    'userrole',
+    'contracttype',
+    'servicefrequency',
+    'callbackstatus',
+    'liftstatus',
+    'complaintpriority',
+    'complaintstatus',
+    'escalationpriority',
+    'escalationstatus',
+    'minorpointstatus',
+    'repairstatus',
+    'paymentstatus',
+    'servicestatus',
+    'servicetype',
+]
+
+
+def upgrade() -> None:
+    op.create_table('customers',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('job_number', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('site_name', sa.String(), nullable=True),
+    sa.Column('area', sa.String(), nullable=False),
+    sa.Column('address', sa.String(), nullable=False),
+    sa.Column('contact_person', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=False),
+    sa.Column('contact_number', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('route', sa.Integer(), nullable=False),
+    sa.Column('amc_valid_from', sa.Date(), nullable=True),
+    sa.Column('amc_valid_to', sa.Date(), nullable=True),
+    sa.Column('services_per_year', sa.Integer(), nullable=True),
+    sa.Column('amc_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('amc_amount_received', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('amc_status', sa.Enum('ACTIVE', 'INACTIVE', name='amcstatus'), nullable=True),
+    sa.Column('aiims_status', sa.Boolean(), nullable=False),
+    sa.Column('amc_type', sa.String(), nullable=True),
+    sa.Column('door_type', sa.String(), nullable=True),
+    sa.Column('controller_type', sa.String(), nullable=True),
+    sa.Column('number_of_floors', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_customers_amc_status'), 'customers', ['amc_status'], unique=False)
+    op.create_index(op.f('ix_customers_amc_valid_from'), 'customers', ['amc_valid_from'], unique=False)
+    op.create_index(op.f('ix_customers_amc_valid_to'), 'customers', ['amc_valid_to'], unique=False)
+    op.create_index(op.f('ix_customers_area'), 'customers', ['area'], unique=False)
+    op.create_index(op.f('ix_customers_id'), 'customers', ['id'], unique=False)
+    op.create_index(op.f('ix_customers_job_number'), 'customers', ['job_number'], unique=True)
+    op.create_index(op.f('ix_customers_name'), 'customers', ['name'], unique=False)
+    op.create_index(op.f('ix_customers_route'), 'customers', ['route'], unique=False)
+    op.create_table('sequential_counters',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=False),
+    sa.Column('date_key', sa.String(), nullable=False),
+    sa.Column('last_number', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sequential_counters_date_key'), 'sequential_counters', ['date_key'], unique=False)
+    op.create_index(op.f('ix_sequential_counters_entity_type'), 'sequential_counters', ['entity_type'], unique=False)
+    op.create_index(op.f('ix_sequential_counters_id'), 'sequential_counters', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('ADMIN', 'TECHNICIAN', 'CUSTOMER', name='userrole'), nullable=False),
+    sa.Column('profile_image', sa.String(), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('amc_contracts',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('contract_type', sa.Enum('ACTIVE', 'WARRANTY', 'RENEWAL', 'CLOSED', name='contracttype'), nullable=False),
+    sa.Column('start_date', sa.DateTime(), nullable=False),
+    sa.Column('end_date', sa.DateTime(), nullable=False),
+    sa.Column('service_frequency', sa.Enum('MONTHLY', 'BI_MONTHLY', 'QUARTERLY', 'HALF_YEARLY', 'YEARLY', name='servicefrequency'), nullable=False),
+    sa.Column('total_services', sa.Integer(), nullable=False),
+    sa.Column('completed_services', sa.Integer(), nullable=True),
+    sa.Column('pending_services', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('terms', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_amc_contracts_contract_type'), 'amc_contracts', ['contract_type'], unique=False)
+    op.create_index(op.f('ix_amc_contracts_customer_id'), 'amc_contracts', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_amc_contracts_id'), 'amc_contracts', ['id'], unique=False)
+    op.create_table('callbacks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('job_id', sa.String(), nullable=True),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('created_by_admin_id', sa.String(), nullable=False),
+    sa.Column('scheduled_date', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PICKED', 'ON_THE_WAY', 'AT_SITE', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='callbackstatus'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('technicians', sa.JSON(), nullable=True),
+    sa.Column('responded_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('issue_faced', sa.Text(), nullable=True),
+    sa.Column('customer_reporting_person', sa.String(), nullable=True),
+    sa.Column('problem_solved', sa.Text(), nullable=True),
+    sa.Column('report_attachment_url', sa.String(), nullable=True),
+    sa.Column('completion_images', sa.JSON(), nullable=True),
+    sa.Column('materials_changed', sa.JSON(), nullable=True),
+    sa.Column('lift_status_on_closure', sa.Enum('SHUT_DOWN', 'NORMAL_RUNNING', 'RUNNING_WITH_ERROR', name='liftstatus'), nullable=True),
+    sa.Column('requires_followup', sa.String(), nullable=True),
+    sa.Column('picked_at', sa.DateTime(), nullable=True),
+    sa.Column('on_the_way_at', sa.DateTime(), nullable=True),
+    sa.Column('at_site_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_admin_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_callbacks_customer_id'), 'callbacks', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_callbacks_id'), 'callbacks', ['id'], unique=False)
+    op.create_index(op.f('ix_callbacks_job_id'), 'callbacks', ['job_id'], unique=True)
+    op.create_index(op.f('ix_callbacks_scheduled_date'), 'callbacks', ['scheduled_date'], unique=False)
+    op.create_index(op.f('ix_callbacks_status'), 'callbacks', ['status'], unique=False)
+    op.create_table('complaints',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('complaint_id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('issue_type', sa.String(), nullable=False),
+    sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'URGENT', name='complaintpriority'), nullable=True),
+    sa.Column('status', sa.Enum('OPEN', 'IN_PROGRESS', 'RESOLVED', 'CLOSED', name='complaintstatus'), nullable=True),
+    sa.Column('assigned_to_id', sa.String(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('resolution_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_complaints_complaint_id'), 'complaints', ['complaint_id'], unique=True)
+    op.create_index(op.f('ix_complaints_id'), 'complaints', ['id'], unique=False)
+    op.create_table('escalations',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('issue_type', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='escalationpriority'), nullable=False),
+    sa.Column('status', sa.Enum('OPEN', 'IN_PROGRESS', 'RESOLVED', 'CLOSED', name='escalationstatus'), nullable=False),
+    sa.Column('raised_by', sa.String(), nullable=False),
+    sa.Column('raised_date', sa.DateTime(), nullable=False),
+    sa.Column('assigned_to_id', sa.String(), nullable=True),
+    sa.Column('resolved_date', sa.DateTime(), nullable=True),
+    sa.Column('resolution', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_escalations_assigned_to_id'), 'escalations', ['assigned_to_id'], unique=False)
+    op.create_index(op.f('ix_escalations_customer_id'), 'escalations', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_escalations_id'), 'escalations', ['id'], unique=False)
+    op.create_index(op.f('ix_escalations_priority'), 'escalations', ['priority'], unique=False)
+    op.create_index(op.f('ix_escalations_status'), 'escalations', ['status'], unique=False)
+    op.create_table('minor_points',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('technician_id', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('OPEN', 'CLOSED', name='minorpointstatus'), nullable=False),
+    sa.Column('reported_date', sa.DateTime(), nullable=False),
+    sa.Column('closed_date', sa.DateTime(), nullable=True),
+    sa.Column('closure_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_minor_points_customer_id'), 'minor_points', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_minor_points_id'), 'minor_points', ['id'], unique=False)
+    op.create_index(op.f('ix_minor_points_status'), 'minor_points', ['status'], unique=False)
+    op.create_index(op.f('ix_minor_points_technician_id'), 'minor_points', ['technician_id'], unique=False)
+    op.create_table('repairs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=True),
+    sa.Column('created_by_admin_id', sa.String(), nullable=False),
+    sa.Column('customer_name', sa.String(), nullable=True),
+    sa.Column('contact_number', sa.String(), nullable=True),
+    sa.Column('scheduled_date', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='repairstatus'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('technicians', sa.JSON(), nullable=True),
+    sa.Column('repair_type', sa.String(), nullable=True),
+    sa.Column('work_done', sa.Text(), nullable=True),
+    sa.Column('materials_used', sa.JSON(), nullable=True),
+    sa.Column('before_images', sa.JSON(), nullable=True),
+    sa.Column('after_images', sa.JSON(), nullable=True),
+    sa.Column('customer_approved', sa.String(), nullable=True),
+    sa.Column('materials_cost', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('labor_cost', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('total_cost', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('charged_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('payment_status', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_admin_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_repairs_customer_id'), 'repairs', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_repairs_id'), 'repairs', ['id'], unique=False)
+    op.create_index(op.f('ix_repairs_scheduled_date'), 'repairs', ['scheduled_date'], unique=False)
+    op.create_index(op.f('ix_repairs_status'), 'repairs', ['status'], unique=False)
+    op.create_table('payments',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('contract_id', sa.String(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('due_date', sa.DateTime(), nullable=False),
+    sa.Column('paid_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'PAID', 'OVERDUE', 'PARTIAL', name='paymentstatus'), nullable=False),
+    sa.Column('payment_method', sa.String(), nullable=True),
+    sa.Column('transaction_id', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('follow_up_date', sa.DateTime(), nullable=True),
+    sa.Column('follow_up_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['contract_id'], ['amc_contracts.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payments_contract_id'), 'payments', ['contract_id'], unique=False)
+    op.create_index(op.f('ix_payments_customer_id'), 'payments', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_payments_due_date'), 'payments', ['due_date'], unique=False)
+    op.create_index(op.f('ix_payments_id'), 'payments', ['id'], unique=False)
+    op.create_index(op.f('ix_payments_status'), 'payments', ['status'], unique=False)
+    op.create_table('service_schedules',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('service_id', sa.String(), nullable=False),
+    sa.Column('contract_id', sa.String(), nullable=True),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('scheduled_date', sa.DateTime(), nullable=True),
+    sa.Column('actual_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'SCHEDULED', 'IN_PROGRESS', 'COMPLETED', 'OVERDUE', name='servicestatus'), nullable=False),
+    sa.Column('technician_id', sa.String(), nullable=True),
+    sa.Column('technician2_id', sa.String(), nullable=True),
+    sa.Column('technician3_id', sa.String(), nullable=True),
+    sa.Column('days_overdue', sa.Integer(), nullable=True),
+    sa.Column('overdue_days', sa.Integer(), nullable=True),
+    sa.Column('is_high_priority', sa.Boolean(), nullable=False),
+    sa.Column('is_adhoc', sa.String(), nullable=True),
+    sa.Column('service_type', sa.Enum('SERVICE', 'CALLBACK', 'REPAIR', name='servicetype'), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['contract_id'], ['amc_contracts.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['technician2_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['technician3_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_service_schedules_contract_id'), 'service_schedules', ['contract_id'], unique=False)
+    op.create_index(op.f('ix_service_schedules_customer_id'), 'service_schedules', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_service_schedules_id'), 'service_schedules', ['id'], unique=False)
+    op.create_index(op.f('ix_service_schedules_is_high_priority'), 'service_schedules', ['is_high_priority'], unique=False)
+    op.create_index(op.f('ix_service_schedules_scheduled_date'), 'service_schedules', ['scheduled_date'], unique=False)
+    op.create_index(op.f('ix_service_schedules_service_id'), 'service_schedules', ['service_id'], unique=True)
+    op.create_index(op.f('ix_service_schedules_service_type'), 'service_schedules', ['service_type'], unique=False)
+    op.create_index(op.f('ix_service_schedules_status'), 'service_schedules', ['status'], unique=False)
+    op.create_index(op.f('ix_service_schedules_technician_id'), 'service_schedules', ['technician_id'], unique=False)
+    op.create_table('material_usage',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('service_id', sa.String(), nullable=True),
+    sa.Column('callback_id', sa.String(), nullable=True),
+    sa.Column('repair_id', sa.String(), nullable=True),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('technician_id', sa.String(), nullable=True),
+    sa.Column('material_name', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.Column('unit_cost', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('total_cost', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('used_date', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['callback_id'], ['callbacks.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['repair_id'], ['repairs.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['service_schedules.id'], ),
+    sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_material_usage_callback_id'), 'material_usage', ['callback_id'], unique=False)
+    op.create_index(op.f('ix_material_usage_customer_id'), 'material_usage', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_material_usage_id'), 'material_usage', ['id'], unique=False)
+    op.create_index(op.f('ix_material_usage_material_name'), 'material_usage', ['material_name'], unique=False)
+    op.create_index(op.f('ix_material_usage_repair_id'), 'material_usage', ['repair_id'], unique=False)
+    op.create_index(op.f('ix_material_usage_service_id'), 'material_usage', ['service_id'], unique=False)
+    op.create_index(op.f('ix_material_usage_technician_id'), 'material_usage', ['technician_id'], unique=False)
+    op.create_index(op.f('ix_material_usage_used_date'), 'material_usage', ['used_date'], unique=False)
+    op.create_table('service_reports',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('report_id', sa.String(), nullable=False),
+    sa.Column('service_id', sa.String(), nullable=False),
+    sa.Column('technician_id', sa.String(), nullable=False),
+    sa.Column('check_in_time', sa.DateTime(), nullable=False),
+    sa.Column('check_out_time', sa.DateTime(), nullable=True),
+    sa.Column('check_in_location', sa.JSON(), nullable=True),
+    sa.Column('check_out_location', sa.JSON(), nullable=True),
+    sa.Column('work_done', sa.Text(), nullable=False),
+    sa.Column('parts_replaced', sa.JSON(), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('customer_signature', sa.String(), nullable=True),
+    sa.Column('technician_signature', sa.String(), nullable=True),
+    sa.Column('customer_feedback', sa.Text(), nullable=True),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('completion_time', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['service_id'], ['service_schedules.id'], ),
+    sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_service_reports_id'), 'service_reports', ['id'], unique=False)
+    op.create_index(op.f('ix_service_reports_report_id'), 'service_reports', ['report_id'], unique=True)
+    op.create_index(op.f('ix_service_reports_service_id'), 'service_reports', ['service_id'], unique=False)
+    op.create_index(op.f('ix_service_reports_technician_id'), 'service_reports', ['technician_id'], unique=False)
+    op.create_table('service_technicians',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('service_id', sa.String(), nullable=False),
+    sa.Column('technician_id', sa.String(), nullable=False),
+    sa.Column('assigned_at', sa.DateTime(), nullable=False),
+    sa.Column('assigned_by', sa.String(), nullable=True),
+    sa.Column('is_primary', sa.Boolean(), nullable=True),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['service_schedules.id'], ),
+    sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_service_technicians_id'), 'service_technicians', ['id'], unique=False)
+    op.create_index(op.f('ix_service_technicians_service_id'), 'service_technicians', ['service_id'], unique=False)
+    op.create_index(op.f('ix_service_technicians_technician_id'), 'service_technicians', ['technician_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_service_technicians_technician_id'), table_name='service_technicians')
+    op.drop_index(op.f('ix_service_technicians_service_id'), table_name='service_technicians')
+    op.drop_index(op.f('ix_service_technicians_id'), table_name='service_technicians')
+    op.drop_table('service_technicians')
+    op.drop_index(op.f('ix_service_reports_technician_id'), table_name='service_reports')
+    op.drop_index(op.f('ix_service_reports_service_id'), table_name='service_reports')
+    op.drop_index(op.f('ix_service_reports_report_id'), table_name='service_reports')
+    op.drop_index(op.f('ix_service_reports_id'), table_name='service_reports')
+    op.drop_table('service_reports')
+    op.drop_index(op.f('ix_material_usage_used_date'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_technician_id'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_service_id'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_repair_id'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_material_name'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_id'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_customer_id'), table_name='material_usage')
+    op.drop_index(op.f('ix_material_usage_callback_id'), table_name='material_usage')
+    op.drop_table('material_usage')
+    op.drop_index(op.f('ix_service_schedules_technician_id'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_status'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_service_type'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_service_id'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_scheduled_date'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_is_high_priority'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_id'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_customer_id'), table_name='service_schedules')
+    op.drop_index(op.f('ix_service_schedules_contract_id'), table_name='service_schedules')
+    op.drop_table('service_schedules')
+    op.drop_index(op.f('ix_payments_status'), table_name='payments')
+    op.drop_index(op.f('ix_payments_id'), table_name='payments')
+    op.drop_index(op.f('ix_payments_due_date'), table_name='payments')
+    op.drop_index(op.f('ix_payments_customer_id'), table_name='payments')
+    op.drop_index(op.f('ix_payments_contract_id'), table_name='payments')
+    op.drop_table('payments')
+    op.drop_index(op.f('ix_repairs_status'), table_name='repairs')
+    op.drop_index(op.f('ix_repairs_scheduled_date'), table_name='repairs')
+    op.drop_index(op.f('ix_repairs_id'), table_name='repairs')
+    op.drop_index(op.f('ix_repairs_customer_id'), table_name='repairs')
+    op.drop_table('repairs')
+    op.drop_index(op.f('ix_minor_points_technician_id'), table_name='minor_points')
+    op.drop_index(op.f('ix_minor_points_status'), table_name='minor_points')
+    op.drop_index(op.f('ix_minor_points_id'), table_name='minor_points')
+    op.drop_index(op.f('ix_minor_points_customer_id'), table_name='minor_points')
+    op.drop_table('minor_points')
+    op.drop_index(op.f('ix_escalations_status'), table_name='escalations')
+    op.drop_index(op.f('ix_escalations_priority'), table_name='escalations')
+    op.drop_index(op.f('ix_escalations_id'), table_name='escalations')
+    op.drop_index(op.f('ix_escalations_customer_id'), table_name='escalations')
+    op.drop_index(op.f('ix_escalations_assigned_to_id'), table_name='escalations')
+    op.drop_table('escalations')
+    op.drop_index(op.f('ix_complaints_id'), table_name='complaints')
+    op.drop_index(op.f('ix_complaints_complaint_id'), table_name='complaints')
+    op.drop_table('complaints')
+    op.drop_index(op.f('ix_callbacks_status'), table_name='callbacks')
+    op.drop_index(op.f('ix_callbacks_scheduled_date'), table_name='callbacks')
+    op.drop_index(op.f('ix_callbacks_job_id'), table_name='callbacks')
+    op.drop_index(op.f('ix_callbacks_id'), table_name='callbacks')
+    op.drop_index(op.f('ix_callbacks_customer_id'), table_name='callbacks')
+    op.drop_table('callbacks')
+    op.drop_index(op.f('ix_amc_contracts_id'), table_name='amc_contracts')
+    op.drop_index(op.f('ix_amc_contracts_customer_id'), table_name='amc_contracts')
+    op.drop_index(op.f('ix_amc_contracts_contract_type'), table_name='amc_contracts')
+    op.drop_table('amc_contracts')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_sequential_counters_id'), table_name='sequential_counters')
+    op.drop_index(op.f('ix_sequential_counters_entity_type'), table_name='sequential_counters')
+    op.drop_index(op.f('ix_sequential_counters_date_key'), table_name='sequential_counters')
+    op.drop_table('sequential_counters')
+    op.drop_index(op.f('ix_customers_route'), table_name='customers')
+    op.drop_index(op.f('ix_customers_name'), table_name='customers')
+    op.drop_index(op.f('ix_customers_job_number'), table_name='customers')
+    op.drop_index(op.f('ix_customers_id'), table_name='customers')
+    op.drop_index(op.f('ix_customers_area'), table_name='customers')
+    op.drop_index(op.f('ix_customers_amc_valid_to'), table_name='customers')
+    op.drop_index(op.f('ix_customers_amc_valid_from'), table_name='customers')
+    op.drop_index(op.f('ix_customers_amc_status'), table_name='customers')
+    op.drop_table('customers')
+
+    # PostgreSQL keeps enum types after their tables are dropped
+    for enum_name in ENUM_TYPES:
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
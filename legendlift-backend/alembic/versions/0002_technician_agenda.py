@@ -0,0 +1,127 @@
+"""technician agenda
+
+Per-day agenda index behind the technician "today" board, backfilled from
+the assignments of open services (replaces migrate_technician_agenda.py)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 19:33:25.707423
+"""
+import uuid
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.migrations import has_table, is_offline
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SERVICE_STATUSES = ('PENDING', 'SCHEDULED', 'IN_PROGRESS', 'COMPLETED', 'OVERDUE')
+OPEN_SERVICE_STATUSES = ('PENDING', 'SCHEDULED', 'IN_PROGRESS')
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    if has_table('technician_agenda'):
+        # Created by create_all or the old migration script
+        return
+
+    op.create_table('technician_agenda',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('technician_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('service_id', sa.String(), nullable=False),
+    # servicestatus already exists on PostgreSQL (baseline)
+    sa.Column('status', postgresql.ENUM(*SERVICE_STATUSES, name='servicestatus', create_type=False), nullable=False),
+    sa.Column('is_primary', sa.Boolean(), nullable=True),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['service_id'], ['service_schedules.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('technician_id', 'service_id', name='uq_technician_agenda_technician_service')
+    )
+    op.create_index(op.f('ix_technician_agenda_id'), 'technician_agenda', ['id'], unique=False)
+    op.create_index(op.f('ix_technician_agenda_service_id'), 'technician_agenda', ['service_id'], unique=False)
+    op.create_index('ix_technician_agenda_technician_day', 'technician_agenda', ['technician_id', 'day'], unique=False)
+
+    if not is_offline():
+        _backfill_agenda()
+
+
+def _backfill_agenda() -> None:
+    """One agenda row per technician assignment of every open service"""
+    services = sa.table(
+        'service_schedules',
+        sa.column('id', sa.String),
+        sa.column('status', sa.String),
+        sa.column('scheduled_date', sa.DateTime),
+        sa.column('actual_date', sa.DateTime),
+    )
+    assignments = sa.table(
+        'service_technicians',
+        sa.column('service_id', sa.String),
+        sa.column('technician_id', sa.String),
+        sa.column('is_primary', sa.Boolean),
+        sa.column('order', sa.Integer),
+    )
+    agenda = sa.table(
+        'technician_agenda',
+        sa.column('id', sa.String),
+        sa.column('technician_id', sa.String),
+        sa.column('day', sa.Date),
+        sa.column('service_id', sa.String),
+        sa.column('status', sa.String),
+        sa.column('is_primary', sa.Boolean),
+        sa.column('order', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+        sa.column('updated_at', sa.DateTime),
+    )
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            assignments.c.technician_id, assignments.c.is_primary, assignments.c.order,
+            services.c.id, services.c.status, services.c.scheduled_date, services.c.actual_date,
+        )
+        .join(services, services.c.id == assignments.c.service_id)
+        .where(services.c.status.in_(OPEN_SERVICE_STATUSES))
+    )
+
+    now = datetime.utcnow()
+    batch = []
+    for row in rows:
+        # Same rule as app.utils.agenda.get_agenda_day
+        day = (row.scheduled_date or row.actual_date or now).date()
+        batch.append({
+            'id': str(uuid.uuid4()),
+            'technician_id': row.technician_id,
+            'day': day,
+            'service_id': row.id,
+            'status': row.status,
+            'is_primary': row.is_primary,
+            'order': row.order,
+            'created_at': now,
+            'updated_at': now,
+        })
+        if len(batch) >= BATCH_SIZE:
+            bind.execute(agenda.insert(), batch)
+            batch = []
+    if batch:
+        bind.execute(agenda.insert(), batch)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_technician_agenda_technician_day', table_name='technician_agenda')
+    op.drop_index(op.f('ix_technician_agenda_service_id'), table_name='technician_agenda')
+    op.drop_index(op.f('ix_technician_agenda_id'), table_name='technician_agenda')
+    op.drop_table('technician_agenda')
@@ -0,0 +1,32 @@
+"""available tickets indexes
+
+Composite indexes used by the available-tickets feed
+- service_technicians (service_id, technician_id): NOT EXISTS / COUNT per ticket
+- service_schedules (status, scheduled_date): open tickets in schedule order
+Both tables are large and written all day, so the indexes are built
+concurrently on PostgreSQL (replaces migrate_available_tickets_indexes.py)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 19:33:30.021306
+"""
+from typing import Sequence, Union
+
+from app.db.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently('ix_service_schedules_status_scheduled_date', 'service_schedules', ['status', 'scheduled_date'])
+    create_index_concurrently('ix_service_technicians_service_technician', 'service_technicians', ['service_id', 'technician_id'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_service_technicians_service_technician', 'service_technicians')
+    drop_index_concurrently('ix_service_schedules_status_scheduled_date', 'service_schedules')
@@ -0,0 +1,36 @@
+"""claim versions
+
+Optimistic-locking version counter on the tables technicians can claim
+concurrently (replaces migrate_claim_versions.py)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 19:33:34.230571
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['service_schedules', 'callbacks', 'repairs', 'complaints']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        if not has_column(table, 'version'):
+            op.add_column(table, sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('version')
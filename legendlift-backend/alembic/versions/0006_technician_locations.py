@@ -0,0 +1,66 @@
+"""technician locations
+
+Append-only GPS history for technicians travelling to callbacks.
+On PostgreSQL the table is range-partitioned by month; partitions for the
+current and next month are created here, later ones by the location flusher
+(replaces migrate_technician_locations.py)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 19:33:41.919952
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not has_table('technician_locations'):
+        op.create_table('technician_locations',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(), nullable=False),
+        sa.Column('technician_id', sa.String(), nullable=False),
+        sa.Column('callback_id', sa.String(), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('accuracy', sa.Float(), nullable=True),
+        sa.Column('speed', sa.Float(), nullable=True),
+        sa.Column('heading', sa.Float(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['callback_id'], ['callbacks.id'], ),
+        sa.ForeignKeyConstraint(['technician_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id', 'recorded_at'),
+        postgresql_partition_by='RANGE (recorded_at)'
+        )
+        # Indexes on a partitioned parent cascade to every partition
+        op.create_index('ix_technician_locations_callback_recorded', 'technician_locations', ['callback_id', 'recorded_at'], unique=False)
+        op.create_index('ix_technician_locations_technician_recorded', 'technician_locations', ['technician_id', 'recorded_at'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        today = date.today()
+        months = [(today.year, today.month), (today.year + today.month // 12, today.month % 12 + 1)]
+        for year, month in months:
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+            op.execute(
+                f"CREATE TABLE IF NOT EXISTS technician_locations_{year}_{month:02d} "
+                f"PARTITION OF technician_locations FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+
+
+def downgrade() -> None:
+    # Dropping the partitioned parent drops its partitions too
+    op.drop_index('ix_technician_locations_technician_recorded', table_name='technician_locations')
+    op.drop_index('ix_technician_locations_callback_recorded', table_name='technician_locations')
+    op.drop_table('technician_locations')
@@ -0,0 +1,57 @@
+"""delta sync
+
+- sync_tombstones table for deleted rows
+- (updated_at, id) indexes on customers, service_schedules, callbacks, repairs
+  and complaints, built concurrently on PostgreSQL
+- backfills NULL updated_at so every row is reachable by the sync scan
+(replaces migrate_sync.py)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 19:33:45.006977
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import create_index_concurrently, drop_index_concurrently, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNC_TABLES = ['customers', 'service_schedules', 'callbacks', 'repairs', 'complaints']
+
+
+def upgrade() -> None:
+    if not has_table('sync_tombstones'):
+        op.create_table('sync_tombstones',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.String(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_sync_tombstones_deleted_at_id', 'sync_tombstones', ['deleted_at', 'id'], unique=False)
+
+    for table_name in SYNC_TABLES:
+        table = sa.table(table_name, sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime))
+        op.execute(
+            table.update()
+            .where(table.c.updated_at.is_(None))
+            .values(updated_at=sa.func.coalesce(table.c.created_at, sa.func.current_timestamp()))
+        )
+
+    for table_name in SYNC_TABLES:
+        create_index_concurrently(f'ix_{table_name}_updated_at_id', table_name, ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    for table_name in reversed(SYNC_TABLES):
+        drop_index_concurrently(f'ix_{table_name}_updated_at_id', table_name)
+    op.drop_index('ix_sync_tombstones_deleted_at_id', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,46 @@
+"""hot query indexes
+
+Composite indexes for the filter/sort shapes of the hot router queries
+(list filters, AMC period reports, dashboard windows, technician views).
+All target populated tables, so they are built concurrently on PostgreSQL.
+benchmarks/check_query_plans.py checks that the queries actually use them.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 20:02:11.418230
+"""
+from typing import Sequence, Union
+
+from app.db.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_service_schedules_customer_id_scheduled_date', 'service_schedules', ['customer_id', 'scheduled_date']),
+    ('ix_service_schedules_technician_id_status', 'service_schedules', ['technician_id', 'status']),
+    ('ix_service_schedules_created_at_status', 'service_schedules', ['created_at', 'status']),
+    ('ix_service_reports_service_id_created_at', 'service_reports', ['service_id', 'created_at']),
+    ('ix_service_reports_created_at', 'service_reports', ['created_at']),
+    ('ix_callbacks_customer_id_scheduled_date', 'callbacks', ['customer_id', 'scheduled_date']),
+    ('ix_callbacks_created_at_status', 'callbacks', ['created_at', 'status']),
+    ('ix_repairs_customer_id_created_at', 'repairs', ['customer_id', 'created_at']),
+    ('ix_repairs_created_at_status', 'repairs', ['created_at', 'status']),
+    ('ix_complaints_assigned_to_id_status', 'complaints', ['assigned_to_id', 'status']),
+    ('ix_complaints_customer_id_created_at', 'complaints', ['customer_id', 'created_at']),
+    ('ix_payments_customer_id_due_date', 'payments', ['customer_id', 'due_date']),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns in INDEXES:
+        create_index_concurrently(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in reversed(INDEXES):
+        drop_index_concurrently(index_name, table_name)
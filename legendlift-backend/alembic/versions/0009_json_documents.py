@@ -0,0 +1,138 @@
+"""json documents
+
+The list/dict JSON columns become JSONDocument columns (JSONB on PostgreSQL).
+Older code json.dumps()'d values before assigning them, which stored JSON
+strings inside the JSON columns; those rows are decoded back into arrays and
+objects here. GIN indexes then serve the technician membership and material
+filters (`@>`) on callbacks and repairs.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 21:14:37.502913
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.migrations import create_index_concurrently, drop_index_concurrently, has_table, is_offline
+from app.db.types import decode_json
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = [
+    ('callbacks', ['technicians', 'completion_images', 'materials_changed']),
+    ('repairs', ['technicians', 'materials_used', 'before_images', 'after_images']),
+    ('service_reports', ['check_in_location', 'check_out_location', 'parts_replaced', 'images']),
+]
+
+GIN_INDEXES = [
+    ('ix_callbacks_technicians', 'callbacks', 'technicians'),
+    ('ix_callbacks_materials_changed', 'callbacks', 'materials_changed'),
+    ('ix_repairs_technicians', 'repairs', 'technicians'),
+    ('ix_repairs_materials_used', 'repairs', 'materials_used'),
+]
+
+REPAIR_BATCH_SIZE = 500
+
+
+def _is_postgresql() -> bool:
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _repair_offline(table_name: str, column_name: str) -> None:
+    # Strings nested more than twice are left for an online upgrade to unwrap
+    for _ in range(2):
+        if _is_postgresql():
+            op.execute(
+                f"UPDATE {table_name} SET {column_name} = ({column_name} #>> '{{}}')::json "
+                f"WHERE json_typeof({column_name}) = 'string'"
+            )
+        else:
+            op.execute(
+                f"UPDATE {table_name} SET {column_name} = json_extract({column_name}, '$') "
+                f"WHERE json_type({column_name}) = 'text' AND json_valid(json_extract({column_name}, '$'))"
+            )
+
+
+def _repair(table_name: str, column_name: str) -> int:
+    """Decode the double-encoded values of one column in id-ordered batches"""
+    string_test = (
+        f"json_typeof({column_name}) = 'string'" if _is_postgresql() else f"json_type({column_name}) = 'text'"
+    )
+    select = sa.text(
+        f"SELECT id, CAST({column_name} AS TEXT) AS value FROM {table_name} "
+        f"WHERE id > :last_id AND {string_test} ORDER BY id LIMIT :batch_size"
+    )
+    update = sa.text(f"UPDATE {table_name} SET {column_name} = :value WHERE id = :id").bindparams(
+        sa.bindparam('value', type_=sa.JSON)
+    )
+    bind = op.get_bind()
+    repaired = 0
+    last_id = ''
+    while True:
+        rows = bind.execute(select, {'last_id': last_id, 'batch_size': REPAIR_BATCH_SIZE}).all()
+        if not rows:
+            return repaired
+        fixes = []
+        for row in rows:
+            value = decode_json(row.value)
+            if not isinstance(value, str):
+                fixes.append({'id': row.id, 'value': value})
+        if fixes:
+            bind.execute(update, fixes)
+            repaired += len(fixes)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    for table_name, columns in JSON_COLUMNS:
+        if not is_offline() and not has_table(table_name):
+            continue
+        for column_name in columns:
+            if is_offline():
+                _repair_offline(table_name, column_name)
+            else:
+                repaired = _repair(table_name, column_name)
+                if repaired:
+                    print(f"✅ {table_name}.{column_name}: decoded {repaired} double-encoded rows")
+
+    if not _is_postgresql():
+        return
+
+    for table_name, columns in JSON_COLUMNS:
+        for column_name in columns:
+            op.alter_column(
+                table_name, column_name,
+                type_=postgresql.JSONB(), existing_type=sa.JSON(), existing_nullable=True,
+                postgresql_using=f'{column_name}::jsonb',
+            )
+
+    for index_name, table_name, column_name in GIN_INDEXES:
+        create_index_concurrently(
+            index_name, table_name, [column_name],
+            postgresql_using='gin', postgresql_ops={column_name: 'jsonb_path_ops'},
+        )
+
+
+def downgrade() -> None:
+    # Decoded rows are not re-encoded
+    if not _is_postgresql():
+        return
+
+    for index_name, table_name, _ in reversed(GIN_INDEXES):
+        drop_index_concurrently(index_name, table_name)
+
+    for table_name, columns in reversed(JSON_COLUMNS):
+        for column_name in columns:
+            op.alter_column(
+                table_name, column_name,
+                type_=sa.JSON(), existing_type=postgresql.JSONB(), existing_nullable=True,
+                postgresql_using=f'{column_name}::json',
+            )
@@ -0,0 +1,269 @@
+"""material ledger
+
+Backfills material_usage from the materials JSON of closed jobs
+(callbacks.materials_changed, repairs.materials_used and
+service_reports.parts_replaced), which are now written to the ledger at
+closure, and adds the indexes behind the material/cost report aggregates.
+Jobs that already have ledger rows are left alone. The materials parsing is
+a copy of app.utils.material_ledger as of this revision, so later changes to
+the live module don't change what this backfill writes.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 21:52:08.164530
+"""
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import create_index_concurrently, drop_index_concurrently, is_offline
+from app.db.types import decode_json
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_material_usage_customer_id_used_date', 'material_usage', ['customer_id', 'used_date']),
+    ('ix_material_usage_used_date_material_name', 'material_usage', ['used_date', 'material_name']),
+]
+
+BATCH_SIZE = 1000
+
+material_usage = sa.table(
+    'material_usage',
+    sa.column('id', sa.String),
+    sa.column('service_id', sa.String),
+    sa.column('callback_id', sa.String),
+    sa.column('repair_id', sa.String),
+    sa.column('customer_id', sa.String),
+    sa.column('technician_id', sa.String),
+    sa.column('material_name', sa.String),
+    sa.column('quantity', sa.Integer),
+    sa.column('unit', sa.String),
+    sa.column('unit_cost', sa.Numeric(10, 2)),
+    sa.column('total_cost', sa.Numeric(10, 2)),
+    sa.column('used_date', sa.DateTime),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+callbacks = sa.table(
+    'callbacks',
+    sa.column('id', sa.String),
+    sa.column('customer_id', sa.String),
+    sa.column('status', sa.String),
+    sa.column('technicians', sa.JSON),
+    sa.column('materials_changed', sa.JSON),
+    sa.column('completed_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+repairs = sa.table(
+    'repairs',
+    sa.column('id', sa.String),
+    sa.column('customer_id', sa.String),
+    sa.column('status', sa.String),
+    sa.column('technicians', sa.JSON),
+    sa.column('materials_used', sa.JSON),
+    sa.column('materials_cost', sa.Numeric(10, 2)),
+    sa.column('completed_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+services = sa.table(
+    'service_schedules',
+    sa.column('id', sa.String),
+    sa.column('customer_id', sa.String),
+    sa.column('status', sa.String),
+    sa.column('actual_date', sa.DateTime),
+)
+service_reports = sa.table(
+    'service_reports',
+    sa.column('service_id', sa.String),
+    sa.column('technician_id', sa.String),
+    sa.column('parts_replaced', sa.JSON),
+    sa.column('completion_time', sa.DateTime),
+    sa.column('check_out_time', sa.DateTime),
+)
+
+
+CENT = Decimal('0.01')
+
+
+class LedgerLine(NamedTuple):
+    material_name: str
+    quantity: int
+    unit: Optional[str]
+    unit_cost: Optional[Decimal]
+    total_cost: Optional[Decimal]
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(str(value)).quantize(CENT)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _to_quantity(value) -> int:
+    try:
+        return max(int(round(float(value))), 0)
+    except (TypeError, ValueError):
+        return 1
+
+
+def parse_materials(items) -> List[LedgerLine]:
+    """Ledger lines from part names or {name, quantity, unit, unit_cost or cost} objects"""
+    lines = []
+    for item in items or []:
+        if isinstance(item, str):
+            name, quantity, unit, unit_cost, total_cost = item, 1, None, None, None
+        elif isinstance(item, dict):
+            name = item.get('name') or item.get('material_name')
+            quantity = _to_quantity(item.get('quantity', 1))
+            unit = item.get('unit') or None
+            unit_cost = _to_decimal(item.get('unit_cost'))
+            total_cost = _to_decimal(item.get('total_cost', item.get('cost')))
+            if total_cost is None and unit_cost is not None:
+                total_cost = (unit_cost * quantity).quantize(CENT)
+        else:
+            continue
+
+        name = str(name).strip() if name else ''
+        if not name or quantity <= 0:
+            continue
+        lines.append(LedgerLine(name, quantity, unit, unit_cost, total_cost))
+    return lines
+
+
+def allocate_job_cost(lines: List[LedgerLine], job_cost) -> List[LedgerLine]:
+    """Spread a job-level cost over the unpriced lines by quantity (0 without one)"""
+    job_cost = _to_decimal(job_cost)
+    unpriced = [line for line in lines if line.total_cost is None]
+    if job_cost is None or not unpriced:
+        return [line._replace(total_cost=line.total_cost or Decimal('0.00')) for line in lines]
+
+    known = sum((line.total_cost for line in lines if line.total_cost is not None), Decimal('0.00'))
+    remaining = max(job_cost - known, Decimal('0.00'))
+    quantity = sum(line.quantity for line in unpriced)
+    allocated = []
+    left = remaining
+    for index, line in enumerate(unpriced):
+        if index == len(unpriced) - 1:
+            share = left
+        else:
+            share = (remaining * line.quantity / quantity).quantize(CENT)
+            left -= share
+        allocated.append(line._replace(total_cost=share, unit_cost=(share / line.quantity).quantize(CENT)))
+
+    shares = iter(allocated)
+    return [line if line.total_cost is not None else next(shares) for line in lines]
+
+
+def _first_technician(technicians):
+    technicians = decode_json(technicians)
+    return technicians[0] if isinstance(technicians, list) and technicians else None
+
+
+def _closed_jobs(bind):
+    """(job column, job id, customer, technician, used date, items, job cost) per closed job"""
+    rows = bind.execute(
+        sa.select(callbacks)
+        .where(callbacks.c.status == 'COMPLETED', callbacks.c.customer_id.isnot(None),
+               callbacks.c.materials_changed.isnot(None))
+        .where(~sa.exists().where(material_usage.c.callback_id == callbacks.c.id))
+    )
+    for row in rows:
+        yield ('callback_id', row.id, row.customer_id, _first_technician(row.technicians),
+               row.completed_at or row.updated_at, decode_json(row.materials_changed), None)
+
+    rows = bind.execute(
+        sa.select(repairs)
+        .where(repairs.c.status == 'COMPLETED', repairs.c.customer_id.isnot(None),
+               repairs.c.materials_used.isnot(None))
+        .where(~sa.exists().where(material_usage.c.repair_id == repairs.c.id))
+    )
+    for row in rows:
+        yield ('repair_id', row.id, row.customer_id, _first_technician(row.technicians),
+               row.completed_at or row.updated_at, decode_json(row.materials_used), row.materials_cost)
+
+    rows = bind.execute(
+        sa.select(services.c.id, services.c.customer_id, services.c.actual_date,
+                  service_reports.c.technician_id, service_reports.c.parts_replaced,
+                  service_reports.c.completion_time, service_reports.c.check_out_time)
+        .join(service_reports, service_reports.c.service_id == services.c.id)
+        .where(services.c.status == 'COMPLETED', services.c.customer_id.isnot(None),
+               service_reports.c.parts_replaced.isnot(None))
+        .where(~sa.exists().where(material_usage.c.service_id == services.c.id))
+        .order_by(services.c.id)
+    )
+    # Same rule as app.utils.material_ledger.sync_service_report_materials:
+    # one set of rows per service covering the parts of all of its reports
+    service_parts = defaultdict(list)
+    service_rows = {}
+    for row in rows:
+        service_parts[row.id].extend(decode_json(row.parts_replaced) or [])
+        service_rows[row.id] = row
+    for service_id, row in service_rows.items():
+        yield ('service_id', service_id, row.customer_id, row.technician_id,
+               row.completion_time or row.check_out_time or row.actual_date, service_parts[service_id], None)
+
+
+def _backfill_ledger() -> None:
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    batch = []
+    written = 0
+    for job_column, job_id, customer_id, technician_id, used_date, items, job_cost in list(_closed_jobs(bind)):
+        if not isinstance(items, list):
+            continue
+        for line in allocate_job_cost(parse_materials(items), job_cost):
+            batch.append({
+                'id': str(uuid.uuid4()),
+                'service_id': None,
+                'callback_id': None,
+                'repair_id': None,
+                job_column: job_id,
+                'customer_id': customer_id,
+                'technician_id': technician_id,
+                'material_name': line.material_name,
+                'quantity': line.quantity,
+                'unit': line.unit,
+                'unit_cost': line.unit_cost,
+                'total_cost': line.total_cost,
+                'used_date': used_date or now,
+                'created_at': now,
+                'updated_at': now,
+            })
+        if len(batch) >= BATCH_SIZE:
+            bind.execute(material_usage.insert(), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        bind.execute(material_usage.insert(), batch)
+        written += len(batch)
+    if written:
+        print(f"✅ material_usage: backfilled {written} rows from closed jobs")
+
+
+def upgrade() -> None:
+    if not is_offline():
+        _backfill_ledger()
+
+    for index_name, table_name, columns in INDEXES:
+        create_index_concurrently(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    # Backfilled ledger rows are kept: they can't be told apart from rows
+    # written at job closure
+    for index_name, table_name, _ in reversed(INDEXES):
+        drop_index_concurrently(index_name, table_name)
@@ -0,0 +1,33 @@
+"""sync revocations
+
+Adds sync_tombstones.user_id: a tombstone with a user_id tells only that
+user to drop the row (a technician taken off a service can no longer see
+it), one without is a deletion for everyone.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 23:05:41.218634
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not has_column('sync_tombstones', 'user_id'):
+        op.add_column('sync_tombstones', sa.Column('user_id', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sync_tombstones') as batch_op:
+        batch_op.drop_column('user_id')
@@ -0,0 +1,115 @@
+"""legacy technician agenda
+
+Agenda rows for technicians assigned to open services only through the
+legacy technician_id/technician2_id/technician3_id columns; 0002 backfilled
+the agenda from service_technicians alone, so those services were missing
+from the technicians' boards.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-20 09:12:37.504118
+"""
+import uuid
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import is_offline
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_SERVICE_STATUSES = ('PENDING', 'SCHEDULED', 'IN_PROGRESS')
+# In the order app.utils.agenda.sync_service_agenda ranks them
+LEGACY_TECHNICIAN_COLUMNS = ('technician_id', 'technician2_id', 'technician3_id')
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    if not is_offline():
+        _backfill_legacy_agenda()
+
+
+def _backfill_legacy_agenda() -> None:
+    """One agenda row per legacy technician of an open service that has none"""
+    services = sa.table(
+        'service_schedules',
+        sa.column('id', sa.String),
+        sa.column('status', sa.String),
+        sa.column('scheduled_date', sa.DateTime),
+        sa.column('actual_date', sa.DateTime),
+        *(sa.column(column, sa.String) for column in LEGACY_TECHNICIAN_COLUMNS),
+    )
+    assignments = sa.table(
+        'service_technicians',
+        sa.column('service_id', sa.String),
+        sa.column('is_primary', sa.Boolean),
+    )
+    agenda = sa.table(
+        'technician_agenda',
+        sa.column('id', sa.String),
+        sa.column('technician_id', sa.String),
+        sa.column('day', sa.Date),
+        sa.column('service_id', sa.String),
+        sa.column('status', sa.String),
+        sa.column('is_primary', sa.Boolean),
+        sa.column('order', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+        sa.column('updated_at', sa.DateTime),
+    )
+
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    # Column by column, so a technician repeated in a later column finds the
+    # row inserted for an earlier one
+    for order, column in enumerate(LEGACY_TECHNICIAN_COLUMNS):
+        technician_id = services.c[column]
+        has_agenda_row = sa.exists().where(
+            agenda.c.service_id == services.c.id,
+            agenda.c.technician_id == technician_id,
+        )
+        has_primary = sa.exists().where(
+            assignments.c.service_id == services.c.id,
+            assignments.c.is_primary.is_(True),
+        )
+        rows = bind.execute(
+            sa.select(
+                technician_id.label('technician_id'), has_primary.label('has_primary'),
+                services.c.id, services.c.status, services.c.scheduled_date, services.c.actual_date,
+            )
+            .where(services.c.status.in_(OPEN_SERVICE_STATUSES))
+            .where(technician_id.isnot(None))
+            .where(~has_agenda_row)
+        ).all()
+
+        batch = []
+        for row in rows:
+            # Same rule as app.utils.agenda.get_agenda_day
+            day = (row.scheduled_date or row.actual_date or now).date()
+            batch.append({
+                'id': str(uuid.uuid4()),
+                'technician_id': row.technician_id,
+                'day': day,
+                'service_id': row.id,
+                'status': row.status,
+                'is_primary': order == 0 and not row.has_primary,
+                'order': order,
+                'created_at': now,
+                'updated_at': now,
+            })
+            if len(batch) >= BATCH_SIZE:
+                bind.execute(agenda.insert(), batch)
+                batch = []
+        if batch:
+            bind.execute(agenda.insert(), batch)
+
+
+def downgrade() -> None:
+    # The rows are what sync_service_agenda keeps for these services anyway
+    pass
@@ -0,0 +1,35 @@
+"""customer accounts
+
+Adds users.customer_id: the customer (company) a customer account belongs
+to. The complaint endpoints and delta sync scope customer accounts by it.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-20 10:41:08.336952
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations import has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not has_column('users', 'customer_id'):
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.add_column(sa.Column('customer_id', sa.String(), nullable=True))
+            batch_op.create_foreign_key('fk_users_customer_id_customers', 'customers', ['customer_id'], ['id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_constraint('fk_users_customer_id_customers', type_='foreignkey')
+        batch_op.drop_column('customer_id')
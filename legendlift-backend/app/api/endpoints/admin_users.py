@@ -8,7 +8,9 @@ from typing import List, Optional
 from app.db.session import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_active_admin
+from app.utils.query_profiler import route_stats
+from app.utils.cache import cache
 from app.core.security import get_password_hash
 from app.utils.id_generator import generate_uuid
 from pydantic import BaseModel, EmailStr
@@ -116,22 +118,25 @@ def get_all_technicians(
             detail="Only admin can view technicians list"
         )
 
-    # Build query
-    query = db.query(User).filter(User.role == UserRole.TECHNICIAN)
+    def load_page():
+        # Build query
+        query = db.query(User).filter(User.role == UserRole.TECHNICIAN)
 
-    if active_only:
-        query = query.filter(User.active == True)
+        if active_only:
+            query = query.filter(User.active == True)
 
-    # Get total count
-    total_count = query.count()
+        # Get total count
+        total_count = query.count()
 
-    # Get paginated results
-    technicians = query.offset(skip).limit(limit).all()
+        # Get paginated results
+        technicians = query.offset(skip).limit(limit).all()
 
-    return UserListResponse(
-        total_count=total_count,
-        users=technicians
-    )
+        return UserListResponse(
+            total_count=total_count,
+            users=technicians
+        ).model_dump()
+
+    return cache.get_or_load(db, f"technicians:{active_only}:{skip}:{limit}", ("users",), load_page)
 
 
 @router.get("/technicians/{technician_id}", response_model=UserResponse)
@@ -375,3 +380,26 @@ def search_users(
 
 # Import for SQLAlchemy or_
 from sqlalchemy import or_
+
+
+@router.get("/query-stats")
+def get_query_stats(
+    current_user: User = Depends(get_current_active_admin),
+):
+    """
+    Per-route query counts, DB time and latency histograms
+    Collected by the query profiling middleware since startup (or the last
+    reset), for the worker process that serves this request
+    """
+    return route_stats.snapshot()
+
+
+@router.delete("/query-stats", status_code=status.HTTP_204_NO_CONTENT)
+def reset_query_stats(
+    current_user: User = Depends(get_current_active_admin),
+):
+    """
+    Reset the per-route query stats
+    """
+    route_stats.reset()
+    return None
@@ -10,10 +10,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, extract
 from typing import Optional, List
 from datetime import datetime, date, timedelta
-import json
 from decimal import Decimal
 
 from app.db.session import get_db
+from app.db.types import json_array_contains
 from app.api.deps import get_current_user
 from app.models import (
     User, Customer, ServiceSchedule, ServiceReport, CallBack, Repair,
@@ -105,12 +105,22 @@ async def get_customer_amc_period_report(
         )
     ).order_by(Payment.due_date).all()
 
-    # Fetch materials used in AMC period
-    materials = db.query(MaterialUsage).filter(
+    # Materials used in AMC period, consolidated by name from the material ledger
+    materials = db.query(
+        MaterialUsage.material_name,
+        func.sum(MaterialUsage.quantity).label("total_quantity"),
+        func.max(MaterialUsage.unit).label("unit"),
+        func.coalesce(func.sum(MaterialUsage.total_cost), 0).label("total_cost"),
+        func.count(MaterialUsage.service_id).label("service_count"),
+        func.count(MaterialUsage.callback_id).label("callback_count"),
+        func.count(MaterialUsage.repair_id).label("repair_count"),
+        func.min(MaterialUsage.used_date).label("first_used"),
+        func.max(MaterialUsage.used_date).label("last_used"),
+    ).filter(
         MaterialUsage.customer_id == customer_id,
         MaterialUsage.used_date >= datetime.combine(amc_start_date, datetime.min.time()),
         MaterialUsage.used_date <= datetime.combine(amc_end_date, datetime.max.time())
-    ).order_by(MaterialUsage.used_date).all()
+    ).group_by(MaterialUsage.material_name).all()
 
     # Calculate services summary
     services_scheduled = len(services)
@@ -174,12 +184,7 @@ async def get_customer_amc_period_report(
         # Parse parts replaced from JSON
         parts_text = "-"
         if report and report.parts_replaced:
-            try:
-                parts = json.loads(report.parts_replaced) if isinstance(report.parts_replaced, str) else report.parts_replaced
-                if isinstance(parts, list):
-                    parts_text = ", ".join(parts)
-            except:
-                parts_text = str(report.parts_replaced)
+            parts_text = ", ".join(str(part) for part in report.parts_replaced)
 
         service_time = None
         if report and report.check_in_time and report.check_out_time:
@@ -214,8 +219,7 @@ async def get_customer_amc_period_report(
     for idx, callback in enumerate(callbacks, 1):
         techs_list = []
         if callback.technicians:
-            tech_ids = json.loads(callback.technicians) if isinstance(callback.technicians, str) else callback.technicians
-            for tech_id in tech_ids:
+            for tech_id in callback.technicians:
                 tech = db.query(User).filter(User.id == tech_id).first()
                 if tech:
                     techs_list.append(tech.name)
@@ -238,12 +242,9 @@ async def get_customer_amc_period_report(
 
         materials_text = "-"
         if callback.materials_changed:
-            try:
-                mats = json.loads(callback.materials_changed) if isinstance(callback.materials_changed, str) else callback.materials_changed
-                if isinstance(mats, list):
-                    materials_text = ", ".join([f"{m.get('name', '')} ({m.get('quantity', '')})" for m in mats])
-            except:
-                materials_text = str(callback.materials_changed)
+            materials_text = ", ".join(
+                f"{m.get('name', '')} ({m.get('quantity', '')})" for m in callback.materials_changed
+            )
 
         callbacks_detail.append({
             "sr_no": idx,
@@ -267,8 +268,7 @@ async def get_customer_amc_period_report(
     for idx, repair in enumerate(repairs, 1):
         techs_list = []
         if repair.technicians:
-            tech_ids = json.loads(repair.technicians) if isinstance(repair.technicians, str) else repair.technicians
-            for tech_id in tech_ids:
+            for tech_id in repair.technicians:
                 tech = db.query(User).filter(User.id == tech_id).first()
                 if tech:
                     techs_list.append(tech.name)
@@ -293,47 +293,20 @@ async def get_customer_amc_period_report(
             "total_cost": f"₹{float(repair.total_cost):,.2f}" if repair.total_cost else "₹0"
         })
 
-    # Consolidate materials by name
-    materials_consolidated = {}
-    for material in materials:
-        mat_name = material.material_name
-        if mat_name not in materials_consolidated:
-            materials_consolidated[mat_name] = {
-                "material_name": mat_name,
-                "total_quantity": 0,
-                "unit": material.unit or "units",
-                "total_cost": 0,
-                "service_count": 0,
-                "callback_count": 0,
-                "repair_count": 0,
-                "dates": []
-            }
-
-        materials_consolidated[mat_name]["total_quantity"] += material.quantity
-        materials_consolidated[mat_name]["total_cost"] += float(material.total_cost)
-        materials_consolidated[mat_name]["dates"].append(material.used_date)
-
-        if material.service_id:
-            materials_consolidated[mat_name]["service_count"] += 1
-        if material.callback_id:
-            materials_consolidated[mat_name]["callback_count"] += 1
-        if material.repair_id:
-            materials_consolidated[mat_name]["repair_count"] += 1
-
     # Format materials list
     materials_list = []
-    for idx, (mat_name, mat_data) in enumerate(sorted(materials_consolidated.items(), key=lambda x: x[1]["total_cost"], reverse=True), 1):
+    for idx, material in enumerate(sorted(materials, key=lambda m: m.total_cost, reverse=True), 1):
         materials_list.append({
             "sr_no": idx,
-            "material_name": mat_name,
-            "quantity": mat_data["total_quantity"],
-            "unit": mat_data["unit"],
-            "total_cost": f"₹{mat_data['total_cost']:,.2f}",
-            "used_in_services": mat_data["service_count"],
-            "used_in_callbacks": mat_data["callback_count"],
-            "used_in_repairs": mat_data["repair_count"],
-            "first_used": min(mat_data["dates"]).strftime("%b %d, %Y"),
-            "last_used": max(mat_data["dates"]).strftime("%b %d, %Y")
+            "material_name": material.material_name,
+            "quantity": int(material.total_quantity),
+            "unit": material.unit or "units",
+            "total_cost": f"₹{float(material.total_cost):,.2f}",
+            "used_in_services": material.service_count,
+            "used_in_callbacks": material.callback_count,
+            "used_in_repairs": material.repair_count,
+            "first_used": material.first_used.strftime("%b %d, %Y"),
+            "last_used": material.last_used.strftime("%b %d, %Y")
         })
 
     # Format payments details
@@ -431,7 +404,7 @@ async def get_customer_amc_period_report(
             "on_time_rate": round((services_completed - services_overdue) / services_scheduled * 100, 1) if services_scheduled > 0 else 0,
             "customer_satisfaction": round(avg_rating, 1),
             "callback_response_rate": round(callbacks_completed / callbacks_total * 100, 1) if callbacks_total > 0 else 100,
-            "material_usage_services": len([m for m in materials if m.service_id]),
+            "material_usage_services": sum(m.service_count for m in materials),
             "total_technician_visits": services_completed + callbacks_completed + repairs_completed
         }
     }
@@ -476,34 +449,20 @@ async def get_technician_monthly_report(
         ServiceSchedule.scheduled_date <= end_date
     ).all()
 
-    # Fetch callbacks
-    callbacks = db.query(CallBack).filter(
+    # Fetch callbacks where technician is assigned
+    tech_callbacks = db.query(CallBack).filter(
         CallBack.scheduled_date >= start_date,
-        CallBack.scheduled_date <= end_date
+        CallBack.scheduled_date <= end_date,
+        json_array_contains(CallBack.technicians, technician_id)
     ).all()
 
-    # Filter callbacks where technician is assigned
-    tech_callbacks = []
-    for callback in callbacks:
-        if callback.technicians:
-            tech_ids = json.loads(callback.technicians) if isinstance(callback.technicians, str) else callback.technicians
-            if technician_id in tech_ids:
-                tech_callbacks.append(callback)
-
-    # Fetch repairs
-    repairs = db.query(Repair).filter(
+    # Fetch repairs where technician is assigned
+    tech_repairs = db.query(Repair).filter(
         Repair.created_at >= start_date,
-        Repair.created_at <= end_date
+        Repair.created_at <= end_date,
+        json_array_contains(Repair.technicians, technician_id)
     ).all()
 
-    # Filter repairs where technician is assigned
-    tech_repairs = []
-    for repair in repairs:
-        if repair.technicians:
-            tech_ids = json.loads(repair.technicians) if isinstance(repair.technicians, str) else repair.technicians
-            if technician_id in tech_ids:
-                tech_repairs.append(repair)
-
     # Calculate summary statistics
     total_assigned = len(services)
     completed = len([s for s in services if s.status == ServiceStatus.COMPLETED])
@@ -592,43 +551,31 @@ async def get_materials_consumption_report(
     Generate Materials Consumption Report for a date range
     """
 
-    materials = db.query(MaterialUsage).filter(
+    # Consolidated by material name in the database
+    materials = db.query(
+        MaterialUsage.material_name,
+        func.sum(MaterialUsage.quantity).label("total_quantity"),
+        func.max(MaterialUsage.unit).label("unit"),
+        func.coalesce(func.sum(MaterialUsage.total_cost), 0).label("total_cost"),
+        func.count(func.distinct(MaterialUsage.customer_id)).label("customer_count"),
+        func.count(func.distinct(MaterialUsage.technician_id)).label("technician_count"),
+    ).filter(
         MaterialUsage.used_date >= datetime.combine(start_date, datetime.min.time()),
         MaterialUsage.used_date <= datetime.combine(end_date, datetime.max.time())
-    ).all()
-
-    # Consolidate by material name
-    materials_summary = {}
-    for material in materials:
-        mat_name = material.material_name
-        if mat_name not in materials_summary:
-            materials_summary[mat_name] = {
-                "material_name": mat_name,
-                "total_quantity": 0,
-                "total_cost": 0,
-                "unit": material.unit or "units",
-                "customers": set(),
-                "technicians": set()
-            }
-
-        materials_summary[mat_name]["total_quantity"] += material.quantity
-        materials_summary[mat_name]["total_cost"] += float(material.total_cost)
-        materials_summary[mat_name]["customers"].add(material.customer_id)
-        if material.technician_id:
-            materials_summary[mat_name]["technicians"].add(material.technician_id)
+    ).group_by(MaterialUsage.material_name).all()
 
     # Format output
     materials_list = []
     total_cost = 0
-    for mat_name, data in sorted(materials_summary.items(), key=lambda x: x[1]["total_cost"], reverse=True):
-        total_cost += data["total_cost"]
+    for material in sorted(materials, key=lambda m: m.total_cost, reverse=True):
+        total_cost += float(material.total_cost)
         materials_list.append({
-            "material_name": mat_name,
-            "quantity": data["total_quantity"],
-            "unit": data["unit"],
-            "total_cost": f"₹{data['total_cost']:,.2f}",
-            "customer_count": len(data["customers"]),
-            "technician_count": len(data["technicians"])
+            "material_name": material.material_name,
+            "quantity": int(material.total_quantity),
+            "unit": material.unit or "units",
+            "total_cost": f"₹{float(material.total_cost):,.2f}",
+            "customer_count": material.customer_count,
+            "technician_count": material.technician_count
         })
 
     return {
@@ -639,7 +586,7 @@ async def get_materials_consumption_report(
         "summary": {
             "total_materials": len(materials_list),
             "total_cost": f"₹{total_cost:,.2f}",
-            "total_items_used": sum([m.quantity for m in materials])
+            "total_items_used": sum([int(m.total_quantity) for m in materials])
         },
         "materials": materials_list
     }
@@ -5,9 +5,10 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.security import create_access_token, verify_password
 from app.db.session import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.user import Token, UserLogin, UserResponse
 from app.api.deps import get_current_user
+from app.utils.cache import cache
 
 router = APIRouter()
 
@@ -70,15 +71,17 @@ def get_technicians(
     """
     Get list of all active technicians (Admin only)
     """
-    if current_user.role != "ADMIN":
+    if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
         )
 
-    technicians = db.query(User).filter(
-        User.role == "TECHNICIAN",
-        User.active == True
-    ).all()
+    def load_technicians():
+        technicians = db.query(User).filter(
+            User.role == UserRole.TECHNICIAN,
+            User.active == True
+        ).all()
+        return [UserResponse.model_validate(technician).model_dump() for technician in technicians]
 
-    return technicians
+    return cache.get_or_load(db, "technicians:active", ("users",), load_technicians)
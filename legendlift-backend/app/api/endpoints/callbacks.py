@@ -1,20 +1,53 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uuid
-import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func
 from app.db.session import get_db
+from app.db.types import json_array_contains, json_array_contains_item
 from app.models.user import User
-from app.models.callback import CallBack
+from app.models.callback import CallBack, CallBackStatus
 from app.models.customer import Customer
+from app.models.technician_location import TechnicianLocation
 from app.schemas.callback import CallBackCreate, CallBackUpdate, CallBackResponse, CallBackAssignTechnician
-from app.api.deps import get_current_user, get_current_active_admin
+from app.api.deps import get_current_user, get_current_active_admin, get_current_active_technician
 from app.job_id_utils import generate_callback_job_id
+from app.utils.claims import add_technician_to_job, parse_technician_ids
+from app.utils.loaders import RelatedRows, load_related, serialize_row, add_related_fields
+from app.utils.material_ledger import clear_job_materials, sync_callback_materials
+from app.utils.location_tracking import location_tracker, estimate_eta
 
 router = APIRouter()
 
+# Maximum number of technicians per callback
+MAX_CALLBACK_TECHNICIANS = 3
+
+# Maximum GPS samples accepted in one ping request
+MAX_LOCATION_SAMPLES_PER_PING = 100
+
+# Positions older than this are not used for ETAs
+ETA_MAX_POSITION_AGE_MINUTES = 30
+
+# Updates to a completed callback that change its material ledger rows
+LEDGER_FIELDS = {"status", "completed_at"}
+
+# Callback columns returned by the listings
+CALLBACK_FIELDS = (
+    "id", "customer_id", "created_by_admin_id", "scheduled_date", "status", "description",
+    "notes", "responded_at", "completed_at", "created_at", "updated_at",
+)
+
+# Customer columns added to each callback in listings
+CUSTOMER_FIELDS = {"customer_name": "name", "customer_job_number": "job_number"}
+
+# Admin columns added to callbacks in the admin listing
+ADMIN_FIELDS = {"admin_name": "email"}
+
+# Technician columns returned by the technicians endpoint
+TECHNICIAN_FIELDS = ("id", "name", "email", "phone")
+
 
 class MarkResultRequest(BaseModel):
     issue_faced: str
@@ -27,6 +60,37 @@ class MarkResultRequest(BaseModel):
     completion_images: Optional[List[str]] = None  # Array of image URLs uploaded by technician
 
 
+class LocationSample(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    recorded_at: Optional[datetime] = None  # Device fix time; defaults to receive time
+    accuracy: Optional[float] = None  # Meters
+    speed: Optional[float] = None  # Meters per second
+    heading: Optional[float] = None  # Degrees
+
+
+class LocationPing(BaseModel):
+    samples: List[LocationSample] = Field(..., min_length=1, max_length=MAX_LOCATION_SAMPLES_PER_PING)
+
+
+def serialize_callback(callback: CallBack, related: RelatedRows) -> dict:
+    """
+    Callback listing row with customer info
+    related must come from load_related() over the page of callbacks
+    """
+    callback_dict = serialize_row(callback, CALLBACK_FIELDS)
+    callback_dict["technicians"] = callback.technicians or []
+    add_related_fields(callback_dict, related.customer(callback.customer_id), CUSTOMER_FIELDS)
+    return callback_dict
+
+
+def _to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored timestamps are naive UTC, like the rest of the callback columns
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 @router.get("/", response_model=List[CallBackResponse])
 def get_callbacks(
     skip: int = 0,
@@ -34,6 +98,7 @@ def get_callbacks(
     status_filter: str = Query(None, alias="status"),
     customer_id: str = Query(None),
     technician_id: str = Query(None),
+    material: str = Query(None, description="Material name used at closure"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -50,55 +115,73 @@ def get_callbacks(
 
     if technician_id:
         # Filter callbacks where technician_id is in the technicians JSON array
-        query = query.filter(CallBack.technicians.contains(f'"{technician_id}"'))
+        query = query.filter(json_array_contains(CallBack.technicians, technician_id))
+
+    if material:
+        query = query.filter(json_array_contains_item(CallBack.materials_changed, "name", material))
 
     callbacks = query.offset(skip).limit(limit).all()
 
     # Enrich with customer and admin info
+    related = load_related(db, callbacks, user_fields=("created_by_admin_id",))
     result = []
     for callback in callbacks:
-        # Handle double-encoded JSON strings
-        technicians_data = []
-        if callback.technicians:
-            try:
-                parsed = json.loads(callback.technicians)
-                # If it's still a string, parse again (double-encoded)
-                if isinstance(parsed, str):
-                    technicians_data = json.loads(parsed)
-                else:
-                    technicians_data = parsed
-            except:
-                technicians_data = []
-
-        callback_dict = {
-            "id": callback.id,
-            "customer_id": callback.customer_id,
-            "created_by_admin_id": callback.created_by_admin_id,
-            "scheduled_date": callback.scheduled_date,
-            "status": callback.status,
-            "description": callback.description,
-            "notes": callback.notes,
-            "technicians": technicians_data,
-            "responded_at": callback.responded_at,
-            "completed_at": callback.completed_at,
-            "created_at": callback.created_at,
-            "updated_at": callback.updated_at,
-        }
+        callback_dict = serialize_callback(callback, related)
+        add_related_fields(callback_dict, related.user(callback.created_by_admin_id), ADMIN_FIELDS)
+        result.append(callback_dict)
 
-        # Get customer info
-        customer = db.query(Customer).filter(Customer.id == callback.customer_id).first()
-        if customer:
-            callback_dict["customer_name"] = customer.name
-            callback_dict["customer_job_number"] = customer.job_number
+    return result
 
-        # Get admin info
-        admin = db.query(User).filter(User.id == callback.created_by_admin_id).first()
-        if admin:
-            callback_dict["admin_name"] = admin.email
 
-        result.append(callback_dict)
+@router.get("/live-positions")
+def get_live_positions(
+    max_age_minutes: int = Query(30, ge=1, le=24 * 60),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin),
+):
+    """
+    Latest known position of each technician for the admin live map
+    Served from this worker's memory, completed from technician_locations
+    for technicians whose pings went to another worker
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(minutes=max_age_minutes)
+    latest = {
+        position["technician_id"]: position
+        for position in location_tracker.latest_positions()
+        if position["recorded_at"] >= cutoff
+    }
 
-    return result
+    newest = db.query(
+        TechnicianLocation.technician_id,
+        func.max(TechnicianLocation.recorded_at).label("recorded_at"),
+    ).filter(TechnicianLocation.recorded_at >= cutoff).group_by(TechnicianLocation.technician_id).subquery()
+    stored = db.query(TechnicianLocation, User.name).join(
+        newest,
+        (TechnicianLocation.technician_id == newest.c.technician_id)
+        & (TechnicianLocation.recorded_at == newest.c.recorded_at),
+    ).join(User, User.id == TechnicianLocation.technician_id).all()
+    for sample, technician_name in stored:
+        current = latest.get(sample.technician_id)
+        if current is None or sample.recorded_at > current["recorded_at"]:
+            latest[sample.technician_id] = {
+                "technician_id": sample.technician_id,
+                "technician_name": technician_name,
+                "callback_id": sample.callback_id,
+                "latitude": sample.latitude,
+                "longitude": sample.longitude,
+                "accuracy": sample.accuracy,
+                "speed": sample.speed,
+                "heading": sample.heading,
+                "recorded_at": sample.recorded_at,
+            }
+
+    positions = [
+        {**position, "age_seconds": int((now - position["recorded_at"]).total_seconds())}
+        for position in latest.values()
+    ]
+    positions.sort(key=lambda position: position["recorded_at"], reverse=True)
+    return {"count": len(positions), "positions": positions}
 
 
 @router.get("/{callback_id}", response_model=CallBackResponse)
@@ -117,17 +200,7 @@ def get_callback(
             detail="CallBack not found"
         )
 
-    # Handle double-encoded JSON strings
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = callback.technicians or []
 
     callback_dict = {
         "id": callback.id,
@@ -189,7 +262,7 @@ def create_callback(
         description=callback_in.description,
         notes=callback_in.notes,
         status="PENDING",
-        technicians=json.dumps([]),  # Empty array initially
+        technicians=[],  # Empty array initially
     )
 
     db.add(callback)
@@ -233,24 +306,21 @@ def update_callback(
             detail="CallBack not found"
         )
 
+    was_completed = callback.status == CallBackStatus.COMPLETED
     update_data = callback_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(callback, field, value)
 
+    if callback.status == CallBackStatus.COMPLETED and LEDGER_FIELDS.intersection(update_data):
+        sync_callback_materials(db, callback, current_user.id)
+    elif was_completed and callback.status != CallBackStatus.COMPLETED:
+        # Reopened: its materials are recorded again when it closes
+        clear_job_materials(db, callback_id=callback.id)
+
     db.commit()
     db.refresh(callback)
 
-    # Handle double-encoded JSON strings
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = callback.technicians or []
 
     callback_dict = {
         "id": callback.id,
@@ -289,7 +359,7 @@ def assign_technician_to_callback(
         )
 
     # Parse current technicians
-    technicians = json.loads(callback.technicians) if callback.technicians else []
+    technicians = list(callback.technicians or [])
 
     # Check if technician already assigned
     if assignment.technician_id in technicians:
@@ -315,7 +385,7 @@ def assign_technician_to_callback(
 
     # Add technician
     technicians.append(assignment.technician_id)
-    callback.technicians = json.dumps(technicians)
+    callback.technicians = technicians
 
     db.commit()
     db.refresh(callback)
@@ -356,7 +426,7 @@ def unassign_technician_from_callback(
         )
 
     # Parse current technicians
-    technicians = json.loads(callback.technicians) if callback.technicians else []
+    technicians = list(callback.technicians or [])
 
     # Check if technician is assigned
     if technician_id not in technicians:
@@ -367,7 +437,7 @@ def unassign_technician_from_callback(
 
     # Remove technician
     technicians.remove(technician_id)
-    callback.technicians = json.dumps(technicians)
+    callback.technicians = technicians
 
     db.commit()
     db.refresh(callback)
@@ -412,17 +482,7 @@ def respond_to_callback(
     db.commit()
     db.refresh(callback)
 
-    # Handle double-encoded JSON strings
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = callback.technicians or []
 
     callback_dict = {
         "id": callback.id,
@@ -463,38 +523,14 @@ def get_my_callbacks(
     # NOTE: This now shows both NEW and IN_PROGRESS callbacks to assigned technicians
     callbacks = db.query(CallBack).filter(
         or_(
-            CallBack.technicians.contains(f'"{current_user.id}"'),
-            CallBack.technicians == json.dumps([]),
+            json_array_contains(CallBack.technicians, current_user.id),
+            CallBack.technicians == [],
             CallBack.technicians == None
         )
     ).offset(skip).limit(limit).all()
 
-    result = []
-    for callback in callbacks:
-        callback_dict = {
-            "id": callback.id,
-            "customer_id": callback.customer_id,
-            "created_by_admin_id": callback.created_by_admin_id,
-            "scheduled_date": callback.scheduled_date,
-            "status": callback.status,
-            "description": callback.description,
-            "notes": callback.notes,
-            "technicians": json.loads(callback.technicians) if callback.technicians else [],
-            "responded_at": callback.responded_at,
-            "completed_at": callback.completed_at,
-            "created_at": callback.created_at,
-            "updated_at": callback.updated_at,
-        }
-
-        # Get customer info
-        customer = db.query(Customer).filter(Customer.id == callback.customer_id).first()
-        if customer:
-            callback_dict["customer_name"] = customer.name
-            callback_dict["customer_job_number"] = customer.job_number
-
-        result.append(callback_dict)
-
-    return result
+    related = load_related(db, callbacks)
+    return [serialize_callback(callback, related) for callback in callbacks]
 
 
 @router.get("/{callback_id}/technicians")
@@ -513,22 +549,9 @@ def get_callback_technicians(
             detail="CallBack not found"
         )
 
-    # Parse technician IDs from JSON
-    technician_ids = json.loads(callback.technicians) if callback.technicians else []
-
     # Fetch technician details
-    result = []
-    for tech_id in technician_ids:
-        technician = db.query(User).filter(User.id == tech_id).first()
-        if technician:
-            result.append({
-                "id": technician.id,
-                "name": technician.name,
-                "email": technician.email,
-                "phone": technician.phone,
-            })
-
-    return result
+    related = load_related(db, [callback], user_list_fields=("technicians",))
+    return [serialize_row(technician, TECHNICIAN_FIELDS) for technician in related.users_in(callback.technicians)]
 
 
 @router.delete("/{callback_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -560,6 +583,8 @@ def pick_callback(
 ):
     """
     Technician picks the callback job
+    Assigns the technician to the callback (max 3); concurrent picks that
+    lose the race get a 409 instead of overwriting each other
     """
     callback = db.query(CallBack).filter(CallBack.id == callback_id).first()
     if not callback:
@@ -568,22 +593,16 @@ def pick_callback(
             detail="CallBack not found"
         )
 
+    if current_user.id not in parse_technician_ids(callback.technicians):
+        add_technician_to_job(db, callback, current_user.id, "callback", MAX_CALLBACK_TECHNICIANS)
+
     callback.status = "PICKED"
     callback.picked_at = datetime.utcnow()
 
     db.commit()
     db.refresh(callback)
 
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = parse_technician_ids(callback.technicians)
 
     return {
         "id": callback.id,
@@ -623,16 +642,7 @@ def mark_on_the_way(
     db.commit()
     db.refresh(callback)
 
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = callback.technicians or []
 
     return {
         "id": callback.id,
@@ -650,6 +660,122 @@ def mark_on_the_way(
     }
 
 
+@router.post("/{callback_id}/locations", status_code=status.HTTP_202_ACCEPTED)
+def ping_location(
+    callback_id: str,
+    ping: LocationPing,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_technician),
+):
+    """
+    Technician device reports GPS samples while travelling to the callback site
+    Samples are buffered and bulk-written by the location flusher; clients can
+    batch several fixes per request (e.g. one every few seconds)
+    """
+    callback = db.query(CallBack.id, CallBack.technicians).filter(CallBack.id == callback_id).first()
+    if not callback:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CallBack not found"
+        )
+    if current_user.id not in parse_technician_ids(callback.technicians):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not assigned to this callback"
+        )
+
+    samples = [
+        {**sample.model_dump(), "recorded_at": _to_utc_naive(sample.recorded_at)}
+        for sample in ping.samples
+    ]
+    accepted = location_tracker.record(current_user.id, current_user.name, callback_id, samples)
+    return {"accepted": accepted}
+
+
+@router.get("/{callback_id}/eta")
+def get_callback_eta(
+    callback_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Speed-based ETA of each technician travelling to the callback site
+    Uses this worker's in-memory positions, completed from technician_locations
+    for technicians whose pings went to another worker
+    """
+    row = db.query(CallBack.id, CallBack.status, Customer.latitude, Customer.longitude).join(
+        Customer, Customer.id == CallBack.customer_id
+    ).filter(CallBack.id == callback_id).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CallBack not found"
+        )
+    if row.latitude is None or row.longitude is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Customer site has no coordinates"
+        )
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(minutes=ETA_MAX_POSITION_AGE_MINUTES)
+    positions = {
+        position["technician_id"]: (position, location_tracker.speed_kmh(position["technician_id"]))
+        for position in location_tracker.latest_positions()
+        if position["callback_id"] == callback_id and position["recorded_at"] >= cutoff
+    }
+
+    # Pings that went to another worker (or before a restart) are only in the
+    # table; keep whichever position is newer per technician
+    latest = db.query(
+        TechnicianLocation.technician_id,
+        func.max(TechnicianLocation.recorded_at).label("recorded_at"),
+    ).filter(
+        TechnicianLocation.callback_id == callback_id,
+        TechnicianLocation.recorded_at >= cutoff,
+    ).group_by(TechnicianLocation.technician_id).subquery()
+    stored = db.query(TechnicianLocation, User.name).join(
+        latest,
+        (TechnicianLocation.technician_id == latest.c.technician_id)
+        & (TechnicianLocation.recorded_at == latest.c.recorded_at),
+    ).join(User, User.id == TechnicianLocation.technician_id).all()
+    for sample, technician_name in stored:
+        current = positions.get(sample.technician_id)
+        if current is not None and current[0]["recorded_at"] >= sample.recorded_at:
+            continue
+        position = {
+            "technician_id": sample.technician_id,
+            "technician_name": technician_name,
+            "latitude": sample.latitude,
+            "longitude": sample.longitude,
+            "recorded_at": sample.recorded_at,
+        }
+        speed = sample.speed * 3.6 if sample.speed is not None else None
+        positions[sample.technician_id] = (position, speed)
+
+    etas = []
+    for position, speed in positions.values():
+        estimate = estimate_eta(position, speed, row.latitude, row.longitude)
+        etas.append({
+            "technician_id": position["technician_id"],
+            "technician_name": position["technician_name"],
+            "latitude": position["latitude"],
+            "longitude": position["longitude"],
+            "position_recorded_at": position["recorded_at"],
+            **estimate,
+            "eta_at": position["recorded_at"] + timedelta(minutes=estimate["eta_minutes"]),
+        })
+    etas.sort(key=lambda eta: eta["eta_minutes"])
+
+    return {
+        "callback_id": callback_id,
+        "status": row.status,
+        "site_latitude": row.latitude,
+        "site_longitude": row.longitude,
+        "etas": etas,
+    }
+
+
 @router.post("/{callback_id}/at-site", response_model=CallBackResponse)
 def mark_at_site(
     callback_id: str,
@@ -672,16 +798,7 @@ def mark_at_site(
     db.commit()
     db.refresh(callback)
 
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = callback.technicians or []
 
     return {
         "id": callback.id,
@@ -721,39 +838,8 @@ def join_callback(
             detail="Can only join IN_PROGRESS callbacks"
         )
 
-    # Parse current technicians (handle double-encoded JSON)
-    if callback.technicians:
-        try:
-            technicians = json.loads(callback.technicians)
-            # If result is string (double-encoded), parse again
-            if isinstance(technicians, str):
-                technicians = json.loads(technicians)
-        except:
-            technicians = []
-    else:
-        technicians = []
-
-    # Ensure it's a list
-    if not isinstance(technicians, list):
-        technicians = []
-
-    # Check if already assigned
-    if current_user.id in technicians:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You are already assigned to this callback"
-        )
-
-    # Check maximum limit
-    if len(technicians) >= 3:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum 3 technicians allowed per callback"
-        )
-
-    # Add technician
-    technicians.append(current_user.id)
-    callback.technicians = json.dumps(technicians)
+    # Add technician (the claim rejects concurrent joins past the limit)
+    technicians = add_technician_to_job(db, callback, current_user.id, "callback", MAX_CALLBACK_TECHNICIANS)
 
     db.commit()
     db.refresh(callback)
@@ -799,15 +885,15 @@ def mark_callback_result(
 
     # Support both old and new image upload fields
     if request.completion_images:
-        callback.completion_images = json.dumps(request.completion_images)
+        callback.completion_images = request.completion_images
         # Also set report_attachment_url to first image for backward compatibility
         callback.report_attachment_url = request.completion_images[0] if request.completion_images else None
     elif request.report_attachment_url:
         # Fallback to old field if new field not provided
         callback.report_attachment_url = request.report_attachment_url
-        callback.completion_images = json.dumps([request.report_attachment_url])
+        callback.completion_images = [request.report_attachment_url]
 
-    callback.materials_changed = json.dumps(request.materials_changed) if request.materials_changed else json.dumps([])
+    callback.materials_changed = request.materials_changed or []
     callback.lift_status_on_closure = request.lift_status_on_closure
     callback.requires_followup = request.requires_followup
     callback.status = "COMPLETED"
@@ -819,6 +905,8 @@ def mark_callback_result(
     else:
         callback.requires_followup = "false"
 
+    sync_callback_materials(db, callback, current_user.id)
+
     db.commit()
     db.refresh(callback)
 
@@ -859,23 +947,15 @@ def reopen_callback(
             detail="This callback was closed without errors and cannot be reopened"
         )
 
-    # Reopen the callback
+    # Reopen the callback; its materials are recorded again when it closes
     callback.status = "IN_PROGRESS"
     callback.completed_at = None
+    clear_job_materials(db, callback_id=callback.id)
 
     db.commit()
     db.refresh(callback)
 
-    technicians_data = []
-    if callback.technicians:
-        try:
-            parsed = json.loads(callback.technicians)
-            if isinstance(parsed, str):
-                technicians_data = json.loads(parsed)
-            else:
-                technicians_data = parsed
-        except:
-            technicians_data = []
+    technicians_data = callback.technicians or []
 
     return {
         "id": callback.id,
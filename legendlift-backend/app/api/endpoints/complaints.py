@@ -13,9 +13,33 @@ from app.schemas.complaint import (
     ComplaintResponse,
 )
 from app.api.deps import get_current_user, get_current_active_admin
+from app.utils.claims import claim_complaint
+from app.utils.loaders import RelatedRows, load_related, serialize_row, add_related_fields
 
 router = APIRouter()
 
+# Complaint columns returned by the listings
+COMPLAINT_FIELDS = (
+    "id", "complaint_id", "customer_id", "user_id", "title", "description", "issue_type",
+    "status", "priority", "assigned_to_id", "resolved_at", "resolution_notes", "created_at", "updated_at",
+)
+
+
+def serialize_complaint(complaint: Complaint, related: RelatedRows) -> dict:
+    """
+    Complaint listing row with customer and assigned technician data
+    related must come from load_related() over the page of complaints
+    """
+    complaint_dict = serialize_row(complaint, COMPLAINT_FIELDS)
+    add_related_fields(complaint_dict, related.customer(complaint.customer_id), {
+        "customer_name": "name",
+        "customer_phone": "phone",
+    })
+    add_related_fields(complaint_dict, related.user(complaint.assigned_to_id), {
+        "assigned_technician_name": "name",
+    })
+    return complaint_dict
+
 
 # ===============================================
 # TECHNICIAN CALLBACK/REPAIR WORKFLOW ENDPOINTS
@@ -65,32 +89,8 @@ def get_available_callbacks(
     )
 
     # Enrich with customer data
-    result = []
-    for complaint in complaints_sorted:
-        complaint_dict = {
-            "id": complaint.id,
-            "complaint_id": complaint.complaint_id,
-            "customer_id": complaint.customer_id,
-            "user_id": complaint.user_id,
-            "title": complaint.title,
-            "description": complaint.description,
-            "issue_type": complaint.issue_type,
-            "status": complaint.status,
-            "priority": complaint.priority,
-            "assigned_to_id": complaint.assigned_to_id,
-            "resolved_at": complaint.resolved_at,
-            "resolution_notes": complaint.resolution_notes,
-            "created_at": complaint.created_at,
-            "updated_at": complaint.updated_at,
-        }
-
-        if complaint.customer:
-            complaint_dict["customer_name"] = complaint.customer.name
-            complaint_dict["customer_phone"] = complaint.customer.phone
-
-        result.append(complaint_dict)
-
-    return result
+    related = load_related(db, complaints_sorted)
+    return [serialize_complaint(complaint, related) for complaint in complaints_sorted]
 
 
 @router.get("/my-callbacks", response_model=List[ComplaintResponse])
@@ -140,36 +140,9 @@ def get_my_callbacks(
         )
     )
 
-    # Enrich with customer data
-    result = []
-    for complaint in complaints_sorted:
-        complaint_dict = {
-            "id": complaint.id,
-            "complaint_id": complaint.complaint_id,
-            "customer_id": complaint.customer_id,
-            "user_id": complaint.user_id,
-            "title": complaint.title,
-            "description": complaint.description,
-            "issue_type": complaint.issue_type,
-            "status": complaint.status,
-            "priority": complaint.priority,
-            "assigned_to_id": complaint.assigned_to_id,
-            "resolved_at": complaint.resolved_at,
-            "resolution_notes": complaint.resolution_notes,
-            "created_at": complaint.created_at,
-            "updated_at": complaint.updated_at,
-        }
-
-        if complaint.customer:
-            complaint_dict["customer_name"] = complaint.customer.name
-            complaint_dict["customer_phone"] = complaint.customer.phone
-
-        if complaint.assigned_to:
-            complaint_dict["assigned_technician_name"] = complaint.assigned_to.name
-
-        result.append(complaint_dict)
-
-    return result
+    # Enrich with customer and technician data
+    related = load_related(db, complaints_sorted, user_fields=("assigned_to_id",))
+    return [serialize_complaint(complaint, related) for complaint in complaints_sorted]
 
 
 @router.get("/", response_model=List[ComplaintResponse])
@@ -201,38 +174,9 @@ def get_complaints(
 
     complaints = query.order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
 
-    # Enrich with customer data
-    result = []
-    for complaint in complaints:
-        complaint_dict = {
-            "id": complaint.id,
-            "complaint_id": complaint.complaint_id,
-            "customer_id": complaint.customer_id,
-            "user_id": complaint.user_id,
-            "title": complaint.title,
-            "description": complaint.description,
-            "issue_type": complaint.issue_type,
-            "status": complaint.status,
-            "priority": complaint.priority,
-            "assigned_to_id": complaint.assigned_to_id,
-            "resolved_at": complaint.resolved_at,
-            "resolution_notes": complaint.resolution_notes,
-            "created_at": complaint.created_at,
-            "updated_at": complaint.updated_at,
-        }
-
-        # Add customer data
-        if complaint.customer:
-            complaint_dict["customer_name"] = complaint.customer.name
-            complaint_dict["customer_phone"] = complaint.customer.phone
-
-        # Add assigned technician data
-        if complaint.assigned_to:
-            complaint_dict["assigned_technician_name"] = complaint.assigned_to.name
-
-        result.append(complaint_dict)
-
-    return result
+    # Enrich with customer and assigned technician data
+    related = load_related(db, complaints, user_fields=("assigned_to_id",))
+    return [serialize_complaint(complaint, related) for complaint in complaints]
 
 
 @router.post("/{complaint_id}/claim", response_model=ComplaintResponse)
@@ -244,6 +188,7 @@ def claim_callback(
     """
     Technician claims/picks an unassigned callback
     Updates assigned_to_id and sets status to IN_PROGRESS
+    Uses a conditional UPDATE so only one of several simultaneous claims wins
     """
     if current_user.role != "technician":
         raise HTTPException(
@@ -251,6 +196,10 @@ def claim_callback(
             detail="Only technicians can claim callbacks"
         )
 
+    # Assign to current technician only if nobody has claimed it yet
+    claimed = claim_complaint(db, complaint_id, current_user.id)
+    db.commit()
+
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     if not complaint:
         raise HTTPException(
@@ -258,26 +207,17 @@ def claim_callback(
             detail="Callback not found"
         )
 
-    # Check if already assigned
-    if complaint.assigned_to_id is not None:
+    if not claimed:
         # Get the technician who already claimed this
         assigned_technician_name = "another technician"
         if complaint.assigned_to:
             assigned_technician_name = complaint.assigned_to.name
 
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail=f"This complaint has already been claimed by {assigned_technician_name}"
         )
 
-    # Assign to current technician
-    complaint.assigned_to_id = current_user.id
-    complaint.status = ComplaintStatus.IN_PROGRESS
-    complaint.updated_at = datetime.utcnow()
-
-    db.commit()
-    db.refresh(complaint)
-
     result = {
         "id": complaint.id,
         "complaint_id": complaint.complaint_id,
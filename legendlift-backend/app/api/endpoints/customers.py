@@ -1,59 +1,74 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func, or_, insert, update
 import uuid
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 from app.db.session import get_db
 from app.models.user import User
 from app.models.customer import Customer, AMCStatus
-from app.models.service import ServiceSchedule, ServiceStatus, ServiceType
+from app.models.service import ServiceSchedule, ServiceStatus
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse, AIIMSStatusUpdate
 from app.api.deps import get_current_user, get_current_active_admin
+from app.utils.customer_import import (
+    ImportFileError,
+    iter_customer_rows,
+    build_customer_fields,
+    updatable_fields,
+    build_amc_service_rows,
+)
+from app.utils.cache import cache
+from app.utils.geo_index import customer_index
 
 router = APIRouter()
 
+# Rows validated and written per round trip by the bulk import
+BULK_IMPORT_BATCH_SIZE = 500
+
+# Detail lists of the period report (include= values)
+PERIOD_REPORT_DETAILS = ("services", "callbacks", "repairs", "materials")
+
+# Rows fetched per round trip for the period report detail lists
+PERIOD_REPORT_BATCH_SIZE = 500
+
+# Sections of the customer overview (include= values)
+OVERVIEW_SECTIONS = ("services", "callbacks", "repairs", "minor_points", "payments")
+
+# Maximum rows per overview list; the summary has the full counts
+OVERVIEW_LIST_LIMIT = 20
+
+# Latest payments shown in the overview
+OVERVIEW_PAYMENTS_LIMIT = 5
+
+
+def parse_include(include: Optional[str], choices: tuple, label: str) -> List[str]:
+    """
+    Values of a comma-separated include= parameter (all choices when absent)
+    Raises 400 naming the unknown values
+    """
+    if include is None:
+        return list(choices)
+    requested = [value.strip() for value in include.split(",") if value.strip()]
+    unknown = [value for value in requested if value not in choices]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {label}: {', '.join(unknown)}"
+        )
+    return requested
+
 
 def create_services_for_customer(customer: Customer, db: Session):
     """
     Automatically create services based on AMC dates and services_per_year
     Services are distributed evenly throughout the AMC period
     """
-    if not customer.amc_valid_from or not customer.services_per_year:
-        return []
-
-    # Calculate interval between services in months
-    amc_duration_months = 12  # AMC is typically for one year
-    interval_months = amc_duration_months / customer.services_per_year
-
     services_created = []
-    service_date = datetime.combine(customer.amc_valid_from, datetime.min.time())
-
-    for i in range(customer.services_per_year):
-        # Generate service ID
-        date_str = service_date.strftime("%Y%m%d")
-        random_str = uuid.uuid4().hex[:5].upper()
-        service_id = f"SRV-{date_str}-{random_str}"
-
-        service = ServiceSchedule(
-            id=str(uuid.uuid4()),
-            service_id=service_id,
-            customer_id=customer.id,
-            contract_id=None,  # Will be set when AMC contract is created
-            scheduled_date=service_date,
-            status=ServiceStatus.PENDING,
-            service_type=ServiceType.SERVICE,
-            is_adhoc=False,
-            notes=f"Auto-generated service {i+1}/{customer.services_per_year}"
-        )
-
+    for row in build_amc_service_rows(customer.id, customer.amc_valid_from, customer.services_per_year):
+        service = ServiceSchedule(**row)
         db.add(service)
         services_created.append(service)
 
-        # Calculate next service date
-        service_date = service_date + relativedelta(months=int(interval_months))
-
     return services_created
 
 
@@ -108,6 +123,29 @@ def get_customers(
     return customers
 
 
+@router.get("/nearby", status_code=status.HTTP_200_OK)
+def get_nearby_customers(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(2.0, gt=0, le=100, description="Search radius in km"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get customers within a radius of a point, closest first
+    Served from the in-memory spatial index
+    """
+    customers = customer_index.nearby(db, lat, lng, radius, limit)
+    return {
+        "latitude": lat,
+        "longitude": lng,
+        "radius_km": radius,
+        "count": len(customers),
+        "customers": customers,
+    }
+
+
 @router.get("/{customer_id}", response_model=CustomerResponse)
 def get_customer(
     customer_id: str,
@@ -177,6 +215,151 @@ def create_customer(
     return customer
 
 
+def _import_customer_batch(
+    db: Session,
+    batch: List[tuple],
+    report: dict,
+    dry_run: bool,
+    generate_services: bool,
+    used_service_ids: set,
+):
+    """
+    Upsert one batch of validated rows on job_number
+    New customers are bulk inserted, existing ones bulk updated by primary key,
+    and AMC services for new (or renewed) contracts are bulk inserted
+    """
+    job_numbers = [fields["job_number"] for _, _, fields in batch]
+    existing = {
+        job_number: (customer_id, amc_valid_from)
+        for job_number, customer_id, amc_valid_from in db.query(
+            Customer.job_number, Customer.id, Customer.amc_valid_from
+        ).filter(Customer.job_number.in_(job_numbers)).all()
+    }
+
+    inserts = []
+    updates = []
+    service_rows = []
+    for row_number, raw, fields in batch:
+        current = existing.get(fields["job_number"])
+        if current:
+            customer_id, old_amc_valid_from = current
+            values = updatable_fields(raw, fields)
+            updates.append({"id": customer_id, **values})
+            # A new AMC start date is a renewal; schedule the new period
+            renewed = "amc_valid_from" in values and values["amc_valid_from"] != old_amc_valid_from
+            amc_valid_from = values["amc_valid_from"] if renewed else None
+        else:
+            customer_id = str(uuid.uuid4())
+            inserts.append({"id": customer_id, **fields})
+            amc_valid_from = fields.get("amc_valid_from")
+
+        services_per_year = fields.get("services_per_year")
+        if generate_services and amc_valid_from and services_per_year:
+            service_rows.extend(build_amc_service_rows(
+                customer_id, amc_valid_from, services_per_year, used_service_ids
+            ))
+
+    # Random service IDs may collide with existing services; regenerate those
+    if service_rows:
+        taken = {
+            service_id for (service_id,) in db.query(ServiceSchedule.service_id).filter(
+                ServiceSchedule.service_id.in_([row["service_id"] for row in service_rows])
+            ).all()
+        }
+        for row in service_rows:
+            if row["service_id"] in taken:
+                prefix = row["service_id"].rsplit("-", 1)[0]
+                while row["service_id"] in taken or row["service_id"] in used_service_ids:
+                    row["service_id"] = f"{prefix}-{uuid.uuid4().hex[:5].upper()}"
+                used_service_ids.add(row["service_id"])
+
+    report["created"] += len(inserts)
+    report["updated"] += len(updates)
+    report["services_created"] += len(service_rows)
+
+    if dry_run:
+        return
+
+    if inserts:
+        db.execute(insert(Customer), inserts)
+    if updates:
+        db.execute(update(Customer), updates)
+    if service_rows:
+        db.execute(insert(ServiceSchedule), service_rows)
+
+
+@router.post("/bulk-import", status_code=status.HTTP_200_OK)
+def bulk_import_customers(
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Query(None, description="Sheet name (default: first sheet with a customer header row)"),
+    dry_run: bool = Query(False, description="Validate only, do not save"),
+    generate_services: bool = Query(True, description="Create AMC services for new customers"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin),
+):
+    """
+    Bulk import customers from a route chart or customer sheet (Admin only)
+
+    Accepts .xlsx, .xlsb or .csv. The header row is detected automatically
+    (e.g. Job No, Site Name, Area, Route, Service Start Date, Service End Date, Service).
+    Rows are upserted on job_number; invalid rows are skipped and listed in the
+    returned error report. AMC services are generated for new customers, and for
+    existing customers whose AMC start date changed.
+    """
+    report = {
+        "sheet": None,
+        "total_rows": 0,
+        "created": 0,
+        "updated": 0,
+        "skipped": 0,
+        "services_created": 0,
+        "dry_run": dry_run,
+        "errors": [],
+    }
+    first_row_for_job = {}
+    used_service_ids = set()
+    batch = []
+
+    try:
+        for sheet_name, row_number, raw in iter_customer_rows(file.file, file.filename or "", sheet):
+            report["sheet"] = sheet_name
+            report["total_rows"] += 1
+
+            fields, errors = build_customer_fields(raw)
+            if not errors and fields["job_number"] in first_row_for_job:
+                errors = [f"Duplicate job number (first seen on row {first_row_for_job[fields['job_number']]})"]
+            if errors:
+                report["skipped"] += 1
+                report["errors"].append({
+                    "row": row_number,
+                    "job_number": raw.get("job_number"),
+                    "errors": errors,
+                })
+                continue
+
+            first_row_for_job[fields["job_number"]] = row_number
+            batch.append((row_number, raw, fields))
+            if len(batch) >= BULK_IMPORT_BATCH_SIZE:
+                _import_customer_batch(db, batch, report, dry_run, generate_services, used_service_ids)
+                batch = []
+
+        if batch:
+            _import_customer_batch(db, batch, report, dry_run, generate_services, used_service_ids)
+    except ImportFileError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+
+    return report
+
+
 @router.put("/{customer_id}", response_model=CustomerResponse)
 def update_customer(
     customer_id: str,
@@ -259,10 +442,13 @@ def get_active_amc_customers(
     Get all customers with ACTIVE AMC status
     Used for callback creation (only active AMC customers)
     """
-    customers = db.query(Customer).filter(
-        Customer.amc_status == "ACTIVE"
-    ).offset(skip).limit(limit).all()
-    return customers
+    def load_customers():
+        customers = db.query(Customer).filter(
+            Customer.amc_status == "ACTIVE"
+        ).offset(skip).limit(limit).all()
+        return [CustomerResponse.model_validate(customer).model_dump() for customer in customers]
+
+    return cache.get_or_load(db, f"customers:active-amc:{skip}:{limit}", ("customers",), load_customers)
 
 
 @router.post("/update-amc-statuses", status_code=status.HTTP_200_OK)
@@ -319,16 +505,24 @@ def get_customers_count(
 @router.get("/{customer_id}/period-report")
 def get_customer_period_report(
     customer_id: str,
+    include: Optional[str] = Query(
+        None, description="Comma-separated detail lists to return: " + ", ".join(PERIOD_REPORT_DETAILS) + " (default: all)"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get customer-based report for the active contract period
     Shows services, callbacks, repairs, and materials within contract period
+
+    The summary is always returned; pass include= to get only some of the
+    detail lists (e.g. include=materials when the app only shows totals)
     """
     from app.models.callback import CallBack
     from app.models.repair import Repair
-    from app.models.service import ServiceReport
+    from app.models.material_usage import MaterialUsage
+
+    requested = parse_include(include, PERIOD_REPORT_DETAILS, "report details")
 
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
@@ -347,73 +541,78 @@ def get_customer_period_report(
     period_start = datetime.combine(customer.amc_valid_from, datetime.min.time())
     period_end = datetime.combine(customer.amc_valid_to, datetime.max.time())
 
-    # Get services completed in the period
-    services = db.query(ServiceSchedule).filter(
+    # Services completed, callbacks raised and repairs performed in the period
+    period_services = db.query(ServiceSchedule).filter(
         ServiceSchedule.customer_id == customer_id,
         ServiceSchedule.status == ServiceStatus.COMPLETED,
         ServiceSchedule.actual_date >= period_start,
         ServiceSchedule.actual_date <= period_end
-    ).all()
-
-    # Get callbacks raised in the period
-    callbacks = db.query(CallBack).filter(
+    )
+    period_callbacks = db.query(CallBack).filter(
         CallBack.customer_id == customer_id,
         CallBack.created_at >= period_start,
         CallBack.created_at <= period_end
-    ).all()
-
-    # Get repairs performed in the period
-    repairs = db.query(Repair).filter(
+    )
+    period_repairs = db.query(Repair).filter(
         Repair.customer_id == customer_id,
         Repair.created_at >= period_start,
         Repair.created_at <= period_end
-    ).all()
+    )
 
-    # Collect all materials replaced
-    all_materials = []
-
-    # From service reports
-    for service in services:
-        reports = db.query(ServiceReport).filter(ServiceReport.service_id == service.id).all()
-        for report in reports:
-            if report.parts_replaced:
-                import json
-                try:
-                    parts = json.loads(report.parts_replaced) if isinstance(report.parts_replaced, str) else report.parts_replaced
-                    all_materials.extend(parts)
-                except:
-                    pass
-
-    # From callbacks
-    for callback in callbacks:
-        if callback.materials_changed:
-            import json
-            try:
-                materials = json.loads(callback.materials_changed) if isinstance(callback.materials_changed, str) else callback.materials_changed
-                all_materials.extend(materials)
-            except:
-                pass
-
-    # Prepare repair details
-    repair_details = []
-    for repair in repairs:
-        repair_details.append({
-            "id": repair.id,
-            "description": repair.description,
-            "scheduled_date": repair.scheduled_date,
-            "status": repair.status,
-        })
-
-    # Prepare callback details
-    callback_details = []
-    for callback in callbacks:
-        callback_details.append({
-            "id": callback.id,
-            "description": callback.description,
-            "status": callback.status,
-            "scheduled_date": callback.scheduled_date,
-            "lift_status_on_closure": callback.lift_status_on_closure,
-        })
+    # All counts in one round trip, whichever detail lists are requested
+    counts = db.query(
+        period_services.with_entities(func.count(ServiceSchedule.id)).scalar_subquery().label("services"),
+        period_callbacks.with_entities(func.count(CallBack.id)).scalar_subquery().label("callbacks"),
+        period_repairs.with_entities(func.count(Repair.id)).scalar_subquery().label("repairs"),
+    ).one()
+
+    # Materials replaced in the period, aggregated by the material ledger
+    materials = db.query(
+        MaterialUsage.material_name,
+        func.count(MaterialUsage.id).label("entries"),
+    ).filter(
+        MaterialUsage.customer_id == customer_id,
+        MaterialUsage.used_date >= period_start,
+        MaterialUsage.used_date <= period_end
+    ).group_by(MaterialUsage.material_name).order_by(MaterialUsage.material_name).all()
+
+    # Detail lists read only the columns they return, streamed in batches
+    details = {}
+    if "services" in requested:
+        details["services"] = [
+            {"id": row.id, "service_id": row.service_id, "date": row.actual_date}
+            for row in period_services.with_entities(
+                ServiceSchedule.id, ServiceSchedule.service_id, ServiceSchedule.actual_date
+            ).yield_per(PERIOD_REPORT_BATCH_SIZE)
+        ]
+    if "callbacks" in requested:
+        details["callbacks"] = [
+            {
+                "id": row.id,
+                "description": row.description,
+                "status": row.status,
+                "scheduled_date": row.scheduled_date,
+                "lift_status_on_closure": row.lift_status_on_closure,
+            }
+            for row in period_callbacks.with_entities(
+                CallBack.id, CallBack.description, CallBack.status,
+                CallBack.scheduled_date, CallBack.lift_status_on_closure,
+            ).yield_per(PERIOD_REPORT_BATCH_SIZE)
+        ]
+    if "repairs" in requested:
+        details["repairs"] = [
+            {
+                "id": row.id,
+                "description": row.description,
+                "scheduled_date": row.scheduled_date,
+                "status": row.status,
+            }
+            for row in period_repairs.with_entities(
+                Repair.id, Repair.description, Repair.scheduled_date, Repair.status
+            ).yield_per(PERIOD_REPORT_BATCH_SIZE)
+        ]
+    if "materials" in requested:
+        details["materials_replaced"] = [material.material_name for material in materials]  # Unique materials
 
     return {
         "customer_id": customer_id,
@@ -424,15 +623,178 @@ def get_customer_period_report(
             "end": customer.amc_valid_to,
         },
         "summary": {
-            "total_services_completed": len(services),
-            "total_callbacks_raised": len(callbacks),
-            "total_repairs_performed": len(repairs),
-            "total_materials_replaced": len(all_materials),
+            "total_services_completed": counts.services,
+            "total_callbacks_raised": counts.callbacks,
+            "total_repairs_performed": counts.repairs,
+            "total_materials_replaced": sum(material.entries for material in materials),
         },
-        "details": {
-            "services": [{"id": s.id, "service_id": s.service_id, "date": s.actual_date} for s in services],
-            "callbacks": callback_details,
-            "repairs": repair_details,
-            "materials_replaced": list(set(all_materials)),  # Unique materials
+        "details": details,
+    }
+
+
+@router.get("/{customer_id}/overview")
+def get_customer_overview(
+    customer_id: str,
+    include: Optional[str] = Query(
+        None, description="Comma-separated sections to return: " + ", ".join(OVERVIEW_SECTIONS) + " (default: all)"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Everything the customer details screen shows, in one request
+    Customer, overdue, upcoming and unscheduled (no scheduled date, e.g.
+    ad-hoc) open services, open callbacks and repairs, open minor points,
+    latest payments and summary counts
+
+    The customer and summary are always returned; pass include= to get only
+    some of the sections (e.g. include=services,payments). Lists are capped at
+    OVERVIEW_LIST_LIMIT rows, the summary counts are complete.
+    """
+    from app.models.callback import CallBack, CallBackStatus
+    from app.models.repair import Repair, RepairStatus
+    from app.models.minor_point import MinorPoint, MinorPointStatus
+    from app.models.payment import Payment, PaymentStatus
+    from app.utils.loaders import load_related, add_related_fields
+
+    requested = parse_include(include, OVERVIEW_SECTIONS, "overview sections")
+
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    open_services = db.query(ServiceSchedule).filter(
+        ServiceSchedule.customer_id == customer_id,
+        ServiceSchedule.status != ServiceStatus.COMPLETED
+    )
+    overdue_services = open_services.filter(ServiceSchedule.scheduled_date < today)
+    upcoming_services = open_services.filter(ServiceSchedule.scheduled_date >= today)
+    unscheduled_services = open_services.filter(ServiceSchedule.scheduled_date.is_(None))
+    open_callbacks = db.query(CallBack).filter(
+        CallBack.customer_id == customer_id,
+        CallBack.status.notin_([CallBackStatus.COMPLETED, CallBackStatus.CANCELLED])
+    )
+    open_repairs = db.query(Repair).filter(
+        Repair.customer_id == customer_id,
+        Repair.status.in_([RepairStatus.PENDING, RepairStatus.IN_PROGRESS])
+    )
+    open_minor_points = db.query(MinorPoint).filter(
+        MinorPoint.customer_id == customer_id,
+        MinorPoint.status == MinorPointStatus.OPEN
+    )
+    pending_payments = db.query(Payment).filter(
+        Payment.customer_id == customer_id,
+        Payment.status != PaymentStatus.PAID
+    )
+
+    # Customer and all counts in one round trip
+    row = db.query(
+        Customer,
+        overdue_services.with_entities(func.count(ServiceSchedule.id)).scalar_subquery().label("services_overdue"),
+        upcoming_services.with_entities(func.count(ServiceSchedule.id)).scalar_subquery().label("services_upcoming"),
+        unscheduled_services.with_entities(func.count(ServiceSchedule.id)).scalar_subquery().label("services_unscheduled"),
+        open_callbacks.with_entities(func.count(CallBack.id)).scalar_subquery().label("open_callbacks"),
+        open_repairs.with_entities(func.count(Repair.id)).scalar_subquery().label("open_repairs"),
+        open_minor_points.with_entities(func.count(MinorPoint.id)).scalar_subquery().label("open_minor_points"),
+        pending_payments.with_entities(func.count(Payment.id)).scalar_subquery().label("pending_payments"),
+    ).filter(Customer.id == customer_id).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer not found"
+        )
+
+    # Sections read only the columns they return, one query each
+    sections = {}
+    if "services" in requested:
+        service_columns = (
+            ServiceSchedule.id, ServiceSchedule.service_id, ServiceSchedule.scheduled_date, ServiceSchedule.status,
+            ServiceSchedule.service_type, ServiceSchedule.days_overdue,
+            ServiceSchedule.technician_id, ServiceSchedule.technician2_id,
+        )
+        sections["services"] = {
+            "overdue": overdue_services.with_entities(*service_columns)
+            .order_by(ServiceSchedule.scheduled_date).limit(OVERVIEW_LIST_LIMIT).all(),
+            "upcoming": upcoming_services.with_entities(*service_columns)
+            .order_by(ServiceSchedule.scheduled_date).limit(OVERVIEW_LIST_LIMIT).all(),
+            "unscheduled": unscheduled_services.with_entities(*service_columns)
+            .order_by(ServiceSchedule.created_at).limit(OVERVIEW_LIST_LIMIT).all(),
         }
+    if "callbacks" in requested:
+        sections["callbacks"] = open_callbacks.with_entities(
+            CallBack.id, CallBack.job_id, CallBack.scheduled_date, CallBack.status,
+            CallBack.description, CallBack.technicians, CallBack.created_at,
+        ).order_by(CallBack.created_at.desc()).limit(OVERVIEW_LIST_LIMIT).all()
+    if "repairs" in requested:
+        sections["repairs"] = open_repairs.with_entities(
+            Repair.id, Repair.scheduled_date, Repair.status, Repair.description,
+            Repair.technicians, Repair.created_at,
+        ).order_by(Repair.created_at.desc()).limit(OVERVIEW_LIST_LIMIT).all()
+    if "minor_points" in requested:
+        sections["minor_points"] = open_minor_points.with_entities(
+            MinorPoint.id, MinorPoint.technician_id, MinorPoint.description,
+            MinorPoint.status, MinorPoint.reported_date,
+        ).order_by(MinorPoint.reported_date.desc()).limit(OVERVIEW_LIST_LIMIT).all()
+    if "payments" in requested:
+        sections["payments"] = db.query(
+            Payment.id, Payment.contract_id, Payment.amount, Payment.due_date,
+            Payment.paid_date.label("payment_date"), Payment.status, Payment.payment_method,
+        ).filter(Payment.customer_id == customer_id).order_by(
+            Payment.due_date.desc()
+        ).limit(OVERVIEW_PAYMENTS_LIMIT).all()
+
+    # Technician names for every section at once
+    related = load_related(
+        db,
+        [
+            *sections.get("services", {}).get("overdue", []),
+            *sections.get("services", {}).get("upcoming", []),
+            *sections.get("services", {}).get("unscheduled", []),
+            *sections.get("callbacks", []),
+            *sections.get("repairs", []),
+            *sections.get("minor_points", []),
+        ],
+        user_fields=("technician_id", "technician2_id"),
+        user_list_fields=("technicians",),
+    )
+
+    def technician_names(rows):
+        return [
+            {**row._asdict(), "technician_names": [user.name for user in related.users_in(row.technicians)]}
+            for row in rows
+        ]
+
+    response = {
+        "customer": CustomerResponse.model_validate(row.Customer).model_dump(),
+        "summary": {
+            "services_overdue": row.services_overdue,
+            "services_upcoming": row.services_upcoming,
+            "services_unscheduled": row.services_unscheduled,
+            "open_callbacks": row.open_callbacks,
+            "open_repairs": row.open_repairs,
+            "open_minor_points": row.open_minor_points,
+            "pending_payments": row.pending_payments,
+        },
     }
+    if "services" in sections:
+        response["services"] = {}
+        for key, services in sections["services"].items():
+            service_dicts = []
+            for service in services:
+                service_dict = service._asdict()
+                add_related_fields(service_dict, related.user(service.technician_id), {"technician_name": "name"})
+                add_related_fields(service_dict, related.user(service.technician2_id), {"technician2_name": "name"})
+                service_dicts.append(service_dict)
+            response["services"][key] = service_dicts
+    if "callbacks" in sections:
+        response["callbacks"] = technician_names(sections["callbacks"])
+    if "repairs" in sections:
+        response["repairs"] = technician_names(sections["repairs"])
+    if "minor_points" in sections:
+        response["minor_points"] = [
+            {**point._asdict(), "technician_name": getattr(related.user(point.technician_id), "name", "Unknown")}
+            for point in sections["minor_points"]
+        ]
+    if "payments" in sections:
+        response["payments"] = [
+            {**payment._asdict(), "status": payment.status.value.upper()}
+            for payment in sections["payments"]
+        ]
+    return response
@@ -11,9 +11,13 @@ from app.models.payment import Payment, PaymentStatus
 from app.models.customer import Customer
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
 from app.api.deps import get_current_user, get_current_active_admin
+from app.utils.loaders import load_related, add_related_fields
 
 router = APIRouter()
 
+# Customer columns added to each payment in listings
+CUSTOMER_FIELDS = {"customer_name": "name", "customer_job_number": "job_number"}
+
 
 @router.get("/", response_model=List[dict])
 def get_payments(
@@ -41,6 +45,7 @@ def get_payments(
         )
 
     payments = query.order_by(Payment.due_date.desc()).offset(skip).limit(limit).all()
+    related = load_related(db, payments)
 
     # Enrich with customer info
     result = []
@@ -62,11 +67,8 @@ def get_payments(
             "updated_at": payment.updated_at,
         }
 
-        # Get customer info
-        customer = db.query(Customer).filter(Customer.id == payment.customer_id).first()
-        if customer:
-            payment_dict["customer_name"] = customer.name
-            payment_dict["customer_job_number"] = customer.job_number
+        # Add customer info
+        add_related_fields(payment_dict, related.customer(payment.customer_id), CUSTOMER_FIELDS)
 
         result.append(payment_dict)
 
@@ -2,17 +2,50 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 import uuid
-import json
 from datetime import datetime
 from app.db.session import get_db
+from app.db.types import json_array_contains
 from app.models.user import User
-from app.models.repair import Repair
+from app.models.repair import Repair, RepairStatus
 from app.models.customer import Customer
 from app.schemas.repair import RepairCreate, RepairUpdate, RepairResponse, RepairAssignTechnician
 from app.api.deps import get_current_user, get_current_active_admin
+from app.utils.claims import add_technician_to_job
+from app.utils.loaders import RelatedRows, load_related, serialize_row, add_related_fields
+from app.utils.material_ledger import clear_job_materials, sync_repair_materials
 
 router = APIRouter()
 
+# Updates to a completed repair that change its material ledger rows
+LEDGER_FIELDS = {"status", "materials_used", "materials_cost", "completed_at", "customer_id"}
+
+# Repair columns returned by the listings
+REPAIR_FIELDS = (
+    "id", "customer_id", "created_by_admin_id", "customer_name", "contact_number", "scheduled_date",
+    "status", "description", "notes", "completed_at", "created_at", "updated_at",
+)
+
+# Customer columns added to repairs linked to an existing customer
+CUSTOMER_FIELDS = {"existing_customer_name": "name", "customer_job_number": "job_number"}
+
+# Admin columns added to repairs in the admin listing
+ADMIN_FIELDS = {"admin_name": "email"}
+
+# Technician columns returned by the technicians endpoint
+TECHNICIAN_FIELDS = ("id", "name", "email", "phone")
+
+
+def serialize_repair(repair: Repair, related: RelatedRows) -> dict:
+    """
+    Repair listing row with existing customer info and technician count
+    related must come from load_related() over the page of repairs
+    """
+    repair_dict = serialize_row(repair, REPAIR_FIELDS)
+    repair_dict["technicians"] = repair.technicians or []
+    add_related_fields(repair_dict, related.customer(repair.customer_id), CUSTOMER_FIELDS)
+    repair_dict["technician_count"] = len(repair_dict["technicians"])
+    return repair_dict
+
 
 @router.get("/", response_model=List[RepairResponse])
 def get_repairs(
@@ -37,45 +70,16 @@ def get_repairs(
 
     if technician_id:
         # Filter repairs where technician_id is in the technicians JSON array
-        query = query.filter(Repair.technicians.contains(f'"{technician_id}"'))
+        query = query.filter(json_array_contains(Repair.technicians, technician_id))
 
     repairs = query.offset(skip).limit(limit).all()
 
     # Enrich with customer and admin info
+    related = load_related(db, repairs, user_fields=("created_by_admin_id",))
     result = []
     for repair in repairs:
-        repair_dict = {
-            "id": repair.id,
-            "customer_id": repair.customer_id,
-            "created_by_admin_id": repair.created_by_admin_id,
-            "customer_name": repair.customer_name,
-            "contact_number": repair.contact_number,
-            "scheduled_date": repair.scheduled_date,
-            "status": repair.status,
-            "description": repair.description,
-            "notes": repair.notes,
-            "technicians": json.loads(repair.technicians) if repair.technicians else [],
-            "completed_at": repair.completed_at,
-            "created_at": repair.created_at,
-            "updated_at": repair.updated_at,
-        }
-
-        # Get existing customer info if customer_id is set
-        if repair.customer_id:
-            customer = db.query(Customer).filter(Customer.id == repair.customer_id).first()
-            if customer:
-                repair_dict["existing_customer_name"] = customer.name
-                repair_dict["customer_job_number"] = customer.job_number
-
-        # Get admin info
-        admin = db.query(User).filter(User.id == repair.created_by_admin_id).first()
-        if admin:
-            repair_dict["admin_name"] = admin.email
-
-        # Count technicians
-        technicians = json.loads(repair.technicians) if repair.technicians else []
-        repair_dict["technician_count"] = len(technicians)
-
+        repair_dict = serialize_repair(repair, related)
+        add_related_fields(repair_dict, related.user(repair.created_by_admin_id), ADMIN_FIELDS)
         result.append(repair_dict)
 
     return result
@@ -107,7 +111,7 @@ def get_repair(
         "status": repair.status,
         "description": repair.description,
         "notes": repair.notes,
-        "technicians": json.loads(repair.technicians) if repair.technicians else [],
+        "technicians": repair.technicians or [],
         "completed_at": repair.completed_at,
         "created_at": repair.created_at,
         "updated_at": repair.updated_at,
@@ -120,7 +124,7 @@ def get_repair(
             repair_dict["existing_customer_name"] = customer.name
             repair_dict["customer_job_number"] = customer.job_number
 
-    technicians = json.loads(repair.technicians) if repair.technicians else []
+    technicians = repair.technicians or []
     repair_dict["technician_count"] = len(technicians)
 
     return repair_dict
@@ -162,7 +166,7 @@ def create_repair(
         description=repair_in.description,
         notes=repair_in.notes,
         status="PENDING",
-        technicians=json.dumps([]),  # Empty array initially
+        technicians=[],  # Empty array initially
     )
 
     db.add(repair)
@@ -212,10 +216,17 @@ def update_repair(
             detail="Repair not found"
         )
 
+    was_completed = repair.status == RepairStatus.COMPLETED
     update_data = repair_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(repair, field, value)
 
+    if repair.status == RepairStatus.COMPLETED and LEDGER_FIELDS.intersection(update_data):
+        sync_repair_materials(db, repair, current_user.id)
+    elif was_completed and repair.status != RepairStatus.COMPLETED:
+        # Reopened: its materials are recorded again when it closes
+        clear_job_materials(db, repair_id=repair.id)
+
     db.commit()
     db.refresh(repair)
 
@@ -229,13 +240,13 @@ def update_repair(
         "status": repair.status,
         "description": repair.description,
         "notes": repair.notes,
-        "technicians": json.loads(repair.technicians) if repair.technicians else [],
+        "technicians": repair.technicians or [],
         "completed_at": repair.completed_at,
         "created_at": repair.created_at,
         "updated_at": repair.updated_at,
     }
 
-    technicians = json.loads(repair.technicians) if repair.technicians else []
+    technicians = repair.technicians or []
     repair_dict["technician_count"] = len(technicians)
 
     return repair_dict
@@ -260,7 +271,7 @@ def assign_technician_to_repair(
         )
 
     # Parse current technicians
-    technicians = json.loads(repair.technicians) if repair.technicians else []
+    technicians = list(repair.technicians or [])
 
     # Check if technician already assigned
     if assignment.technician_id in technicians:
@@ -279,7 +290,7 @@ def assign_technician_to_repair(
 
     # Add technician (no limit for repairs)
     technicians.append(assignment.technician_id)
-    repair.technicians = json.dumps(technicians)
+    repair.technicians = technicians
 
     db.commit()
     db.refresh(repair)
@@ -320,19 +331,8 @@ def join_repair(
             detail="Repair not found"
         )
 
-    # Parse current technicians
-    technicians = json.loads(repair.technicians) if repair.technicians else []
-
-    # Check if already joined
-    if current_user.id in technicians:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You are already assigned to this repair"
-        )
-
-    # Add current user
-    technicians.append(current_user.id)
-    repair.technicians = json.dumps(technicians)
+    # Add current user (the claim rejects concurrent joins on stale data)
+    technicians = add_technician_to_job(db, repair, current_user.id, "repair")
 
     # Update status to IN_PROGRESS if first technician
     if repair.status == "PENDING":
@@ -379,7 +379,7 @@ def unassign_technician_from_repair(
         )
 
     # Parse current technicians
-    technicians = json.loads(repair.technicians) if repair.technicians else []
+    technicians = list(repair.technicians or [])
 
     # Check if technician is assigned
     if technician_id not in technicians:
@@ -390,7 +390,7 @@ def unassign_technician_from_repair(
 
     # Remove technician
     technicians.remove(technician_id)
-    repair.technicians = json.dumps(technicians)
+    repair.technicians = technicians
 
     db.commit()
     db.refresh(repair)
@@ -442,43 +442,14 @@ def get_my_repairs(
     # 2. Technicians array is empty (unassigned - visible to all)
     repairs = db.query(Repair).filter(
         or_(
-            Repair.technicians.contains(f'"{current_user.id}"'),
-            Repair.technicians == json.dumps([]),
+            json_array_contains(Repair.technicians, current_user.id),
+            Repair.technicians == [],
             Repair.technicians == None
         )
     ).offset(skip).limit(limit).all()
 
-    result = []
-    for repair in repairs:
-        repair_dict = {
-            "id": repair.id,
-            "customer_id": repair.customer_id,
-            "created_by_admin_id": repair.created_by_admin_id,
-            "customer_name": repair.customer_name,
-            "contact_number": repair.contact_number,
-            "scheduled_date": repair.scheduled_date,
-            "status": repair.status,
-            "description": repair.description,
-            "notes": repair.notes,
-            "technicians": json.loads(repair.technicians) if repair.technicians else [],
-            "completed_at": repair.completed_at,
-            "created_at": repair.created_at,
-            "updated_at": repair.updated_at,
-        }
-
-        # Get existing customer info if customer_id is set
-        if repair.customer_id:
-            customer = db.query(Customer).filter(Customer.id == repair.customer_id).first()
-            if customer:
-                repair_dict["existing_customer_name"] = customer.name
-                repair_dict["customer_job_number"] = customer.job_number
-
-        technicians = json.loads(repair.technicians) if repair.technicians else []
-        repair_dict["technician_count"] = len(technicians)
-
-        result.append(repair_dict)
-
-    return result
+    related = load_related(db, repairs)
+    return [serialize_repair(repair, related) for repair in repairs]
 
 
 @router.get("/{repair_id}/technicians")
@@ -497,22 +468,9 @@ def get_repair_technicians(
             detail="Repair not found"
         )
 
-    # Parse technician IDs from JSON
-    technician_ids = json.loads(repair.technicians) if repair.technicians else []
-
     # Fetch technician details
-    result = []
-    for tech_id in technician_ids:
-        technician = db.query(User).filter(User.id == tech_id).first()
-        if technician:
-            result.append({
-                "id": technician.id,
-                "name": technician.name,
-                "email": technician.email,
-                "phone": technician.phone,
-            })
-
-    return result
+    related = load_related(db, [repair], user_list_fields=("technicians",))
+    return [serialize_row(technician, TECHNICIAN_FIELDS) for technician in related.users_in(repair.technicians)]
 
 
 @router.delete("/{repair_id}", status_code=status.HTTP_204_NO_CONTENT)
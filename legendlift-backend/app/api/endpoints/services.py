@@ -1,11 +1,13 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
+import time
 import uuid
 from app.db.session import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.models.customer import Customer
 from app.models.service import ServiceSchedule, ServiceReport, ServiceStatus
 from app.schemas.service import (
     ServiceScheduleCreate,
@@ -17,34 +19,15 @@ from app.schemas.service import (
 )
 from app.api.deps import get_current_user, get_current_active_admin
 from app.utils.id_generator import generate_sequential_service_id
-from app.models.service_technician import ServiceTechnician
+from app.utils.loaders import service_schedule_load_options, serialize_service_schedule
+from app.utils.agenda import LEGACY_TECHNICIAN_COLUMNS, sync_service_agenda
+from app.utils.material_ledger import clear_job_materials, sync_service_report_materials
+from app.utils.dispatch import plan_dispatch, DEFAULT_MAX_VISITS_PER_TECHNICIAN
 
 router = APIRouter()
 
-
-def enrich_service_with_technicians(service_dict: dict, service_id: str, db: Session) -> dict:
-    """
-    Helper function to enrich service dict with all assigned technicians
-    """
-    # Get all assigned technicians from service_technicians table
-    assignments = db.query(ServiceTechnician).filter(
-        ServiceTechnician.service_id == service_id
-    ).order_by(ServiceTechnician.order).all()
-
-    assigned_technicians = []
-    for assignment in assignments:
-        tech = db.query(User).filter(User.id == assignment.technician_id).first()
-        if tech:
-            assigned_technicians.append({
-                "id": tech.id,
-                "name": tech.name,
-                "is_primary": assignment.is_primary,
-                "order": assignment.order
-            })
-
-    service_dict["assigned_technicians"] = assigned_technicians
-    service_dict["technician_count"] = len(assigned_technicians)
-    return service_dict
+# Service fields the technician agenda is built from
+AGENDA_FIELDS = {"status", "scheduled_date", *LEGACY_TECHNICIAN_COLUMNS}
 
 
 # Service Schedule Endpoints
@@ -63,9 +46,7 @@ def get_service_schedules(
     """
     Get service schedules with optional filters
     """
-    from app.models.customer import Customer
-
-    query = db.query(ServiceSchedule)
+    query = db.query(ServiceSchedule).options(*service_schedule_load_options())
 
     # If technician, only show their services
     if current_user.role == "technician":
@@ -97,46 +78,7 @@ def get_service_schedules(
 
     services = query.order_by(ServiceSchedule.scheduled_date.desc()).offset(skip).limit(limit).all()
 
-    # Enrich with customer and technician data
-    result = []
-    for service in services:
-        service_dict = {
-            "id": service.id,
-            "service_id": service.service_id,
-            "contract_id": service.contract_id,
-            "customer_id": service.customer_id,
-            "scheduled_date": service.scheduled_date,
-            "actual_date": service.actual_date,
-            "status": service.status,
-            "technician_id": service.technician_id,
-            "technician2_id": service.technician2_id,
-            "days_overdue": service.days_overdue,
-            "is_adhoc": service.is_adhoc,
-            "service_type": service.service_type,
-            "notes": service.notes,
-            "created_at": service.created_at,
-            "updated_at": service.updated_at,
-        }
-
-        # Add customer data
-        if service.customer:
-            service_dict["customer_name"] = service.customer.name
-            service_dict["job_number"] = service.customer.job_number
-            service_dict["area"] = service.customer.area
-            service_dict["route"] = service.customer.route
-
-        # Add technician data
-        if service.technician:
-            service_dict["technician_name"] = service.technician.name
-        if service.technician2:
-            service_dict["technician2_name"] = service.technician2.name
-
-        # Add all assigned technicians
-        service_dict = enrich_service_with_technicians(service_dict, service.id, db)
-
-        result.append(service_dict)
-
-    return result
+    return [serialize_service_schedule(service) for service in services]
 
 
 @router.get("/schedules/today", response_model=List[ServiceScheduleResponse])
@@ -148,7 +90,7 @@ def get_today_services(
     Get today's services for technician
     """
     today = datetime.now().date()
-    query = db.query(ServiceSchedule).filter(
+    query = db.query(ServiceSchedule).options(*service_schedule_load_options()).filter(
         and_(
             ServiceSchedule.scheduled_date >= today,
             ServiceSchedule.scheduled_date < today + timedelta(days=1),
@@ -161,46 +103,96 @@ def get_today_services(
 
     services = query.order_by(ServiceSchedule.scheduled_date).all()
 
-    # Enrich with customer and technician data
-    result = []
-    for service in services:
-        service_dict = {
-            "id": service.id,
-            "service_id": service.service_id,
-            "contract_id": service.contract_id,
-            "customer_id": service.customer_id,
-            "scheduled_date": service.scheduled_date,
-            "actual_date": service.actual_date,
-            "status": service.status,
-            "technician_id": service.technician_id,
-            "technician2_id": service.technician2_id,
-            "days_overdue": service.days_overdue,
-            "is_adhoc": service.is_adhoc,
-            "service_type": service.service_type,
-            "notes": service.notes,
-            "created_at": service.created_at,
-            "updated_at": service.updated_at,
-        }
+    return [serialize_service_schedule(service) for service in services]
 
-        # Add customer data
-        if service.customer:
-            service_dict["customer_name"] = service.customer.name
-            service_dict["job_number"] = service.customer.job_number
-            service_dict["area"] = service.customer.area
-            service_dict["route"] = service.customer.route
 
-        # Add technician data
-        if service.technician:
-            service_dict["technician_name"] = service.technician.name
-        if service.technician2:
-            service_dict["technician2_name"] = service.technician2.name
+@router.get("/dispatch-plan", status_code=status.HTTP_200_OK)
+def get_dispatch_plan(
+    plan_date: Optional[str] = Query(None, alias="date", description="YYYY-MM-DD (default: today)"),
+    max_visits_per_technician: int = Query(DEFAULT_MAX_VISITS_PER_TECHNICIAN, ge=1, le=50),
+    route: Optional[int] = Query(None),
+    include_overdue: bool = Query(False, description="Also plan open services from earlier days"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin),
+):
+    """
+    Plan the day's visits (Admin only)
 
-        # Add all assigned technicians
-        service_dict = enrich_service_with_technicians(service_dict, service.id, db)
+    Groups the day's pending/scheduled services by customer route, orders each
+    group by distance and assigns runs of visits to active technicians under a
+    per-technician cap. Services that already have a technician stay with them.
+    Returns ordered itineraries; nothing is saved.
+    """
+    try:
+        day = date.fromisoformat(plan_date) if plan_date else datetime.now().date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date must be in YYYY-MM-DD format"
+        )
 
-        result.append(service_dict)
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    query = db.query(
+        ServiceSchedule.id,
+        ServiceSchedule.service_id,
+        ServiceSchedule.scheduled_date,
+        ServiceSchedule.technician_id,
+        Customer.id,
+        Customer.name,
+        Customer.area,
+        Customer.route,
+        Customer.latitude,
+        Customer.longitude,
+    ).join(Customer, Customer.id == ServiceSchedule.customer_id).filter(
+        ServiceSchedule.status.in_([ServiceStatus.PENDING, ServiceStatus.SCHEDULED]),
+        ServiceSchedule.scheduled_date < day_end,
+    )
+    if not include_overdue:
+        query = query.filter(ServiceSchedule.scheduled_date >= day_start)
+    if route:
+        query = query.filter(Customer.route == route)
+
+    stops = [
+        {
+            "service_db_id": service_db_id,
+            "service_id": service_id,
+            "scheduled_date": scheduled_date.isoformat() if scheduled_date else None,
+            "technician_id": technician_id,
+            "customer_id": customer_id,
+            "customer_name": customer_name,
+            "area": area,
+            "route": customer_route,
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+        for (
+            service_db_id, service_id, scheduled_date, technician_id,
+            customer_id, customer_name, area, customer_route, latitude, longitude,
+        ) in query.order_by(ServiceSchedule.scheduled_date, ServiceSchedule.id).all()
+    ]
+
+    technicians = [
+        {"id": technician_id, "name": name}
+        for technician_id, name in db.query(User.id, User.name).filter(
+            User.role == UserRole.TECHNICIAN,
+            User.active == True,
+        ).order_by(User.name).all()
+    ]
+
+    started = time.perf_counter()
+    plan = plan_dispatch(stops, technicians, max_visits_per_technician)
+    planning_ms = (time.perf_counter() - started) * 1000
 
-    return result
+    return {
+        "date": day.isoformat(),
+        "service_count": len(stops),
+        "technician_count": len(technicians),
+        "max_visits_per_technician": max_visits_per_technician,
+        "planning_ms": round(planning_ms, 1),
+        **plan,
+    }
 
 
 @router.get("/schedules/{service_id}", response_model=ServiceScheduleResponse)
@@ -212,49 +204,16 @@ def get_service_schedule(
     """
     Get service schedule by ID
     """
-    service = db.query(ServiceSchedule).filter(ServiceSchedule.id == service_id).first()
+    service = db.query(ServiceSchedule).options(
+        *service_schedule_load_options()
+    ).filter(ServiceSchedule.id == service_id).first()
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Service not found"
         )
 
-    # Enrich with customer and technician data
-    service_dict = {
-        "id": service.id,
-        "service_id": service.service_id,
-        "contract_id": service.contract_id,
-        "customer_id": service.customer_id,
-        "scheduled_date": service.scheduled_date,
-        "actual_date": service.actual_date,
-        "status": service.status,
-        "technician_id": service.technician_id,
-        "technician2_id": service.technician2_id,
-        "days_overdue": service.days_overdue,
-        "is_adhoc": service.is_adhoc,
-        "service_type": service.service_type,
-        "notes": service.notes,
-        "created_at": service.created_at,
-        "updated_at": service.updated_at,
-    }
-
-    # Add customer data
-    if service.customer:
-        service_dict["customer_name"] = service.customer.name
-        service_dict["job_number"] = service.customer.job_number
-        service_dict["area"] = service.customer.area
-        service_dict["route"] = service.customer.route
-
-    # Add technician data
-    if service.technician:
-        service_dict["technician_name"] = service.technician.name
-    if service.technician2:
-        service_dict["technician2_name"] = service.technician2.name
-
-    # Add all assigned technicians
-    service_dict = enrich_service_with_technicians(service_dict, service.id, db)
-
-    return service_dict
+    return serialize_service_schedule(service)
 
 
 @router.post("/schedules", response_model=ServiceScheduleResponse, status_code=status.HTTP_201_CREATED)
@@ -275,6 +234,7 @@ def create_service_schedule(
         **service_in.model_dump()
     )
     db.add(service)
+    sync_service_agenda(db, service)
     db.commit()
     db.refresh(service)
     return service
@@ -304,10 +264,17 @@ def update_service_schedule(
             detail="Not authorized to update this service"
         )
 
+    was_completed = service.status == ServiceStatus.COMPLETED
     update_data = service_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(service, field, value)
 
+    if AGENDA_FIELDS.intersection(update_data):
+        sync_service_agenda(db, service)
+    if was_completed and service.status != ServiceStatus.COMPLETED:
+        # Reopened: its parts are recorded again when a report completes it
+        clear_job_materials(db, service_id=service.id)
+
     db.commit()
     db.refresh(service)
     return service
@@ -392,6 +359,7 @@ def create_service_report(
 
     # Update service status
     service.status = ServiceStatus.IN_PROGRESS
+    sync_service_agenda(db, service)
 
     db.add(report)
     db.commit()
@@ -425,16 +393,24 @@ def update_service_report(
 
     update_data = report_in.model_dump(exclude_unset=True)
 
+    service = db.query(ServiceSchedule).filter(ServiceSchedule.id == report.service_id).first()
+
     # If completing the service
     if update_data.get("completion_time"):
         # Update service schedule
-        service = db.query(ServiceSchedule).filter(ServiceSchedule.id == report.service_id).first()
         service.status = ServiceStatus.COMPLETED
         service.actual_date = datetime.now()
+        sync_service_agenda(db, service)
 
     for field, value in update_data.items():
         setattr(report, field, value)
 
+    # Material ledger rows for the parts used on a completed service
+    if service is not None and service.status == ServiceStatus.COMPLETED and (
+        "parts_replaced" in update_data or update_data.get("completion_time")
+    ):
+        sync_service_report_materials(db, report, service)
+
     db.commit()
     db.refresh(report)
     return report
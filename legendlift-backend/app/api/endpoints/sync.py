@@ -0,0 +1,42 @@
+"""
+Delta sync endpoint for offline-capable mobile clients
+Returns only rows created, updated or deleted since the client's last sync token
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.models.user import User
+from app.api.deps import get_current_user
+from app.utils.sync import SYNC_ENTITIES, DEFAULT_SYNC_PAGE_SIZE, MAX_SYNC_PAGE_SIZE, build_sync_payload
+
+router = APIRouter()
+
+
+@router.get("")
+def sync(
+    since: Optional[str] = Query(None, description="Token from the previous sync's 'next'; omit for a full sync"),
+    entities: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(SYNC_ENTITIES)),
+    limit: int = Query(DEFAULT_SYNC_PAGE_SIZE, ge=1, le=MAX_SYNC_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Pull changes since the last sync
+
+    Clients store 'next' and pass it as 'since' on the following call,
+    repeating while 'has_more' is true. 'changes' holds created or updated
+    rows per entity (upsert by id), 'deleted' holds ids to remove locally.
+    """
+    if entities:
+        requested = [entity.strip() for entity in entities.split(",") if entity.strip()]
+        unknown = [entity for entity in requested if entity not in SYNC_ENTITIES]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown sync entities: {', '.join(unknown)}"
+            )
+    else:
+        requested = list(SYNC_ENTITIES)
+
+    return build_sync_payload(db, current_user, since, requested, limit)
@@ -3,8 +3,10 @@ Technician-specific service endpoints
 Allows technicians to register and manage services on-site
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select, exists, func, and_
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 import uuid
 
@@ -20,10 +22,23 @@ from app.schemas.service import (
 from app.api.deps import get_current_user
 from app.utils.id_generator import generate_sequential_service_id, generate_report_id, generate_uuid
 from app.models.service_technician import ServiceTechnician
+from app.models.technician_agenda import TechnicianAgenda
+from app.utils.loaders import service_schedule_load_options, get_service_assignments
+from app.utils.agenda import sync_service_agenda
+from app.utils.claims import claim_row
+from app.utils.idempotency import get_idempotent_response, save_idempotent_response
+from app.utils.geo_index import haversine_km
+from app.core.config import settings
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Maximum number of technicians that can pick the same ticket
+MAX_TECHNICIANS_PER_TICKET = 3
+
+# Endpoint name recorded with check-in idempotency keys
+CHECK_IN_ENDPOINT = "technician/check-in"
+
 
 class AdHocServiceCreate(BaseModel):
     """Schema for creating ad-hoc service by technician"""
@@ -93,6 +108,7 @@ def register_adhoc_service(
     )
 
     db.add(service)
+    sync_service_agenda(db, service)
     db.commit()
     db.refresh(service)
 
@@ -102,6 +118,7 @@ def register_adhoc_service(
 @router.post("/check-in", response_model=dict, status_code=status.HTTP_201_CREATED)
 def check_in_service(
     check_in_data: ServiceCheckIn,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -113,6 +130,10 @@ def check_in_service(
     2. Creates a service report with check-in time and location
     3. Returns service ID and report ID
 
+    Everything is written in a single transaction. Clients may send an
+    Idempotency-Key header; retrying with the same key returns the original
+    response instead of creating a duplicate report.
+
     Technician workflow:
     1. Arrive at customer location
     2. Call this endpoint to check-in
@@ -129,36 +150,69 @@ def check_in_service(
             detail="Only technicians can check-in to services"
         )
 
-    # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == check_in_data.customer_id).first()
-    if not customer:
+    # Retried request - return the original result
+    previous_response = get_idempotent_response(db, current_user.id, idempotency_key, CHECK_IN_ENDPOINT)
+    if previous_response is not None:
+        return previous_response
+
+    # Verify customer exists and find an existing pending service in one query
+    row = db.query(Customer, ServiceSchedule).outerjoin(
+        ServiceSchedule,
+        and_(
+            ServiceSchedule.customer_id == Customer.id,
+            ServiceSchedule.technician_id == current_user.id,
+            ServiceSchedule.status.in_([ServiceStatus.PENDING, ServiceStatus.SCHEDULED]),
+        )
+    ).filter(Customer.id == check_in_data.customer_id).first()
+
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found"
         )
-
-    # Check if there's an existing pending service for this customer and technician
-    existing_service = db.query(ServiceSchedule).filter(
-        ServiceSchedule.customer_id == check_in_data.customer_id,
-        ServiceSchedule.technician_id == current_user.id,
-        ServiceSchedule.status.in_([ServiceStatus.PENDING, ServiceStatus.SCHEDULED])
-    ).first()
-
+    customer, existing_service = row
+
+    # Geofence: compare the reported position with the customer site
+    distance_from_site_m = None
+    outside_geofence = None
+    location = check_in_data.location or {}
+    try:
+        check_in_lat = float(location["latitude"])
+        check_in_lng = float(location["longitude"])
+    except (KeyError, TypeError, ValueError):
+        check_in_lat = check_in_lng = None
+    if None not in (customer.latitude, customer.longitude, check_in_lat, check_in_lng):
+        distance_from_site_m = round(
+            haversine_km(customer.latitude, customer.longitude, check_in_lat, check_in_lng) * 1000, 1
+        )
+        outside_geofence = distance_from_site_m > settings.CHECK_IN_GEOFENCE_RADIUS_METERS
+        if outside_geofence and settings.CHECK_IN_GEOFENCE_ENFORCE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Check-in location is {distance_from_site_m:.0f} m from the customer site "
+                       f"(limit {settings.CHECK_IN_GEOFENCE_RADIUS_METERS} m)"
+            )
+
+    check_in_location = dict(location)
+    if distance_from_site_m is not None:
+        check_in_location["distance_from_site_m"] = distance_from_site_m
+
+    now = datetime.now()
     if existing_service:
         # Use existing scheduled service
         service = existing_service
         service.status = ServiceStatus.IN_PROGRESS
-        service.actual_date = datetime.now()
+        service.actual_date = now
+        sync_service_agenda(db, service)
     else:
-        # Create new ad-hoc service
-        service_id = generate_sequential_service_id(db)
+        # Create new ad-hoc service (counter allocated in this transaction)
         service = ServiceSchedule(
             id=generate_uuid(),
-            service_id=service_id,
+            service_id=generate_sequential_service_id(db),
             customer_id=check_in_data.customer_id,
             contract_id=None,
             scheduled_date=None,
-            actual_date=datetime.now(),
+            actual_date=now,
             status=ServiceStatus.IN_PROGRESS,
             technician_id=current_user.id,
             is_adhoc=True,
@@ -166,26 +220,22 @@ def check_in_service(
             notes=check_in_data.notes,
         )
         db.add(service)
-        db.flush()  # Get service.id
+        sync_service_agenda(db, service)
 
     # Create service report with check-in
-    report_id = generate_report_id()
     report = ServiceReport(
         id=generate_uuid(),
-        report_id=report_id,
+        report_id=generate_report_id(),
         service_id=service.id,
         technician_id=current_user.id,
-        check_in_time=datetime.now(),
-        check_in_location=check_in_data.location,
+        check_in_time=now,
+        check_in_location=check_in_location,
         work_done="",  # Will be filled later
     )
-
     db.add(report)
-    db.commit()
-    db.refresh(service)
-    db.refresh(report)
 
-    return {
+    # All values are known client-side, so no refresh is needed after commit
+    response = {
         "message": "Successfully checked in",
         "service_id": service.service_id,
         "service_db_id": service.id,
@@ -194,7 +244,22 @@ def check_in_service(
         "customer_name": customer.name,
         "customer_location": customer.area,
         "check_in_time": report.check_in_time.isoformat(),
+        "distance_from_site_m": distance_from_site_m,
+        "outside_geofence": outside_geofence,
     }
+    save_idempotent_response(db, current_user.id, idempotency_key, CHECK_IN_ENDPOINT, response)
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first
+        db.rollback()
+        previous_response = get_idempotent_response(db, current_user.id, idempotency_key, CHECK_IN_ENDPOINT)
+        if previous_response is None:
+            raise
+        return previous_response
+
+    return response
 
 
 @router.get("/my-services/today", response_model=List[dict])
@@ -204,7 +269,10 @@ def get_my_today_services(
 ):
     """
     Get all services for current technician for today
-    Includes both scheduled and ad-hoc services
+    Includes both scheduled and ad-hoc services, plus open services
+    carried over from earlier days
+
+    Served from the technician_agenda index keyed by (technician_id, day)
     """
 
     if current_user.role != "technician":
@@ -215,42 +283,30 @@ def get_my_today_services(
 
     today = datetime.now().date()
 
-    # Get all services where current technician is assigned (using new many-to-many relationship)
-    # First get all service_ids where this technician is assigned
-    assigned_service_ids = db.query(ServiceTechnician.service_id).filter(
-        ServiceTechnician.technician_id == current_user.id
-    ).all()
-    assigned_service_ids = [sid[0] for sid in assigned_service_ids]
-
-    # Get all services (scheduled + ad-hoc) where technician is assigned
-    services = db.query(ServiceSchedule).filter(
-        ServiceSchedule.id.in_(assigned_service_ids),
-        ServiceSchedule.status.in_([
-            ServiceStatus.PENDING,
-            ServiceStatus.SCHEDULED,
-            ServiceStatus.IN_PROGRESS
-        ])
-    ).all()
+    # Read this technician's open agenda up to today
+    services = db.query(ServiceSchedule).options(
+        *service_schedule_load_options()
+    ).join(
+        TechnicianAgenda, TechnicianAgenda.service_id == ServiceSchedule.id
+    ).filter(
+        TechnicianAgenda.technician_id == current_user.id,
+        TechnicianAgenda.day <= today,
+    ).order_by(TechnicianAgenda.day, ServiceSchedule.scheduled_date).all()
 
     result = []
     for service in services:
-        customer = db.query(Customer).filter(Customer.id == service.customer_id).first()
+        customer = service.customer
 
         # Get all assigned technicians for this service
-        assignments = db.query(ServiceTechnician).filter(
-            ServiceTechnician.service_id == service.id
-        ).order_by(ServiceTechnician.order).all()
-
-        assigned_techs = []
-        for assignment in assignments:
-            tech = db.query(User).filter(User.id == assignment.technician_id).first()
-            if tech:
-                assigned_techs.append({
-                    "id": tech.id,
-                    "name": tech.name,
-                    "is_primary": assignment.is_primary,
-                    "is_me": (tech.id == current_user.id)
-                })
+        assigned_techs = [
+            {
+                "id": assignment.technician.id,
+                "name": assignment.technician.name,
+                "is_primary": assignment.is_primary,
+                "is_me": (assignment.technician.id == current_user.id)
+            }
+            for assignment in get_service_assignments(service)
+        ]
 
         result.append({
             "id": service.id,
@@ -290,19 +346,20 @@ def get_service_history(
             detail="Only technicians can access this endpoint"
         )
 
-    services = db.query(ServiceSchedule).join(Customer).filter(
+    services = db.query(ServiceSchedule).options(
+        joinedload(ServiceSchedule.customer),
+        selectinload(ServiceSchedule.reports),
+    ).filter(
         ServiceSchedule.technician_id == current_user.id,
         ServiceSchedule.status == ServiceStatus.COMPLETED
     ).order_by(ServiceSchedule.actual_date.desc()).offset(skip).limit(limit).all()
 
     result = []
     for service in services:
-        customer = db.query(Customer).filter(Customer.id == service.customer_id).first()
+        customer = service.customer
 
         # Get report for this service
-        report = db.query(ServiceReport).filter(
-            ServiceReport.service_id == service.id
-        ).first()
+        report = service.reports[0] if service.reports else None
 
         result.append({
             "service_id": service.service_id,
@@ -333,6 +390,7 @@ def get_available_tickets(
     - Partially assigned (can accommodate more technicians)
 
     Excludes tickets that current technician is already assigned to
+    Filtering and ordering run in SQL so every page comes back full
     """
 
     if current_user.role != "technician":
@@ -341,40 +399,47 @@ def get_available_tickets(
             detail="Only technicians can access this endpoint"
         )
 
-    # Get all pending/scheduled services
-    available_services = db.query(ServiceSchedule).filter(
+    # Tickets the current technician already holds
+    already_assigned = exists().where(
+        ServiceTechnician.service_id == ServiceSchedule.id,
+        ServiceTechnician.technician_id == current_user.id,
+    )
+
+    # Number of technicians already on each ticket
+    assignment_count = (
+        select(func.count(ServiceTechnician.id))
+        .where(ServiceTechnician.service_id == ServiceSchedule.id)
+        .correlate(ServiceSchedule)
+        .scalar_subquery()
+    )
+
+    # Get pending/scheduled services with room for another technician
+    available_services = db.query(ServiceSchedule).options(*service_schedule_load_options()).filter(
         ServiceSchedule.status.in_([
             ServiceStatus.PENDING,
             ServiceStatus.SCHEDULED
-        ])
+        ]),
+        ~already_assigned,
+        assignment_count < MAX_TECHNICIANS_PER_TICKET,
+    ).order_by(
+        ServiceSchedule.scheduled_date,
+        ServiceSchedule.id,
     ).offset(skip).limit(limit).all()
 
     result = []
     for service in available_services:
-        # Get all assigned technicians for this service
-        assignments = db.query(ServiceTechnician).filter(
-            ServiceTechnician.service_id == service.id
-        ).all()
-
-        # Check if current user is already assigned
-        already_assigned = any(a.technician_id == current_user.id for a in assignments)
-
-        if already_assigned:
-            continue  # Skip tickets already assigned to this technician
-
         # Get customer info
-        customer = db.query(Customer).filter(Customer.id == service.customer_id).first()
+        customer = service.customer
 
         # Get assigned technician names
-        assigned_techs = []
-        for assignment in assignments:
-            tech = db.query(User).filter(User.id == assignment.technician_id).first()
-            if tech:
-                assigned_techs.append({
-                    "id": tech.id,
-                    "name": tech.name,
-                    "is_primary": assignment.is_primary
-                })
+        assigned_techs = [
+            {
+                "id": assignment.technician.id,
+                "name": assignment.technician.name,
+                "is_primary": assignment.is_primary
+            }
+            for assignment in get_service_assignments(service)
+        ]
 
         result.append({
             "id": service.id,
@@ -404,6 +469,8 @@ def pick_ticket(
     """
     Allow technician to pick/claim a ticket
     Adds the current technician to the service assignment list
+    The service row is version-checked, so simultaneous picks cannot
+    exceed MAX_TECHNICIANS_PER_TICKET (the loser gets a 409)
     """
 
     if current_user.role != "technician":
@@ -437,6 +504,15 @@ def pick_ticket(
         ServiceTechnician.service_id == service_id
     ).count()
 
+    if current_assignments >= MAX_TECHNICIANS_PER_TICKET:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {MAX_TECHNICIANS_PER_TICKET} technicians allowed per ticket"
+        )
+
+    # Claim the service so concurrent picks cannot exceed the limit
+    claim_row(db, service)
+
     # Create new assignment
     assignment = ServiceTechnician(
         id=generate_uuid(),
@@ -457,23 +533,26 @@ def pick_ticket(
     elif current_assignments == 2:
         service.technician3_id = current_user.id
 
+    sync_service_agenda(db, service)
     db.commit()
     db.refresh(assignment)
 
     # Get updated list of all technicians
-    all_assignments = db.query(ServiceTechnician).filter(
+    all_assignments = db.query(ServiceTechnician).options(
+        joinedload(ServiceTechnician.technician)
+    ).filter(
         ServiceTechnician.service_id == service_id
     ).all()
 
-    assigned_techs = []
-    for a in all_assignments:
-        tech = db.query(User).filter(User.id == a.technician_id).first()
-        if tech:
-            assigned_techs.append({
-                "id": tech.id,
-                "name": tech.name,
-                "is_primary": a.is_primary
-            })
+    assigned_techs = [
+        {
+            "id": a.technician.id,
+            "name": a.technician.name,
+            "is_primary": a.is_primary
+        }
+        for a in all_assignments
+        if a.technician
+    ]
 
     return {
         "message": "Successfully picked ticket",
@@ -528,6 +607,8 @@ def unpick_ticket(
     if service.technician3_id == current_user.id:
         service.technician3_id = None
 
+    sync_service_agenda(db, service)
+
     db.commit()
 
     return {
@@ -0,0 +1,110 @@
+"""
+API routers, imported on first use
+Importing every endpoint module (and the schemas, utils and libraries behind
+them) is most of the app's import time, so main.py only registers the table
+below; a router is imported and included when the first request under its
+prefix arrives, or when everything is loaded at once (OpenAPI schema, warm-up)
+"""
+import importlib
+import threading
+from typing import List, Tuple
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+# (endpoint module, prefix under API_V1_STR, tags), in inclusion order;
+# modules sharing a prefix are loaded together
+ROUTERS: List[Tuple[str, str, List[str]]] = [
+    ("auth", "/auth", ["authentication"]),
+    ("customers", "/customers", ["customers"]),
+    ("services", "/services", ["services"]),
+    ("technician_services", "/technician", ["technician-services"]),
+    ("callbacks", "/callbacks", ["callbacks"]),
+    ("repairs", "/repairs", ["repairs"]),
+    ("reports", "/reports", ["reports"]),
+    ("admin_users", "/admin", ["admin-users"]),
+    ("payments", "/payments", ["payments"]),
+    ("complaints", "/complaints", ["complaints"]),
+    ("minor_points", "/minor-points", ["minor-points"]),
+    ("dashboard", "/dashboard", ["dashboard"]),
+    ("advanced_reports", "/reports", ["advanced-reports"]),
+    ("sync", "/sync", ["sync"]),
+]
+
+
+class LazyRouters:
+    """Includes the ROUTERS into an app on demand"""
+
+    def __init__(self, app: FastAPI, api_prefix: str):
+        self.app = app
+        self.api_prefix = api_prefix
+        self._lock = threading.RLock()
+        self._loaded = set()
+        self._prefixes = {}
+        for module, prefix, tags in ROUTERS:
+            self._prefixes.setdefault(api_prefix + prefix, []).append((module, tags))
+
+    @property
+    def all_loaded(self) -> bool:
+        return len(self._loaded) == len(self._prefixes)
+
+    def _load_prefix(self, prefix: str) -> None:
+        if prefix in self._loaded:
+            return
+        with self._lock:
+            if prefix in self._loaded:
+                return
+            for module, tags in self._prefixes[prefix]:
+                endpoints = importlib.import_module(f"app.api.endpoints.{module}")
+                self.app.include_router(endpoints.router, prefix=prefix, tags=tags)
+            self._loaded.add(prefix)
+
+    def unloaded_prefixes(self, path: str) -> List[str]:
+        """Prefixes serving a request path whose routers aren't loaded yet"""
+        if not path.startswith(self.api_prefix) or self.all_loaded:
+            return []
+        return [
+            prefix for prefix in self._prefixes
+            if prefix not in self._loaded and (path == prefix or path.startswith(prefix + "/"))
+        ]
+
+    def load_for_path(self, path: str) -> None:
+        """Load the router(s) serving a request path, if not loaded yet"""
+        for prefix in self.unloaded_prefixes(path):
+            self._load_prefix(prefix)
+
+    def load_all(self) -> None:
+        for prefix in self._prefixes:
+            self._load_prefix(prefix)
+
+
+class LazyRouterMiddleware:
+    """Loads the router for each request's path before routing"""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        # Imports, and waiting for the loader lock held by another request or
+        # the warm-up thread, block: run them in the threadpool, not the loop
+        if scope["type"] in ("http", "websocket") and not self.routers.all_loaded:
+            if scope["path"] == self.routers.app.openapi_url:
+                await run_in_threadpool(self.routers.load_all)
+            elif self.routers.unloaded_prefixes(scope["path"]):
+                await run_in_threadpool(self.routers.load_for_path, scope["path"])
+        await self.app(scope, receive, send)
+
+
+def install_lazy_routers(app: FastAPI, api_prefix: str) -> LazyRouters:
+    routers = LazyRouters(app, api_prefix)
+    app.add_middleware(LazyRouterMiddleware, routers=routers)
+
+    # The OpenAPI schema is built once and cached; make it complete
+    build_openapi = app.openapi
+
+    def openapi():
+        routers.load_all()
+        return build_openapi()
+
+    app.openapi = openapi
+    return routers
@@ -1,3 +1,4 @@
+import os
 from typing import List, Union, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, validator
@@ -34,6 +35,60 @@ class Settings(BaseSettings):
         origins = [i.strip() for i in self.cors_origins_str.split(",") if i.strip()]
         return origins
 
+    # Check-in geofence: distance from the customer site (in meters) beyond
+    # which a check-in is flagged; rejected only when enforcement is on
+    CHECK_IN_GEOFENCE_RADIUS_METERS: int = 300
+    CHECK_IN_GEOFENCE_ENFORCE: bool = False
+
+    # Query profiling: Server-Timing header and per-route stats on every
+    # request; requests running more queries than the budget are logged
+    QUERY_PROFILING_ENABLED: bool = True
+    QUERY_BUDGET_PER_REQUEST: int = 25
+    QUERY_PROFILING_LOG_ALL: bool = False
+
+    # Production server (gunicorn with uvicorn workers, see gunicorn.conf.py)
+    # SERVER_WORKERS=0 starts one worker per CPU core; keep-alive should
+    # outlast the idle timeout of the proxy or tunnel in front of the API.
+    # "auto" loop/HTTP use uvloop/httptools where installed (not on Windows)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 9000
+    SERVER_WORKERS: int = 0
+    SERVER_LOOP: str = "auto"
+    SERVER_HTTP: str = "auto"
+    SERVER_KEEPALIVE_SECONDS: int = 75
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_TIMEOUT_SECONDS: int = 60
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+
+    @property
+    def SERVER_WORKER_COUNT(self) -> int:
+        if self.SERVER_WORKERS > 0:
+            return self.SERVER_WORKERS
+        # One worker per CPU core available to this process
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    @property
+    def RUNNING_WORKER_COUNT(self) -> int:
+        # Workers of the server this process was started by: `run.py --prod`
+        # and gunicorn.conf.py export WEB_CONCURRENCY (which uvicorn --workers
+        # and gunicorn also read); the dev server, plain uvicorn and the tests
+        # run one process
+        return int(os.environ.get("WEB_CONCURRENCY") or 1)
+
+    # Read-through cache for reference data (see app/utils/cache.py)
+    # CACHE_BACKEND: memory (per worker LRU), redis (shared, needs the redis
+    # package and CACHE_REDIS_URL), none, or auto: redis if CACHE_REDIS_URL is
+    # set, else memory when the server runs one worker and none with several
+    # (a worker's LRU would serve other workers' changes late, for up to the
+    # TTL); set it explicitly when starting several workers some other way
+    CACHE_BACKEND: str = "auto"
+    CACHE_REDIS_URL: Optional[str] = None
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: int = 60
+
     # Admin Configuration
     FIRST_SUPERUSER_EMAIL: str
     FIRST_SUPERUSER_PASSWORD: str
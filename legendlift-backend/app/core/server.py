@@ -0,0 +1,18 @@
+"""
+Production server worker
+gunicorn supervises the processes (preload, graceful restarts, max-requests
+recycling); each worker serves the app with uvicorn on the configured event
+loop and HTTP parser (by default uvloop/httptools from uvicorn[standard]
+when installed)
+"""
+from uvicorn.workers import UvicornWorker
+from app.core.config import settings
+
+
+class LegendLiftUvicornWorker(UvicornWorker):
+    """UvicornWorker with the loop and HTTP implementation taken from settings"""
+
+    CONFIG_KWARGS = {
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+    }
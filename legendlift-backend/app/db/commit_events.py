@@ -0,0 +1,63 @@
+"""
+Run callbacks after a commit that wrote to given tables
+Flushes (after_flush) and ORM bulk statements (do_orm_execute) record the
+tables a session writes to; after_commit runs the callbacks registered for
+them, once the data is visible to other sessions. Rolled back transactions
+run nothing. In-memory caches of table data use this instead of mapper
+events, which fire at flush time, before the data is committed.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, List, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Session.info key of the tables written in the current transaction
+PENDING_TABLES_KEY = "pending_commit_tables"
+
+_listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+
+
+def on_commit(table_name: str, callback: Callable[[], None]) -> None:
+    """Call callback() after every commit that wrote to table_name"""
+    _listeners[table_name].append(callback)
+
+
+def pending_tables(session: Session) -> Set[str]:
+    """Watched tables with uncommitted writes in the session"""
+    return session.info.get(PENDING_TABLES_KEY, set())
+
+
+def _mark_pending(session: Session, table_name) -> None:
+    if table_name in _listeners:
+        session.info.setdefault(PENDING_TABLES_KEY, set()).add(table_name)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        _mark_pending(session, getattr(instance, "__tablename__", None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    # ORM-enabled insert()/update()/delete() and Query.update()/delete()
+    # don't go through the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark_pending(orm_execute_state.session, mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_listeners(session):
+    for table_name in sorted(session.info.pop(PENDING_TABLES_KEY, ())):
+        for callback in _listeners[table_name]:
+            callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_tables(session, transaction):
+    # A rolled back transaction changed nothing; savepoints keep the marks
+    # of the enclosing transaction
+    if transaction.parent is None:
+        session.info.pop(PENDING_TABLES_KEY, None)
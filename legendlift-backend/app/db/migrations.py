@@ -0,0 +1,47 @@
+"""
+Helpers for the Alembic revisions in alembic/versions
+Revisions after the baseline also run against databases built by the old
+create_all-at-startup code and migrate_*.py scripts, so tables, columns and
+indexes that already exist are skipped instead of failing the upgrade.
+In offline mode (`alembic upgrade head --sql`) nothing can be inspected, so
+the full DDL is emitted.
+"""
+from typing import Sequence
+import sqlalchemy as sa
+from alembic import op
+
+
+def is_offline() -> bool:
+    return op.get_context().as_sql
+
+
+def has_table(table_name: str) -> bool:
+    if is_offline():
+        return False
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def has_column(table_name: str, column_name: str) -> bool:
+    if is_offline():
+        return False
+    columns = sa.inspect(op.get_bind()).get_columns(table_name)
+    return any(column["name"] == column_name for column in columns)
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence[str], **kw) -> None:
+    """
+    Build an index on a populated table without blocking writes
+    On PostgreSQL this is CREATE INDEX CONCURRENTLY, which can't run inside a
+    transaction, so it runs in an autocommit block. A failed concurrent build
+    leaves an INVALID index behind: drop it and run the upgrade again.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            index_name, table_name, columns,
+            if_not_exists=True, postgresql_concurrently=True, **kw
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""
+Guard against running the migration chain on a database built outside Alembic
+Databases created by the old create_all startup code (or by copying tables
+without stamping) have the tables but no alembic_version row, so
+`alembic upgrade head` would try to create them again from 0001. Run before
+the upgrade:
+
+    python -m app.db.schema_check && alembic upgrade head
+"""
+import sys
+from typing import List
+from sqlalchemy import create_engine, inspect
+from app.core.config import settings
+
+
+def unversioned_tables(engine) -> List[str]:
+    """Tables of a database that has tables but no Alembic version (else [])"""
+    tables = inspect(engine).get_table_names()
+    if "alembic_version" in tables:
+        return []
+    return sorted(tables)
+
+
+def check_versioned(engine) -> None:
+    """Exit with instructions if the database predates Alembic"""
+    tables = unversioned_tables(engine)
+    if not tables:
+        return
+    print(f"❌ The database has tables ({', '.join(tables[:5])}{', ...' if len(tables) > 5 else ''}) "
+          "but no Alembic version, so `alembic upgrade head` would try to create them again.")
+    print("   Adopt it once, then upgrade:")
+    print("   - created by the old create_all startup code: alembic stamp 0001 && alembic upgrade head")
+    print("   - built from the current models (create_all, copy tools): alembic stamp head")
+    sys.exit(1)
+
+
+def main() -> None:
+    engine = create_engine(settings.DATABASE_URL)
+    try:
+        check_versioned(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
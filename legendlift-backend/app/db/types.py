@@ -0,0 +1,115 @@
+"""
+Column types and SQL helpers shared by the models
+JSONDocument stores JSONB on PostgreSQL (JSON elsewhere) and hands out Python
+lists/dicts decoded once by the driver. Older code json.dumps()'d values
+before assigning them, which stored JSON strings inside the JSON column;
+such strings are unwrapped on the way in and out (and repaired in the
+database by the 0009 revision), so callers never parse JSON themselves.
+
+json_array_contains / json_array_contains_item filter on array membership;
+on PostgreSQL they compile to `@>`, which the GIN indexes on the technician
+and material columns serve.
+"""
+import json
+from sqlalchemy import Boolean, JSON, String, bindparam
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+
+def decode_json(value):
+    """Unwrap a value stored as (possibly nested) JSON-encoded strings"""
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            break
+    return value
+
+
+class JSONDocument(TypeDecorator):
+    """
+    JSON column holding a list or dict (document_type)
+    Assigning anything else after unwrapping raises TypeError
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, document_type=None):
+        super().__init__()
+        self.document_type = document_type
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        value = decode_json(value)
+        if value is not None and self.document_type is not None and not isinstance(value, self.document_type):
+            raise TypeError(f"Expected a JSON {self.document_type.__name__}, got {type(value).__name__}")
+        return value
+
+    def process_result_value(self, value, dialect):
+        return decode_json(value)
+
+    def coerce_compared_value(self, op, value):
+        return self
+
+
+class json_array_contains(FunctionElement):
+    """JSON array column has `value` as an element"""
+
+    type = Boolean()
+    inherit_cache = True
+    name = "json_array_contains"
+
+    def __init__(self, column, value):
+        super().__init__(
+            column,
+            bindparam(None, json.dumps([value]), type_=String),
+            bindparam(None, value),
+        )
+
+
+class json_array_contains_item(FunctionElement):
+    """JSON array column has an object whose `key` equals `value`"""
+
+    type = Boolean()
+    inherit_cache = True
+    name = "json_array_contains_item"
+
+    def __init__(self, column, key, value):
+        super().__init__(
+            column,
+            bindparam(None, json.dumps([{key: value}]), type_=String),
+            bindparam(None, f"$.{key}", type_=String),
+            bindparam(None, value),
+        )
+
+
+@compiles(json_array_contains, "postgresql")
+@compiles(json_array_contains_item, "postgresql")
+def _contains_postgresql(element, compiler, **kw):
+    column, document = list(element.clauses)[:2]
+    return f"{compiler.process(column, **kw)} @> CAST({compiler.process(document, **kw)} AS JSONB)"
+
+
+@compiles(json_array_contains)
+def _contains_element(element, compiler, **kw):
+    column, _, value = list(element.clauses)
+    return (
+        f"EXISTS (SELECT 1 FROM json_each({compiler.process(column, **kw)}) AS elements "
+        f"WHERE elements.value = {compiler.process(value, **kw)})"
+    )
+
+
+@compiles(json_array_contains_item)
+def _contains_item(element, compiler, **kw):
+    column, _, path, value = list(element.clauses)
+    return (
+        f"EXISTS (SELECT 1 FROM json_each({compiler.process(column, **kw)}) AS elements "
+        f"WHERE json_extract(elements.value, {compiler.process(path, **kw)}) = {compiler.process(value, **kw)})"
+    )
@@ -1,13 +1,20 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, JSONResponse
 from app.core.config import settings
-from app.api.endpoints import auth, customers, services, technician_services, reports, admin_users, payments, complaints, callbacks, repairs, minor_points, dashboard, advanced_reports
-from app.db.session import engine, Base
+from app.api.routers import install_lazy_routers
+from app.db.session import engine
+from app.utils.location_tracking import location_tracker
+from app.utils.query_profiler import QueryProfilingMiddleware, install_query_profiler
+from app.utils.warmup import warmup
+# Loaded up front even though the routers are lazy: every mapped class must be
+# registered before the first query, and sync's tombstone listeners must be in
+# place before the first delete
+from app import models  # noqa: F401
+from app.utils import sync  # noqa: F401
 from starlette.middleware.base import BaseHTTPMiddleware
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic (`alembic upgrade head`); startup does no DDL
 
 # Middleware to add Bypass-Tunnel-Reminder header for localtunnel
 class LocalTunnelBypassMiddleware(BaseHTTPMiddleware):
@@ -22,9 +29,37 @@ app = FastAPI(
     debug=settings.DEBUG,
 )
 
+# Background writer for buffered technician GPS pings
+@app.on_event("startup")
+def start_location_flusher():
+    location_tracker.start()
+
+
+@app.on_event("shutdown")
+def stop_location_flusher():
+    # Writes whatever is still buffered
+    location_tracker.stop()
+
+
+# Routers, mappers, pool and caches warmed in the background (see /ready)
+@app.on_event("startup")
+def start_warmup():
+    warmup.start(api_routers)
+
+
+@app.on_event("shutdown")
+def stop_warmup():
+    warmup.stop()
+
+
 # Add LocalTunnel bypass middleware
 app.add_middleware(LocalTunnelBypassMiddleware)
 
+# Per-request query count and DB time (Server-Timing header, admin query stats)
+if settings.QUERY_PROFILING_ENABLED:
+    install_query_profiler(engine)
+    app.add_middleware(QueryProfilingMiddleware)
+
 # Set up CORS
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -33,23 +68,11 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["Bypass-Tunnel-Reminder"],
+        expose_headers=["Bypass-Tunnel-Reminder", "Server-Timing"],
     )
 
-# Include routers
-app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["authentication"])
-app.include_router(customers.router, prefix=f"{settings.API_V1_STR}/customers", tags=["customers"])
-app.include_router(services.router, prefix=f"{settings.API_V1_STR}/services", tags=["services"])
-app.include_router(technician_services.router, prefix=f"{settings.API_V1_STR}/technician", tags=["technician-services"])
-app.include_router(callbacks.router, prefix=f"{settings.API_V1_STR}/callbacks", tags=["callbacks"])
-app.include_router(repairs.router, prefix=f"{settings.API_V1_STR}/repairs", tags=["repairs"])
-app.include_router(reports.router, prefix=f"{settings.API_V1_STR}/reports", tags=["reports"])
-app.include_router(admin_users.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin-users"])
-app.include_router(payments.router, prefix=f"{settings.API_V1_STR}/payments", tags=["payments"])
-app.include_router(complaints.router, prefix=f"{settings.API_V1_STR}/complaints", tags=["complaints"])
-app.include_router(minor_points.router, prefix=f"{settings.API_V1_STR}/minor-points", tags=["minor-points"])
-app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}/dashboard", tags=["dashboard"])
-app.include_router(advanced_reports.router, prefix=f"{settings.API_V1_STR}/reports", tags=["advanced-reports"])
+# Routers are imported on the first request under their prefix (or by the warm-up)
+api_routers = install_lazy_routers(app, settings.API_V1_STR)
 
 
 @app.get("/")
@@ -66,6 +89,15 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """503 until the start-up warm-up has finished"""
+    return JSONResponse(
+        status_code=200 if warmup.ready else 503,
+        content=warmup.status(),
+    )
+
+
 @app.get("/favicon.ico")
 def favicon():
     # Return empty response to avoid 404 error
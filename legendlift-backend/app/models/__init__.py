@@ -3,6 +3,7 @@ from app.models.customer import Customer, AMCStatus, ServicesPerYear
 from app.models.contract import AMCContract, ContractType, ServiceFrequency
 from app.models.service import ServiceSchedule, ServiceReport, ServiceStatus, ServiceType
 from app.models.service_technician import ServiceTechnician
+from app.models.technician_agenda import TechnicianAgenda
 from app.models.callback import CallBack, CallBackStatus
 from app.models.repair import Repair, RepairStatus
 from app.models.complaint import Complaint, ComplaintStatus, ComplaintPriority
@@ -11,6 +12,9 @@ from app.models.payment import Payment, PaymentStatus
 from app.models.escalation import Escalation, EscalationPriority, EscalationStatus
 from app.models.counter import SequentialCounter
 from app.models.material_usage import MaterialUsage
+from app.models.idempotency_key import IdempotencyKey
+from app.models.technician_location import TechnicianLocation
+from app.models.sync_tombstone import SyncTombstone
 
 __all__ = [
     "User",
@@ -26,6 +30,7 @@ __all__ = [
     "ServiceStatus",
     "ServiceType",
     "ServiceTechnician",
+    "TechnicianAgenda",
     "CallBack",
     "CallBackStatus",
     "Repair",
@@ -42,4 +47,7 @@ __all__ = [
     "EscalationStatus",
     "SequentialCounter",
     "MaterialUsage",
+    "IdempotencyKey",
+    "TechnicianLocation",
+    "SyncTombstone",
 ]
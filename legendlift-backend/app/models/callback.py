@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from app.db.session import Base
+from app.db.types import JSONDocument
 
 
 class CallBackStatus(str, enum.Enum):
@@ -23,6 +24,19 @@ class LiftStatus(str, enum.Enum):
 
 class CallBack(Base):
     __tablename__ = "callbacks"
+    __table_args__ = (
+        # Delta sync: keyset scan of rows changed since a client's cursor
+        Index("ix_callbacks_updated_at_id", "updated_at", "id"),
+        # Customer callback history and AMC period reports
+        Index("ix_callbacks_customer_id_scheduled_date", "customer_id", "scheduled_date"),
+        # Dashboard: callbacks created in a window, optionally by status
+        Index("ix_callbacks_created_at_status", "created_at", "status"),
+        # Technician membership and material filters (jsonb @>, PostgreSQL only)
+        Index("ix_callbacks_technicians", "technicians", postgresql_using="gin",
+              postgresql_ops={"technicians": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_callbacks_materials_changed", "materials_changed", postgresql_using="gin",
+              postgresql_ops={"materials_changed": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     job_id = Column(String, unique=True, nullable=True, index=True)  # Human-readable Job ID (e.g., CB-20250128-001)
@@ -32,7 +46,7 @@ class CallBack(Base):
     status = Column(Enum(CallBackStatus), nullable=False, default=CallBackStatus.PENDING, index=True)
     description = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
-    technicians = Column(JSON, nullable=True)  # Array of technician IDs (max 3)
+    technicians = Column(JSONDocument(list), nullable=True)  # Array of technician IDs (max 3)
     responded_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
@@ -41,8 +55,8 @@ class CallBack(Base):
     customer_reporting_person = Column(String, nullable=True)
     problem_solved = Column(Text, nullable=True)
     report_attachment_url = Column(String, nullable=True)  # DEPRECATED: Use completion_images instead
-    completion_images = Column(JSON, nullable=True)  # Array of image URLs uploaded by technician on completion
-    materials_changed = Column(JSON, nullable=True)  # Array of materials
+    completion_images = Column(JSONDocument(list), nullable=True)  # Array of image URLs uploaded by technician on completion
+    materials_changed = Column(JSONDocument(list), nullable=True)  # Array of {name, quantity}
     lift_status_on_closure = Column(Enum(LiftStatus), nullable=True)
     requires_followup = Column(String, nullable=True, default="false")  # "true" if closed with error
 
@@ -53,6 +67,7 @@ class CallBack(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped by claims (app.utils.claims)
 
     # Relationships
     customer = relationship("Customer", foreign_keys=[customer_id])
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Boolean, Column, String, DateTime, Enum, Text, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -21,6 +21,14 @@ class ComplaintPriority(str, enum.Enum):
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    __table_args__ = (
+        # Delta sync: keyset scan of rows changed since a client's cursor
+        Index("ix_complaints_updated_at_id", "updated_at", "id"),
+        # Technician's assigned complaints; unassigned open ones (assigned_to_id IS NULL)
+        Index("ix_complaints_assigned_to_id_status", "assigned_to_id", "status"),
+        # Customer's complaints, newest first
+        Index("ix_complaints_customer_id_created_at", "customer_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     complaint_id = Column(String, unique=True, nullable=False, index=True)  # e.g., "COMP-001"
@@ -36,6 +44,7 @@ class Complaint(Base):
     resolution_notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped by claims (app.utils.claims)
 
     # Relationships
     customer = relationship("Customer", back_populates="complaints")
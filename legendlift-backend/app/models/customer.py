@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Date, Enum, Boolean, Numeric
+from sqlalchemy import Column, String, Integer, Float, DateTime, Date, Enum, Boolean, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,6 +19,10 @@ class ServicesPerYear(int, enum.Enum):
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Delta sync: keyset scan of rows changed since a client's cursor
+        Index("ix_customers_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     job_number = Column(String, unique=True, index=True, nullable=False)
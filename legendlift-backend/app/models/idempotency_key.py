@@ -0,0 +1,26 @@
+"""
+Idempotency keys for retry-safe mobile requests
+Stores the response of the first successful request per (user, key)
+so a retried request returns the same result instead of repeating the work
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from datetime import datetime
+from app.db.session import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response recorded for a client-supplied Idempotency-Key header
+    Written in the same transaction as the work it protects
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    key = Column(String, nullable=False)  # Client-generated key, e.g. a UUID per check-in attempt
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    endpoint = Column(String, nullable=False)  # e.g. technician/check-in
+    response = Column(JSON, nullable=False)  # Response body returned to the client
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
@@ -6,6 +6,12 @@ from app.db.session import Base
 
 class MaterialUsage(Base):
     __tablename__ = "material_usage"
+    __table_args__ = (
+        # Customer material/cost reports over a period
+        Index("ix_material_usage_customer_id_used_date", "customer_id", "used_date"),
+        # Consumption report: period aggregates grouped by material
+        Index("ix_material_usage_used_date_material_name", "used_date", "material_name"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     service_id = Column(String, ForeignKey("service_schedules.id"), nullable=True, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Enum, ForeignKey, Text
+from sqlalchemy import Column, String, Float, DateTime, Enum, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,6 +14,10 @@ class PaymentStatus(str, enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Customer payments by due date (payment list, AMC period reports)
+        Index("ix_payments_customer_id_due_date", "customer_id", "due_date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     customer_id = Column(String, ForeignKey("customers.id"), nullable=False, index=True)
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, JSON, ForeignKey, Numeric
+from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, Numeric, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from app.db.session import Base
+from app.db.types import JSONDocument
 
 
 class RepairStatus(str, enum.Enum):
@@ -14,6 +15,19 @@ class RepairStatus(str, enum.Enum):
 
 class Repair(Base):
     __tablename__ = "repairs"
+    __table_args__ = (
+        # Delta sync: keyset scan of rows changed since a client's cursor
+        Index("ix_repairs_updated_at_id", "updated_at", "id"),
+        # Customer repairs in an AMC period, ordered by creation
+        Index("ix_repairs_customer_id_created_at", "customer_id", "created_at"),
+        # Dashboard: repairs created in a window, optionally by status
+        Index("ix_repairs_created_at_status", "created_at", "status"),
+        # Technician membership and material filters (jsonb @>, PostgreSQL only)
+        Index("ix_repairs_technicians", "technicians", postgresql_using="gin",
+              postgresql_ops={"technicians": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_repairs_materials_used", "materials_used", postgresql_using="gin",
+              postgresql_ops={"materials_used": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     customer_id = Column(String, ForeignKey("customers.id"), nullable=True, index=True)  # Nullable for non-customers
@@ -27,14 +41,14 @@ class Repair(Base):
     status = Column(Enum(RepairStatus), nullable=False, default=RepairStatus.PENDING, index=True)
     description = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
-    technicians = Column(JSON, nullable=True)  # Array of technician IDs (unlimited)
+    technicians = Column(JSONDocument(list), nullable=True)  # Array of technician IDs (unlimited)
 
     # Repair details
     repair_type = Column(String, nullable=True)
     work_done = Column(Text, nullable=True)
-    materials_used = Column(JSON, nullable=True)  # Array of materials
-    before_images = Column(JSON, nullable=True)
-    after_images = Column(JSON, nullable=True)
+    materials_used = Column(JSONDocument(list), nullable=True)  # Array of {name, quantity}
+    before_images = Column(JSONDocument(list), nullable=True)
+    after_images = Column(JSONDocument(list), nullable=True)
     customer_approved = Column(String, nullable=True, default="false")
 
     # Cost tracking
@@ -49,6 +63,7 @@ class Repair(Base):
     completed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped by claims (app.utils.claims)
 
     # Relationships
     customer = relationship("Customer", foreign_keys=[customer_id])
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Text, Integer, JSON, Boolean
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Text, Integer, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from app.db.session import Base
+from app.db.types import JSONDocument
 
 
 class ServiceStatus(str, enum.Enum):
@@ -21,6 +22,18 @@ class ServiceType(str, enum.Enum):
 
 class ServiceSchedule(Base):
     __tablename__ = "service_schedules"
+    __table_args__ = (
+        # Available-tickets feed: filter by status, order by scheduled date
+        Index("ix_service_schedules_status_scheduled_date", "status", "scheduled_date"),
+        # Customer service history and AMC period reports
+        Index("ix_service_schedules_customer_id_scheduled_date", "customer_id", "scheduled_date"),
+        # Technician's own services by status (check-in lookup, completed history)
+        Index("ix_service_schedules_technician_id_status", "technician_id", "status"),
+        # Dashboard and monthly reports: created in a window, optionally by status
+        Index("ix_service_schedules_created_at_status", "created_at", "status"),
+        # Delta sync: keyset scan of rows changed since a client's cursor
+        Index("ix_service_schedules_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     service_id = Column(String, unique=True, nullable=False, index=True)  # Human-readable ID: SRV-20241009-A3F8K
@@ -40,6 +53,7 @@ class ServiceSchedule(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped by claims (app.utils.claims)
 
     # Relationships
     contract = relationship("AMCContract", back_populates="services")
@@ -55,6 +69,12 @@ class ServiceSchedule(Base):
 
 class ServiceReport(Base):
     __tablename__ = "service_reports"
+    __table_args__ = (
+        # Reports of a service, newest first
+        Index("ix_service_reports_service_id_created_at", "service_id", "created_at"),
+        # Dashboard: reports created in the last 30 days
+        Index("ix_service_reports_created_at", "created_at"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     report_id = Column(String, unique=True, nullable=False, index=True)  # Human-readable ID: RPT-20241009-D2L7Q
@@ -62,11 +82,11 @@ class ServiceReport(Base):
     technician_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     check_in_time = Column(DateTime, nullable=False)
     check_out_time = Column(DateTime, nullable=True)
-    check_in_location = Column(JSON, nullable=True)  # {"latitude": float, "longitude": float}
-    check_out_location = Column(JSON, nullable=True)
+    check_in_location = Column(JSONDocument(dict), nullable=True)  # {"latitude": float, "longitude": float}
+    check_out_location = Column(JSONDocument(dict), nullable=True)
     work_done = Column(Text, nullable=False)
-    parts_replaced = Column(JSON, nullable=True)  # Array of strings
-    images = Column(JSON, nullable=True)  # Array of image URLs
+    parts_replaced = Column(JSONDocument(list), nullable=True)  # Array of strings
+    images = Column(JSONDocument(list), nullable=True)  # Array of image URLs
     customer_signature = Column(String, nullable=True)  # Image URL
     technician_signature = Column(String, nullable=True)  # Image URL
     customer_feedback = Column(Text, nullable=True)
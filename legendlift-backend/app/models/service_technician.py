@@ -2,7 +2,7 @@
 Association table for many-to-many relationship between services and technicians
 Allows multiple technicians to be assigned to a single service/ticket
 """
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
@@ -14,6 +14,10 @@ class ServiceTechnician(Base):
     Tracks which technicians are assigned to which tickets
     """
     __tablename__ = "service_technicians"
+    __table_args__ = (
+        # Membership and capacity checks for the available-tickets feed
+        Index("ix_service_technicians_service_technician", "service_id", "technician_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     service_id = Column(String, ForeignKey("service_schedules.id"), nullable=False, index=True)
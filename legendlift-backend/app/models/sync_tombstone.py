@@ -0,0 +1,27 @@
+"""
+Tombstones for the delta-sync endpoint
+One row per deleted customer, service, callback, repair or complaint, written
+in the deleting transaction so offline clients can drop their local copy.
+Rows with a user_id only left that user's view (a technician taken off a
+service) and are only sent to that user.
+"""
+from sqlalchemy import Column, String, DateTime, Index
+from datetime import datetime
+from app.db.session import Base
+
+
+class SyncTombstone(Base):
+    """
+    Record of a deleted row
+    Scanned by (deleted_at, id) like the updated_at scans of live rows
+    """
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_deleted_at_id", "deleted_at", "id"),
+    )
+
+    id = Column(String, primary_key=True)
+    entity = Column(String, nullable=False)  # Sync entity name, e.g. customers, services
+    entity_id = Column(String, nullable=False)  # Primary key of the deleted row
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    user_id = Column(String, nullable=True)  # Set when the row was only hidden from this user
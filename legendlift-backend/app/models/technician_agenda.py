@@ -0,0 +1,36 @@
+"""
+Per-technician, per-day agenda index
+One row per open service a technician is assigned to, keyed by (technician_id, day)
+Maintained on assignment and status changes so the morning board is one indexed read
+"""
+from sqlalchemy import Column, String, Date, DateTime, Enum, ForeignKey, Boolean, Integer, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.session import Base
+from app.models.service import ServiceStatus
+
+
+class TechnicianAgenda(Base):
+    """
+    Agenda entry for a technician on a given day
+    Only services in an open status (pending, scheduled, in progress) have entries
+    """
+    __tablename__ = "technician_agenda"
+    __table_args__ = (
+        Index("ix_technician_agenda_technician_day", "technician_id", "day"),
+        UniqueConstraint("technician_id", "service_id", name="uq_technician_agenda_technician_service"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    technician_id = Column(String, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)  # Scheduled day (or visit day for ad-hoc services)
+    service_id = Column(String, ForeignKey("service_schedules.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(Enum(ServiceStatus), nullable=False)
+    is_primary = Column(Boolean, default=False)
+    order = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    service = relationship("ServiceSchedule")
+    technician = relationship("User", foreign_keys=[technician_id])
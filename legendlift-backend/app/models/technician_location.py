@@ -0,0 +1,33 @@
+"""
+Technician GPS location history
+Append-only: pings are buffered in memory and bulk inserted by the location
+flusher (app/utils/location_tracking.py), never updated afterwards
+On PostgreSQL the table is range-partitioned by month on recorded_at
+"""
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index
+from datetime import datetime
+from app.db.session import Base
+
+
+class TechnicianLocation(Base):
+    """
+    One GPS sample reported by a technician's device
+    The partition key is part of the primary key, as PostgreSQL requires
+    """
+    __tablename__ = "technician_locations"
+    __table_args__ = (
+        Index("ix_technician_locations_technician_recorded", "technician_id", "recorded_at"),
+        Index("ix_technician_locations_callback_recorded", "callback_id", "recorded_at"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+    id = Column(String, primary_key=True)
+    recorded_at = Column(DateTime, primary_key=True)  # Device time of the fix (UTC)
+    technician_id = Column(String, ForeignKey("users.id"), nullable=False)
+    callback_id = Column(String, ForeignKey("callbacks.id"), nullable=True)  # Job the technician is travelling to
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    accuracy = Column(Float, nullable=True)  # Meters
+    speed = Column(Float, nullable=True)  # Meters per second, as reported by the device
+    heading = Column(Float, nullable=True)  # Degrees from north
+    received_at = Column(DateTime, default=datetime.utcnow)
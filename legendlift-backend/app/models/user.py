@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, DateTime, Enum
+from sqlalchemy import Boolean, Column, String, DateTime, Enum, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -20,6 +20,7 @@ class User(Base):
     phone = Column(String, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False)
+    customer_id = Column(String, ForeignKey("customers.id"), nullable=True)  # Customer accounts: the company they belong to
     profile_image = Column(String, nullable=True)
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,77 @@
+"""
+Technician agenda maintenance
+Keeps the technician_agenda index in sync with service assignments and status
+"""
+from datetime import datetime, date
+from sqlalchemy.orm import Session
+from app.models.service import ServiceSchedule, ServiceStatus
+from app.models.service_technician import ServiceTechnician
+from app.models.technician_agenda import TechnicianAgenda
+from app.utils.id_generator import generate_uuid
+
+# Service columns that assign technicians without a service_technicians row
+# (services created or edited through the single/double technician fields)
+LEGACY_TECHNICIAN_COLUMNS = ("technician_id", "technician2_id", "technician3_id")
+
+# Services in these statuses appear on a technician's board
+OPEN_SERVICE_STATUSES = [
+    ServiceStatus.PENDING,
+    ServiceStatus.SCHEDULED,
+    ServiceStatus.IN_PROGRESS,
+]
+
+
+def get_agenda_day(service: ServiceSchedule) -> date:
+    """
+    Day a service belongs to on the agenda
+    Scheduled services use their scheduled date, ad-hoc services their visit date
+    """
+    if service.scheduled_date:
+        return service.scheduled_date.date()
+    if service.actual_date:
+        return service.actual_date.date()
+    return datetime.now().date()
+
+
+def sync_service_agenda(db: Session, service: ServiceSchedule) -> None:
+    """
+    Rebuild agenda entries for a single service
+    Technicians come from its service_technicians rows and from the legacy
+    technician columns, for services assigned only through those
+
+    Call after changing a service's assignments, status or scheduled date,
+    before committing, so the agenda is updated in the same transaction.
+    """
+    # Make pending assignment changes visible to the queries below
+    db.flush()
+
+    db.query(TechnicianAgenda).filter(
+        TechnicianAgenda.service_id == service.id
+    ).delete(synchronize_session=False)
+
+    if service.status not in OPEN_SERVICE_STATUSES:
+        return
+
+    assignments = db.query(ServiceTechnician).filter(
+        ServiceTechnician.service_id == service.id
+    ).all()
+
+    # technician_id -> (is_primary, order)
+    entries = {assignment.technician_id: (assignment.is_primary, assignment.order) for assignment in assignments}
+    has_primary = any(is_primary for is_primary, _ in entries.values())
+    for order, column in enumerate(LEGACY_TECHNICIAN_COLUMNS):
+        technician_id = getattr(service, column)
+        if technician_id and technician_id not in entries:
+            entries[technician_id] = (order == 0 and not has_primary, order)
+
+    day = get_agenda_day(service)
+    for technician_id, (is_primary, order) in entries.items():
+        db.add(TechnicianAgenda(
+            id=generate_uuid(),
+            technician_id=technician_id,
+            day=day,
+            service_id=service.id,
+            status=service.status,
+            is_primary=is_primary,
+            order=order,
+        ))
@@ -0,0 +1,263 @@
+"""
+Read-through cache for reference data (technician pickers, customer
+dropdowns, customer/user names in listings)
+
+Entries are tagged with the tables they were read from and stored under a
+key that embeds the current version of each table. Committing a session that
+wrote to a cached table bumps that table's version (SQLAlchemy after_commit),
+so every entry read from it is skipped from then on and ages out of the LRU;
+nothing is ever served from before the last commit. Versions are read before
+loading, so a load that races a commit is stored under the old version.
+Sessions with uncommitted writes to a table read it from the database.
+
+The backend is pluggable: an in-process LRU, or any client with Redis
+GET/SET/INCR/MGET semantics (CACHE_BACKEND=redis). In-process versions are
+per worker, so a worker only sees other workers' changes once its entries
+expire (CACHE_TTL_SECONDS); the default (auto) therefore only caches in
+process when the server runs a single worker (settings.RUNNING_WORKER_COUNT). With a shared backend changes
+are seen immediately.
+
+Versions are kept per table rather than per row: commits are tracked per
+table (app.db.commit_events), and bulk statements don't say which rows they
+touched, so a write retires every entry read from the table.
+
+Cached values are shared between requests and must not be mutated.
+"""
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.commit_events import on_commit, pending_tables
+
+logger = logging.getLogger("legendlift.cache")
+
+# Tables whose commits invalidate cache entries
+CACHED_TABLES = ("users", "customers")
+
+
+class CacheBackend:
+    """
+    Storage interface
+    Keys are strings; set_many entries expire after ttl seconds, version
+    counters (incr) never expire
+    """
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Values of the keys that are present"""
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU of at most max_entries values"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Kept apart from the LRU: an evicted version would restart at 0 and
+        # make old entries current again
+        self._counters = {}
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend over a Redis-compatible client (redis.Redis or a stand-in with
+    get/set(ex=)/incr/mget); values are pickled, so only point it at a
+    server this API trusts. Version keys have no expiry and must not be
+    evicted (use a noeviction or volatile-* maxmemory policy)
+    """
+
+    def __init__(self, client, prefix: str = "legendlift:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        values = self.client.mget([self.prefix + key for key in keys])
+        return {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        for key, value in items.items():
+            self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def get_counter(self, key: str) -> int:
+        value = self.client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+class NullCacheBackend(CacheBackend):
+    """Caching disabled: every read goes to the database"""
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        return {}
+
+    def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        pass
+
+    def get_counter(self, key: str) -> int:
+        return 0
+
+    def incr(self, key: str) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+
+def backend_name() -> str:
+    """CACHE_BACKEND with auto resolved for this deployment"""
+    if settings.CACHE_BACKEND != "auto":
+        return settings.CACHE_BACKEND
+    if settings.CACHE_REDIS_URL:
+        return "redis"
+    return "memory" if settings.RUNNING_WORKER_COUNT == 1 else "none"
+
+
+def create_backend() -> CacheBackend:
+    """Backend selected by CACHE_BACKEND (auto, memory, redis or none)"""
+    name = backend_name()
+    if name == "none":
+        return NullCacheBackend()
+    if name == "redis":
+        # Optional dependency, only needed for a shared cache
+        import redis
+
+        return RedisCacheBackend(redis.Redis.from_url(settings.CACHE_REDIS_URL))
+    if name != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    if settings.RUNNING_WORKER_COUNT > 1:
+        logger.warning(
+            "CACHE_BACKEND=memory with %d workers: changes made through one worker "
+            "can be served stale by the others for up to %ds",
+            settings.RUNNING_WORKER_COUNT, settings.CACHE_TTL_SECONDS,
+        )
+    return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+
+
+class ReadThroughCache:
+    """Versioned read-through cache over a backend"""
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _versioned_prefix(self, key: str, tables: Sequence[str]) -> str:
+        versions = ",".join(f"{table}.{self.backend.get_counter('version:' + table)}" for table in tables)
+        return f"{key}@{versions}"
+
+    @staticmethod
+    def _bypass(db: Session, tables: Sequence[str]) -> bool:
+        pending = pending_tables(db)
+        return any(table in pending for table in tables)
+
+    def get_or_load(self, db: Session, key: str, tables: Sequence[str], loader: Callable[[], Any]) -> Any:
+        """Cached value of key, calling loader() (which reads tables) on a miss"""
+        if self._bypass(db, tables):
+            return loader()
+        versioned_key = self._versioned_prefix(key, tables)
+        found = self.backend.get_many([versioned_key])
+        if versioned_key in found:
+            return found[versioned_key]
+        value = loader()
+        self.backend.set_many({versioned_key: value}, self.ttl)
+        return value
+
+    def get_many_or_load(
+        self,
+        db: Session,
+        key: str,
+        ids: Iterable[str],
+        tables: Sequence[str],
+        loader: Callable[[list], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Cached values of key per id, calling loader(missing ids) -> {id: value}
+        once for the misses; ids the loader doesn't return are left out
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+        if self._bypass(db, tables):
+            return loader(ids)
+        prefix = self._versioned_prefix(key, tables)
+        found = self.backend.get_many([f"{prefix}:{id_}" for id_ in ids])
+        values = {id_: found[f"{prefix}:{id_}"] for id_ in ids if f"{prefix}:{id_}" in found}
+        missing = [id_ for id_ in ids if id_ not in values]
+        if missing:
+            loaded = loader(missing)
+            self.backend.set_many({f"{prefix}:{id_}": value for id_, value in loaded.items()}, self.ttl)
+            values.update(loaded)
+        return values
+
+    def invalidate(self, *tables: str) -> None:
+        """Retire every entry read from the tables"""
+        for table in tables:
+            self.backend.incr("version:" + table)
+
+
+cache = ReadThroughCache(create_backend(), settings.CACHE_TTL_SECONDS)
+
+
+for _table in CACHED_TABLES:
+    on_commit(_table, lambda table=_table: cache.invalidate(table))
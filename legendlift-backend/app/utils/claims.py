@@ -0,0 +1,111 @@
+"""
+Claim engine for tickets, callbacks, repairs and complaints
+Makes technician self-assignment race-free:
+- Complaints are claimed with a conditional UPDATE ... WHERE assigned_to_id IS NULL
+- Callbacks, repairs and services carry a version column; a claim bumps it
+  with UPDATE ... WHERE id = :id AND version = :read_version before writing,
+  so a concurrent claim that read stale data fails with 409 instead of
+  overwriting the other technician's assignment
+
+Only claims check the version; other edits of these rows (admin updates,
+status changes, reports) are written as before.
+"""
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.db.types import decode_json
+from app.models.complaint import Complaint, ComplaintStatus
+
+CLAIM_CONFLICT_DETAIL = "This job was just updated by another technician. Please refresh and try again"
+
+
+def parse_technician_ids(value) -> List[str]:
+    """
+    Copy a technicians JSON column into a new list of IDs
+    Still tolerates double-encoded JSON strings from before the 0009 revision
+    """
+    technicians = decode_json(value)
+    return list(technicians) if isinstance(technicians, list) else []
+
+
+def claim_row(db: Session, row) -> None:
+    """
+    Bump the version of a row read in this session
+    Call before changing the row; if another claim changed it since it was
+    read, rolls back and raises a 409. The row stays locked until commit on
+    databases with row locks, so concurrent claims queue behind this one.
+    """
+    model = type(row)
+    now = datetime.utcnow()
+    result = db.execute(
+        update(model)
+        .where(model.id == row.id, model.version == row.version)
+        .values(version=model.version + 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=CLAIM_CONFLICT_DETAIL
+        )
+    set_committed_value(row, "version", row.version + 1)
+    set_committed_value(row, "updated_at", now)
+
+
+def add_technician_to_job(
+    db: Session,
+    row,
+    technician_id: str,
+    job_label: str,
+    max_technicians: Optional[int] = None,
+) -> List[str]:
+    """
+    Add a technician to a callback/repair technicians list
+    The row is claimed first (claim_row), so a concurrent claim that read the
+    same list gets a 409 instead of overwriting this one.
+    """
+    technicians = parse_technician_ids(row.technicians)
+
+    if technician_id in technicians:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"You are already assigned to this {job_label}"
+        )
+
+    if max_technicians is not None and len(technicians) >= max_technicians:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {max_technicians} technicians allowed per {job_label}"
+        )
+
+    claim_row(db, row)
+    technicians.append(technician_id)
+    row.technicians = technicians
+    return technicians
+
+
+def claim_complaint(db: Session, complaint_id: str, technician_id: str) -> bool:
+    """
+    Atomically assign an unassigned complaint to a technician
+    Returns True if this technician won the claim
+    """
+    claimed = db.execute(
+        update(Complaint)
+        .where(
+            Complaint.id == complaint_id,
+            Complaint.assigned_to_id.is_(None),
+        )
+        .values(
+            assigned_to_id=technician_id,
+            status=ComplaintStatus.IN_PROGRESS,
+            updated_at=datetime.utcnow(),
+            version=Complaint.version + 1,
+        )
+        .returning(Complaint.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return claimed is not None
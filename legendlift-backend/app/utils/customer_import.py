@@ -0,0 +1,373 @@
+"""
+Customer bulk import from route charts and customer sheets
+Reads xlsx (openpyxl read-only), xlsb (pyxlsb) or csv row by row, maps the
+spreadsheet headers to customer fields and validates rows in batches
+"""
+import csv
+import io
+import re
+import uuid
+import zipfile
+from datetime import datetime, date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterator, List, Optional, Tuple
+from dateutil.relativedelta import relativedelta
+from pydantic import ValidationError
+from app.models.service import ServiceStatus, ServiceType
+from app.schemas.customer import CustomerCreate
+
+# Allowed values for services_per_year (same rule as create_customer)
+VALID_SERVICES_PER_YEAR = [6, 9, 10, 12]
+
+# Rows scanned for the header row (route charts have a summary row above it)
+HEADER_SCAN_ROWS = 20
+
+# Normalized spreadsheet header -> customer field
+HEADER_ALIASES = {
+    "job no": "job_number",
+    "job no.": "job_number",
+    "job number": "job_number",
+    "job_number": "job_number",
+    "customer name": "name",
+    "customer": "name",
+    "name": "name",
+    "site name": "site_name",
+    "site_name": "site_name",
+    "area": "area",
+    "address": "address",
+    "contact person": "contact_person",
+    "contact_person": "contact_person",
+    "phone": "phone",
+    "mobile": "phone",
+    "phone no": "phone",
+    "contact number": "contact_number",
+    "contact_number": "contact_number",
+    "contact no": "contact_number",
+    "email": "email",
+    "latitude": "latitude",
+    "lat": "latitude",
+    "longitude": "longitude",
+    "lng": "longitude",
+    "long": "longitude",
+    "route": "route",
+    "service start date": "amc_valid_from",
+    "amc valid from": "amc_valid_from",
+    "amc_valid_from": "amc_valid_from",
+    "amc start date": "amc_valid_from",
+    "service end date": "amc_valid_to",
+    "amc valid to": "amc_valid_to",
+    "amc_valid_to": "amc_valid_to",
+    "amc end date": "amc_valid_to",
+    "service": "services_per_year",
+    "services per year": "services_per_year",
+    "services_per_year": "services_per_year",
+    "amc amount": "amc_amount",
+    "amc_amount": "amc_amount",
+    "amc amount received": "amc_amount_received",
+    "amc_amount_received": "amc_amount_received",
+    "amc status": "amc_status",
+    "amc_status": "amc_status",
+    "amc type": "amc_type",
+    "amc_type": "amc_type",
+    "door type": "door_type",
+    "door_type": "door_type",
+    "controller type": "controller_type",
+    "controller_type": "controller_type",
+    "no of floors": "number_of_floors",
+    "number of floors": "number_of_floors",
+    "number_of_floors": "number_of_floors",
+    "floors": "number_of_floors",
+}
+
+DATE_FIELDS = {"amc_valid_from", "amc_valid_to"}
+INTEGER_FIELDS = {"route", "services_per_year", "number_of_floors"}
+FLOAT_FIELDS = {"latitude", "longitude"}
+DECIMAL_FIELDS = {"amc_amount", "amc_amount_received"}
+
+# Route chart AMC status column -> AMCStatus
+INACTIVE_AMC_STATUSES = {"closed", "inactive", "expired", "cancelled"}
+
+TEXT_DATE_FORMATS = ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%d-%b-%Y", "%d %b %Y"]
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be read as a customer sheet"""
+
+
+# Errors the readers raise on a corrupt or mislabelled upload (openpyxl
+# raises KeyError for a zip without the workbook parts)
+UNREADABLE_FILE_ERRORS = (zipfile.BadZipFile, UnicodeDecodeError, KeyError, csv.Error)
+
+
+def normalize_header(value) -> str:
+    """Lowercase and collapse whitespace/newlines in a header cell"""
+    if value is None:
+        return ""
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+# ---------------------------------------------------------------------------
+# Readers - each yields one tuple of cell values per row
+# ---------------------------------------------------------------------------
+
+def _iter_xlsx(file, sheet: Optional[str]) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    names = [sheet] if sheet else workbook.sheetnames
+    for name in names:
+        if name not in workbook.sheetnames:
+            raise ImportFileError(f"Sheet '{name}' not found")
+        yield name, workbook[name].iter_rows(values_only=True)
+
+
+def _iter_xlsb(file, sheet: Optional[str]) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    from pyxlsb import open_workbook
+
+    workbook = open_workbook(file)
+    names = [sheet] if sheet else workbook.sheets
+    for name in names:
+        if name not in workbook.sheets:
+            raise ImportFileError(f"Sheet '{name}' not found")
+        with workbook.get_sheet(name) as worksheet:
+            yield name, (tuple(cell.v for cell in row) for row in worksheet.rows())
+
+
+def _iter_csv(file) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    yield "csv", (tuple(row) for row in csv.reader(text))
+
+
+def _read(iterator: Iterator) -> Iterator:
+    """Items of a reader iterator; reader errors become ImportFileError"""
+    try:
+        yield from iterator
+    except UNREADABLE_FILE_ERRORS as e:
+        raise ImportFileError("Could not read the uploaded file") from e
+
+
+def iter_sheets(file, filename: str, sheet: Optional[str] = None):
+    """Yield (sheet name, row iterator) for every candidate sheet in the upload"""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("xlsx", "xlsm"):
+        return _iter_xlsx(file, sheet)
+    if extension == "xlsb":
+        return _iter_xlsb(file, sheet)
+    if extension == "csv":
+        return _iter_csv(file)
+    raise ImportFileError("Unsupported file type. Upload an .xlsx, .xlsb or .csv file")
+
+
+def find_header(rows: Iterator[tuple]) -> Optional[Tuple[int, Dict[int, str]]]:
+    """
+    Scan the first rows for the header row
+    Returns (header row number, {column index: field}) or None
+    """
+    for row_number, row in enumerate(rows, start=1):
+        if row_number > HEADER_SCAN_ROWS:
+            return None
+        mapping = {}
+        for index, cell in enumerate(row):
+            field = HEADER_ALIASES.get(normalize_header(cell))
+            if field and field not in mapping.values():
+                mapping[index] = field
+        if "job_number" in mapping.values() and ("name" in mapping.values() or "site_name" in mapping.values()):
+            return row_number, mapping
+    return None
+
+
+def iter_customer_rows(file, filename: str, sheet: Optional[str] = None):
+    """
+    Open the upload and yield (sheet name, row number, raw field dict) per data row
+    The first sheet that has a recognizable header row is used
+    """
+    for sheet_name, rows in _read(iter_sheets(file, filename, sheet)):
+        rows = _read(rows)
+        header = find_header(rows)
+        if not header:
+            continue
+        header_row, mapping = header
+        is_xlsb = filename.lower().endswith(".xlsb")
+        for row_number, row in enumerate(rows, start=header_row + 1):
+            if not row or all(cell is None or str(cell).strip() == "" for cell in row):
+                continue
+            raw = {field: row[index] for index, field in mapping.items() if index < len(row)}
+            if is_xlsb:
+                raw = _convert_xlsb_dates(raw)
+            yield sheet_name, row_number, raw
+        return
+
+    raise ImportFileError("No sheet with a 'Job No' and 'Site Name'/'Customer Name' header row was found")
+
+
+def _convert_xlsb_dates(raw: dict) -> dict:
+    # pyxlsb returns dates as Excel serial numbers
+    for field in DATE_FIELDS:
+        value = raw.get(field)
+        if isinstance(value, (int, float)):
+            raw[field] = datetime(1899, 12, 30) + timedelta(days=float(value))
+    return raw
+
+
+# ---------------------------------------------------------------------------
+# Row conversion and validation
+# ---------------------------------------------------------------------------
+
+def _clean_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Phone numbers typed as numbers
+    text = str(value).strip()
+    return text or None
+
+
+def _parse_date(value) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in TEXT_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"invalid date '{text}'")
+
+
+def _parse_integer(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    # "Route 1", "10 Service"
+    match = re.search(r"\d+", str(value))
+    if not match:
+        raise ValueError(f"no number in '{value}'")
+    return int(match.group())
+
+
+def _parse_amc_status(value) -> Optional[str]:
+    text = _clean_text(value)
+    if text is None:
+        return None
+    return "INACTIVE" if text.lower() in INACTIVE_AMC_STATUSES else "ACTIVE"
+
+
+def build_customer_fields(raw: dict) -> Tuple[Optional[dict], List[str]]:
+    """
+    Convert one spreadsheet row into validated CustomerCreate fields
+    Returns (fields, errors); fields is None when the row is invalid
+    """
+    errors = []
+    values = {}
+    for field, value in raw.items():
+        try:
+            if field in DATE_FIELDS:
+                values[field] = _parse_date(value)
+            elif field in INTEGER_FIELDS:
+                values[field] = _parse_integer(value)
+            elif field in FLOAT_FIELDS:
+                values[field] = float(value) if value not in (None, "") else None
+            elif field in DECIMAL_FIELDS:
+                values[field] = Decimal(str(value)) if value not in (None, "") else None
+            elif field == "amc_status":
+                values[field] = _parse_amc_status(value)
+            else:
+                values[field] = _clean_text(value)
+        except (ValueError, TypeError, InvalidOperation) as e:
+            errors.append(f"{field}: {e}")
+
+    # Route charts only carry a site name; use it as the customer name
+    if not values.get("name"):
+        values["name"] = values.get("site_name")
+    # Route charts have no address or contact columns
+    if not values.get("address"):
+        values["address"] = values.get("area") or ""
+    values.setdefault("contact_person", "")
+    values.setdefault("phone", "")
+    for field in ("contact_person", "phone"):
+        if values[field] is None:
+            values[field] = ""
+    if values.get("amc_status") is None:
+        values.pop("amc_status", None)
+
+    if values.get("services_per_year") and values["services_per_year"] not in VALID_SERVICES_PER_YEAR:
+        errors.append("services_per_year must be one of: 6, 9, 10, or 12")
+
+    if errors:
+        return None, errors
+
+    try:
+        customer_in = CustomerCreate(**values)
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+
+    return customer_in.model_dump(), []
+
+
+# ---------------------------------------------------------------------------
+# AMC service generation
+# ---------------------------------------------------------------------------
+
+def build_amc_service_rows(
+    customer_id: str,
+    amc_valid_from: Optional[date],
+    services_per_year: Optional[int],
+    used_service_ids: Optional[set] = None,
+) -> List[dict]:
+    """
+    Service schedule rows for one AMC period
+    Services are distributed evenly throughout the year starting at amc_valid_from
+    used_service_ids avoids random service ID collisions across a bulk import
+    """
+    if not amc_valid_from or not services_per_year:
+        return []
+
+    # Calculate interval between services in months
+    amc_duration_months = 12  # AMC is typically for one year
+    interval_months = amc_duration_months / services_per_year
+
+    rows = []
+    service_date = datetime.combine(amc_valid_from, datetime.min.time())
+    for i in range(services_per_year):
+        date_str = service_date.strftime("%Y%m%d")
+        service_id = f"SRV-{date_str}-{uuid.uuid4().hex[:5].upper()}"
+        if used_service_ids is not None:
+            while service_id in used_service_ids:
+                service_id = f"SRV-{date_str}-{uuid.uuid4().hex[:5].upper()}"
+            used_service_ids.add(service_id)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "service_id": service_id,
+            "customer_id": customer_id,
+            "contract_id": None,  # Will be set when AMC contract is created
+            "scheduled_date": service_date,
+            "status": ServiceStatus.PENDING,
+            "service_type": ServiceType.SERVICE,
+            "is_adhoc": False,
+            "notes": f"Auto-generated service {i+1}/{services_per_year}",
+        })
+
+        # Calculate next service date
+        service_date = service_date + relativedelta(months=int(interval_months))
+
+    return rows
+
+
+def updatable_fields(raw: dict, fields: dict) -> dict:
+    """
+    Fields to overwrite on an existing customer
+    Only columns present in the sheet are updated, so a route chart without
+    address or contact columns does not blank them out
+    """
+    provided = {field for field, value in raw.items() if _clean_text(value) is not None}
+    if "site_name" in provided and "name" not in raw:
+        provided.add("name")
+    return {field: fields[field] for field in provided if field in fields}
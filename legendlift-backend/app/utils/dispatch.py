@@ -0,0 +1,192 @@
+"""
+Daily dispatch planner
+Groups a day's services by customer route, orders the visits in each group
+(nearest neighbour + 2-opt on a haversine distance matrix) and hands contiguous
+runs of visits to technicians under a per-technician visit cap
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Default maximum number of visits planned for one technician in a day
+DEFAULT_MAX_VISITS_PER_TECHNICIAN = 8
+
+# 2-opt improvement passes per route (each pass is O(n^2) vectorized)
+MAX_TWO_OPT_PASSES = 20
+
+
+def haversine_matrix(latitudes: Sequence[float], longitudes: Sequence[float]) -> np.ndarray:
+    """Pairwise great-circle distances in km"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lng = np.radians(np.asarray(longitudes, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_neighbor_order(distances: np.ndarray, start: int = 0) -> List[int]:
+    """Greedy open path visiting every point, always moving to the closest unvisited one"""
+    n = len(distances)
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        candidates = np.where(visited, np.inf, distances[current])
+        current = int(np.argmin(candidates))
+        visited[current] = True
+        order.append(current)
+    return order
+
+
+def two_opt(order: List[int], distances: np.ndarray, max_passes: int = MAX_TWO_OPT_PASSES) -> List[int]:
+    """
+    Improve an open path by reversing segments while that shortens it
+    For each i the gain of every j is computed at once with NumPy
+    """
+    path = np.asarray(order)
+    n = len(path)
+    if n < 4:
+        return list(path)
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            a, b = path[i - 1], path[i]
+            j = np.arange(i + 1, n)
+            c = path[j]
+            # Open path: reversing up to the last stop removes no outgoing edge
+            has_next = j + 1 < n
+            d = path[np.minimum(j + 1, n - 1)]
+            removed = distances[a, b] + np.where(has_next, distances[c, d], 0.0)
+            added = distances[a, c] + np.where(has_next, distances[b, d], 0.0)
+            gain = removed - added
+            best = int(np.argmax(gain))
+            if gain[best] > 1e-9:
+                k = int(j[best])
+                path[i:k + 1] = path[i:k + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return list(path)
+
+
+def order_stops(stops: List[dict]) -> List[dict]:
+    """
+    Order stops into a short open path
+    Stops without coordinates keep their relative order at the end
+    """
+    located = [stop for stop in stops if stop["latitude"] is not None and stop["longitude"] is not None]
+    unlocated = [stop for stop in stops if stop["latitude"] is None or stop["longitude"] is None]
+    if len(located) < 2:
+        return located + unlocated
+
+    distances = haversine_matrix(
+        [stop["latitude"] for stop in located],
+        [stop["longitude"] for stop in located],
+    )
+    # Start at the most outlying stop (largest mean distance to the others)
+    start = int(np.argmax(distances.mean(axis=1)))
+    order = two_opt(nearest_neighbor_order(distances, start), distances)
+    return [located[index] for index in order] + unlocated
+
+
+def path_legs(stops: List[dict]) -> List[Optional[float]]:
+    """Distance in km from the previous stop (None for the first stop or missing coordinates)"""
+    legs = [None]
+    for previous, stop in zip(stops, stops[1:]):
+        if None in (previous["latitude"], previous["longitude"], stop["latitude"], stop["longitude"]):
+            legs.append(None)
+            continue
+        legs.append(float(haversine_matrix(
+            [previous["latitude"], stop["latitude"]],
+            [previous["longitude"], stop["longitude"]],
+        )[0, 1]))
+    return legs
+
+
+def plan_dispatch(
+    stops: List[dict],
+    technicians: List[dict],
+    max_visits_per_technician: int = DEFAULT_MAX_VISITS_PER_TECHNICIAN,
+) -> Dict:
+    """
+    Build ordered itineraries
+
+    stops: dicts with service_db_id, route, latitude, longitude and an optional
+    technician_id (services already assigned stay with that technician)
+    technicians: dicts with id and name
+
+    Returns {"itineraries": [...], "unassigned": [...]}
+    """
+    technician_ids = {technician["id"] for technician in technicians}
+    assigned = defaultdict(list)
+    load = {technician["id"]: 0 for technician in technicians}
+    routes_of = defaultdict(set)
+    unassigned = []
+
+    # Keep existing assignments (they count towards the cap)
+    open_stops = []
+    for stop in stops:
+        technician_id = stop.get("technician_id")
+        if technician_id in technician_ids:
+            assigned[technician_id].append(stop)
+            load[technician_id] += 1
+            routes_of[technician_id].add(stop["route"])
+        else:
+            open_stops.append(stop)
+
+    # Group the rest by route and order each group
+    by_route = defaultdict(list)
+    for stop in open_stops:
+        by_route[stop["route"]].append(stop)
+
+    # Largest routes first, so they get whole technicians
+    for route in sorted(by_route, key=lambda r: (-len(by_route[r]), str(r))):
+        ordered = order_stops(by_route[route])
+        position = 0
+        while position < len(ordered):
+            candidates = [
+                technician_id for technician_id in load
+                if load[technician_id] < max_visits_per_technician
+            ]
+            if not candidates:
+                unassigned.extend(ordered[position:])
+                break
+            # Prefer technicians already working this route, then the least loaded
+            technician_id = min(
+                candidates,
+                key=lambda t: (route not in routes_of[t], load[t] > 0, load[t]),
+            )
+            room = max_visits_per_technician - load[technician_id]
+            run = ordered[position:position + room]
+            assigned[technician_id].extend(run)
+            load[technician_id] += len(run)
+            routes_of[technician_id].add(route)
+            position += len(run)
+
+    itineraries = []
+    for technician in technicians:
+        visits = assigned.get(technician["id"])
+        if not visits:
+            continue
+        # Re-order across routes when a technician was given more than one run
+        if len({stop["route"] for stop in visits}) > 1 or any(stop.get("technician_id") for stop in visits):
+            visits = order_stops(visits)
+        legs = path_legs(visits)
+        itineraries.append({
+            "technician_id": technician["id"],
+            "technician_name": technician["name"],
+            "routes": sorted({stop["route"] for stop in visits}, key=str),
+            "visit_count": len(visits),
+            "total_distance_km": round(sum(leg for leg in legs if leg is not None), 2),
+            "visits": [
+                {**stop, "order": index + 1, "distance_from_previous_km": round(leg, 2) if leg is not None else None}
+                for index, (stop, leg) in enumerate(zip(visits, legs))
+            ],
+        })
+
+    return {"itineraries": itineraries, "unassigned": unassigned}
@@ -0,0 +1,170 @@
+"""
+In-memory spatial index over customer coordinates
+Grid buckets of GRID_CELL_DEGREES; a radius query only looks at the buckets
+overlapping the search box and computes haversine distances with NumPy
+(imported on the first build, not at start-up)
+
+The index is rebuilt lazily: committed customer writes mark it stale
+(app.db.commit_events) and it also expires after INDEX_MAX_AGE_SECONDS so
+other worker processes pick up changes. A rebuild publishes a new immutable
+snapshot with one assignment, so queries running on other threads always see
+one consistent build.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.db.commit_events import on_commit
+from app.models.customer import Customer
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+# ~5.5 km buckets: a few cells for typical "near me" radii
+GRID_CELL_DEGREES = 0.05
+
+# Safety net for changes made by other processes
+INDEX_MAX_AGE_SECONDS = 300
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def _cell(lat: float, lng: float) -> tuple:
+    return (math.floor(lat / GRID_CELL_DEGREES), math.floor(lng / GRID_CELL_DEGREES))
+
+
+class IndexSnapshot(NamedTuple):
+    """One build of the index; positions in buckets index rows, lat and lng"""
+    rows: List[dict]
+    lat: object  # NumPy arrays of radians
+    lng: object
+    buckets: Dict[tuple, object]
+
+
+class CustomerSpatialIndex:
+    """Grid bucket index of customers that have coordinates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stale = True
+        self._built_at = 0.0
+        self._snapshot = IndexSnapshot([], None, None, {})
+
+    def invalidate(self) -> None:
+        """Mark the index stale; it is rebuilt on the next query"""
+        self._stale = True
+
+    def _needs_rebuild(self) -> bool:
+        return self._stale or time.monotonic() - self._built_at > INDEX_MAX_AGE_SECONDS
+
+    def _rebuild(self, db: Session) -> None:
+        import numpy as np
+
+        rows = db.query(
+            Customer.id,
+            Customer.job_number,
+            Customer.name,
+            Customer.area,
+            Customer.route,
+            Customer.latitude,
+            Customer.longitude,
+        ).filter(
+            Customer.latitude.isnot(None),
+            Customer.longitude.isnot(None),
+        ).all()
+
+        buckets = defaultdict(list)
+        for position, row in enumerate(rows):
+            buckets[_cell(row.latitude, row.longitude)].append(position)
+
+        index_rows = [
+            {
+                "id": row.id,
+                "job_number": row.job_number,
+                "name": row.name,
+                "area": row.area,
+                "route": row.route,
+                "latitude": row.latitude,
+                "longitude": row.longitude,
+            }
+            for row in rows
+        ]
+        self._snapshot = IndexSnapshot(
+            rows=index_rows,
+            lat=np.radians(np.array([row.latitude for row in rows], dtype=float)),
+            lng=np.radians(np.array([row.longitude for row in rows], dtype=float)),
+            buckets={cell: np.array(positions) for cell, positions in buckets.items()},
+        )
+        self._built_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Rebuild from the database if stale"""
+        if not self._needs_rebuild():
+            return
+        with self._lock:
+            if self._needs_rebuild():
+                # Clear first so writes during the rebuild mark it stale again
+                self._stale = False
+                try:
+                    self._rebuild(db)
+                except Exception:
+                    self._stale = True
+                    raise
+
+    def nearby(self, db: Session, latitude: float, longitude: float, radius_km: float, limit: Optional[int] = None) -> List[dict]:
+        """Customers within radius_km of a point, closest first, with distance_km"""
+        import numpy as np
+
+        self.ensure_fresh(db)
+        # Read once: a rebuild on another thread replaces the whole snapshot
+        snapshot = self._snapshot
+
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        lng_span = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 1e-6))
+        min_cell = _cell(latitude - lat_span, longitude - lng_span)
+        max_cell = _cell(latitude + lat_span, longitude + lng_span)
+
+        buckets = snapshot.buckets
+        candidates = [
+            buckets[(i, j)]
+            for i in range(min_cell[0], max_cell[0] + 1)
+            for j in range(min_cell[1], max_cell[1] + 1)
+            if (i, j) in buckets
+        ]
+        if not candidates:
+            return []
+        positions = np.concatenate(candidates)
+
+        phi = math.radians(latitude)
+        lmb = math.radians(longitude)
+        lat = snapshot.lat[positions]
+        a = np.sin((lat - phi) / 2) ** 2 + math.cos(phi) * np.cos(lat) * np.sin((snapshot.lng[positions] - lmb) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+        within = distances <= radius_km
+        positions = positions[within]
+        distances = distances[within]
+        order = np.argsort(distances, kind="stable")
+        if limit:
+            order = order[:limit]
+
+        return [
+            {**snapshot.rows[positions[k]], "distance_km": round(float(distances[k]), 3)}
+            for k in order
+        ]
+
+
+customer_index = CustomerSpatialIndex()
+
+# After commit, not at flush: a rebuild between the two would index the
+# uncommitted state and keep it until INDEX_MAX_AGE_SECONDS
+on_commit(Customer.__tablename__, customer_index.invalidate)
@@ -15,34 +15,59 @@ def generate_sequential_service_id(db: Session) -> str:
     Generate sequential service ID in format: SRV-YYYYMMDD-NNNN
     Example: SRV-20241009-0001, SRV-20241009-0002, etc.
 
-    Sequential numbering resets daily for better organization
+    Sequential numbering resets daily for better organization.
+    The counter is allocated with a single upsert ... RETURNING in the caller's
+    transaction; nothing is committed here, the caller commits with its own work.
     """
     from app.models.counter import SequentialCounter
 
     date_str = datetime.now().strftime("%Y%m%d")
     counter_id = f"service_{date_str}"
 
-    # Get or create counter for today
-    counter = db.query(SequentialCounter).filter(
-        SequentialCounter.id == counter_id
-    ).first()
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
 
-    if not counter:
-        # Create new counter for today
-        counter = SequentialCounter(
+        table = SequentialCounter.__table__
+        stmt = insert(table).values(
             id=counter_id,
             entity_type="service",
             date_key=date_str,
-            last_number=0
+            last_number=1,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
         )
-        db.add(counter)
+        # Create today's counter or increment it, in one round trip
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                "last_number": table.c.last_number + 1,
+                "updated_at": datetime.utcnow(),
+            },
+        ).returning(table.c.last_number)
+        next_number = db.execute(stmt).scalar_one()
+    else:
+        # Fallback for other databases: row-locked read and increment
+        counter = db.query(SequentialCounter).filter(
+            SequentialCounter.id == counter_id
+        ).with_for_update().first()
+
+        if not counter:
+            counter = SequentialCounter(
+                id=counter_id,
+                entity_type="service",
+                date_key=date_str,
+                last_number=0
+            )
+            db.add(counter)
+
+        counter.last_number += 1
+        next_number = counter.last_number
         db.flush()
 
-    # Increment counter
-    counter.last_number += 1
-    next_number = counter.last_number
-    db.commit()
-
     # Format: SRV-20241009-0001
     return f"SRV-{date_str}-{next_number:04d}"
 
@@ -0,0 +1,57 @@
+"""
+Idempotency key helpers
+Let mobile clients retry POSTs on flaky connections without duplicating work
+"""
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.models.idempotency_key import IdempotencyKey
+from app.utils.id_generator import generate_uuid
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def get_idempotent_response(db: Session, user_id: str, key: Optional[str], endpoint: str) -> Optional[dict]:
+    """
+    Return the stored response for a previously completed request, if any
+    Raises 422 if the key was already used for a different endpoint
+    """
+    if not key:
+        return None
+
+    if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key is too long"
+        )
+
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+    ).first()
+    if not record:
+        return None
+
+    if record.endpoint != endpoint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    return record.response
+
+
+def save_idempotent_response(db: Session, user_id: str, key: Optional[str], endpoint: str, response: dict) -> None:
+    """
+    Record the response for an idempotency key
+    Call before committing so the key and the work commit together
+    """
+    if not key:
+        return
+
+    db.add(IdempotencyKey(
+        id=generate_uuid(),
+        key=key,
+        user_id=user_id,
+        endpoint=endpoint,
+        response=response,
+    ))
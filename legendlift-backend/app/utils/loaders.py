@@ -0,0 +1,190 @@
+"""
+Shared query loaders for LegendLift endpoints
+Eager-loads related rows so listings run a constant number of queries
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.models.customer import Customer
+from app.models.service import ServiceSchedule
+from app.models.service_technician import ServiceTechnician
+from app.models.user import User
+from app.utils.cache import cache
+
+
+def service_schedule_load_options() -> tuple:
+    """
+    Loader options for ServiceSchedule queries
+
+    Customer and the legacy technician columns are joined into the main query,
+    the assignment list (with each assigned User) is fetched in one extra
+    SELECT ... IN query for the whole page.
+    """
+    return (
+        joinedload(ServiceSchedule.customer),
+        joinedload(ServiceSchedule.technician),
+        joinedload(ServiceSchedule.technician2),
+        selectinload(ServiceSchedule.assigned_technicians).joinedload(ServiceTechnician.technician),
+    )
+
+
+def get_service_assignments(service: ServiceSchedule) -> List[ServiceTechnician]:
+    """
+    Get assignments of an eager-loaded service ordered by assignment order
+    Skips assignments whose technician no longer exists
+    """
+    assignments = [a for a in service.assigned_technicians if a.technician is not None]
+    return sorted(assignments, key=lambda a: a.order or 0)
+
+
+def enrich_service_with_technicians(service_dict: dict, service: ServiceSchedule) -> dict:
+    """
+    Enrich service dict with all assigned technicians
+    """
+    assigned_technicians = [
+        {
+            "id": assignment.technician.id,
+            "name": assignment.technician.name,
+            "is_primary": assignment.is_primary,
+            "order": assignment.order,
+        }
+        for assignment in get_service_assignments(service)
+    ]
+
+    service_dict["assigned_technicians"] = assigned_technicians
+    service_dict["technician_count"] = len(assigned_technicians)
+    return service_dict
+
+
+def serialize_service_schedule(service: ServiceSchedule) -> dict:
+    """
+    Build the service schedule response dict with customer and technician data
+    Expects the service to be loaded with service_schedule_load_options()
+    """
+    service_dict = {
+        "id": service.id,
+        "service_id": service.service_id,
+        "contract_id": service.contract_id,
+        "customer_id": service.customer_id,
+        "scheduled_date": service.scheduled_date,
+        "actual_date": service.actual_date,
+        "status": service.status,
+        "technician_id": service.technician_id,
+        "technician2_id": service.technician2_id,
+        "days_overdue": service.days_overdue,
+        "is_adhoc": service.is_adhoc,
+        "service_type": service.service_type,
+        "notes": service.notes,
+        "created_at": service.created_at,
+        "updated_at": service.updated_at,
+    }
+
+    # Add customer data
+    if service.customer:
+        service_dict["customer_name"] = service.customer.name
+        service_dict["job_number"] = service.customer.job_number
+        service_dict["area"] = service.customer.area
+        service_dict["route"] = service.customer.route
+
+    # Add technician data
+    if service.technician:
+        service_dict["technician_name"] = service.technician.name
+    if service.technician2:
+        service_dict["technician2_name"] = service.technician2.name
+
+    # Add all assigned technicians
+    return enrich_service_with_technicians(service_dict, service)
+
+
+class CustomerSummary(NamedTuple):
+    """Customer columns shown next to jobs and payments"""
+    id: str
+    name: str
+    job_number: str
+    phone: str
+
+
+class UserSummary(NamedTuple):
+    """User columns shown next to jobs"""
+    id: str
+    name: str
+    email: str
+    phone: str
+
+
+class RelatedRows:
+    """
+    Customers and users referenced by one page of rows, built by load_related()
+    Lookups of ids that weren't loaded or no longer exist return None
+    """
+
+    def __init__(self, customers: Dict[str, CustomerSummary], users: Dict[str, UserSummary]):
+        self.customers = customers
+        self.users = users
+
+    def customer(self, customer_id: Optional[str]) -> Optional[CustomerSummary]:
+        return self.customers.get(customer_id) if customer_id else None
+
+    def user(self, user_id: Optional[str]) -> Optional[UserSummary]:
+        return self.users.get(user_id) if user_id else None
+
+    def users_in(self, user_ids: Optional[Iterable[str]]) -> List[UserSummary]:
+        """Users for a list of ids (e.g. a technicians column), in list order"""
+        return [self.users[user_id] for user_id in user_ids or [] if user_id in self.users]
+
+
+def load_related(
+    db: Session,
+    rows: Sequence,
+    user_fields: Sequence[str] = (),
+    user_list_fields: Sequence[str] = (),
+) -> RelatedRows:
+    """
+    Fetch the customers and users referenced by a page of rows
+
+    Customers come from each row's customer_id; users from the user_fields
+    columns (e.g. created_by_admin_id) and the ids in the user_list_fields
+    JSON lists (e.g. technicians). Rows without one of the fields are skipped
+    for it, so one call can cover rows of different tables. Summaries are
+    served from the reference data cache; misses cost at most two queries,
+    one SELECT ... IN per table, whatever the page size.
+    """
+    customer_ids = {row.customer_id for row in rows if getattr(row, "customer_id", None)}
+    user_ids = set()
+    for row in rows:
+        user_ids.update(getattr(row, field, None) for field in user_fields)
+        for field in user_list_fields:
+            user_ids.update(getattr(row, field, None) or [])
+    user_ids.discard(None)
+
+    customers = cache.get_many_or_load(
+        db, "customer-summary", customer_ids, ("customers",),
+        lambda ids: {
+            row.id: CustomerSummary(*row)
+            for row in db.query(Customer.id, Customer.name, Customer.job_number, Customer.phone)
+            .filter(Customer.id.in_(ids))
+        },
+    )
+    users = cache.get_many_or_load(
+        db, "user-summary", user_ids, ("users",),
+        lambda ids: {
+            row.id: UserSummary(*row)
+            for row in db.query(User.id, User.name, User.email, User.phone).filter(User.id.in_(ids))
+        },
+    )
+    return RelatedRows(customers, users)
+
+
+def serialize_row(row, fields: Sequence[str]) -> dict:
+    """Response dict of the named attributes of a row"""
+    return {field: getattr(row, field) for field in fields}
+
+
+def add_related_fields(row_dict: dict, related, mapping: Dict[str, str]) -> dict:
+    """
+    Copy attributes of a related row into a response dict
+    mapping is {response key: attribute}; nothing is added if related is None
+    """
+    if related is not None:
+        for key, attribute in mapping.items():
+            row_dict[key] = getattr(related, attribute)
+    return row_dict
@@ -0,0 +1,263 @@
+"""
+Technician location tracking
+GPS pings are buffered in memory and written to technician_locations in bulk
+by a background flusher thread (every FLUSH_INTERVAL_SECONDS, or sooner once
+FLUSH_BATCH_SIZE samples are waiting), so ingestion never commits per ping
+The latest position and a few recent samples per technician stay in memory
+for the admin live map and for speed-based ETAs
+"""
+import logging
+import math
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+from app.db.session import engine
+from app.models.technician_location import TechnicianLocation
+from app.utils.geo_index import haversine_km
+
+logger = logging.getLogger("legendlift.location_tracking")
+
+# Flusher cadence and batch size
+FLUSH_INTERVAL_SECONDS = 5
+FLUSH_BATCH_SIZE = 500
+
+# Cap on samples held while the database is unreachable (oldest are dropped)
+MAX_BUFFERED_SAMPLES = 50000
+
+# Samples kept per technician for speed estimates, and how far back they count
+RECENT_SAMPLES_PER_TECHNICIAN = 10
+SPEED_WINDOW_SECONDS = 600
+
+# ETA assumptions: typical city travel speed when the device gives none,
+# and the ratio of road distance to straight-line distance
+DEFAULT_SPEED_KMH = 25.0
+MIN_SPEED_KMH = 5.0
+ROAD_DISTANCE_FACTOR = 1.3
+
+
+def create_location_partitions(connection, months) -> None:
+    """Create monthly technician_locations partitions for (year, month) pairs (PostgreSQL)"""
+    for year, month in sorted(months):
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS technician_locations_{year}_{month:02d} "
+            f"PARTITION OF technician_locations FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+
+
+class LocationTracker:
+    """In-memory ping buffer plus latest position per technician"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._latest = {}
+        self._recent = {}
+        self._partitions = set()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.dropped = 0
+
+    def record(self, technician_id: str, technician_name: str, callback_id: Optional[str], samples: List[dict]) -> int:
+        """
+        Buffer a batch of samples (dicts with latitude, longitude, recorded_at
+        and optional accuracy, speed, heading); returns the number accepted
+        """
+        received_at = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "technician_id": technician_id,
+                "callback_id": callback_id,
+                "latitude": sample["latitude"],
+                "longitude": sample["longitude"],
+                "accuracy": sample.get("accuracy"),
+                "speed": sample.get("speed"),
+                "heading": sample.get("heading"),
+                "recorded_at": sample.get("recorded_at") or received_at,
+                "received_at": received_at,
+            }
+            for sample in samples
+        ]
+        rows.sort(key=lambda row: row["recorded_at"])
+
+        with self._lock:
+            self._pending.extend(rows)
+            excess = len(self._pending) - MAX_BUFFERED_SAMPLES
+            if excess > 0:
+                del self._pending[:excess]
+                self.dropped += excess
+
+            recent = self._recent.setdefault(technician_id, deque(maxlen=RECENT_SAMPLES_PER_TECHNICIAN))
+            recent.extend(rows)
+            newest = rows[-1]
+            current = self._latest.get(technician_id)
+            if current is None or newest["recorded_at"] >= current["recorded_at"]:
+                self._latest[technician_id] = {
+                    "technician_id": technician_id,
+                    "technician_name": technician_name,
+                    "callback_id": callback_id,
+                    "latitude": newest["latitude"],
+                    "longitude": newest["longitude"],
+                    "accuracy": newest["accuracy"],
+                    "speed": newest["speed"],
+                    "heading": newest["heading"],
+                    "recorded_at": newest["recorded_at"],
+                }
+            pending_count = len(self._pending)
+
+        if pending_count >= FLUSH_BATCH_SIZE:
+            if self._thread is not None and self._thread.is_alive():
+                self._wakeup.set()
+            else:
+                self.flush()
+        return len(rows)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def latest_positions(self) -> List[dict]:
+        """Latest known position of every technician seen by this process"""
+        with self._lock:
+            return [dict(position) for position in self._latest.values()]
+
+    def latest_position(self, technician_id: str) -> Optional[dict]:
+        with self._lock:
+            position = self._latest.get(technician_id)
+            return dict(position) if position else None
+
+    def speed_kmh(self, technician_id: str) -> Optional[float]:
+        """
+        Recent travel speed: mean of device-reported speeds if available,
+        otherwise path length over elapsed time of the recent samples
+        """
+        with self._lock:
+            samples = list(self._recent.get(technician_id, ()))
+        if not samples:
+            return None
+        cutoff = samples[-1]["recorded_at"] - timedelta(seconds=SPEED_WINDOW_SECONDS)
+        samples = [sample for sample in samples if sample["recorded_at"] >= cutoff]
+
+        reported = [sample["speed"] for sample in samples if sample["speed"] is not None and sample["speed"] >= 0]
+        if reported:
+            return sum(reported) / len(reported) * 3.6
+
+        if len(samples) < 2:
+            return None
+        elapsed = (samples[-1]["recorded_at"] - samples[0]["recorded_at"]).total_seconds()
+        if elapsed <= 0:
+            return None
+        distance = sum(
+            haversine_km(a["latitude"], a["longitude"], b["latitude"], b["longitude"])
+            for a, b in zip(samples, samples[1:])
+        )
+        return distance / (elapsed / 3600)
+
+    def _ensure_partitions(self, connection, rows: List[dict]) -> set:
+        """Create the monthly partitions a batch needs (PostgreSQL only)"""
+        if connection.dialect.name != "postgresql":
+            return set()
+        months = {(row["recorded_at"].year, row["recorded_at"].month) for row in rows} - self._partitions
+        create_location_partitions(connection, months)
+        return months
+
+    def _insert(self, rows: List[dict]) -> None:
+        with engine.begin() as connection:
+            months = self._ensure_partitions(connection, rows)
+            connection.execute(insert(TechnicianLocation.__table__), rows)
+        self._partitions |= months
+
+    def flush(self) -> int:
+        """
+        Write all buffered samples, in one transaction unless some are rejected;
+        returns rows written
+
+        A batch the database rejects (e.g. a sample of a deleted technician) is
+        split in halves until the bad samples are isolated and dropped. Only
+        connection errors put the unwritten samples back in the buffer.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            written = 0
+            batches = [rows] if rows else []
+            while batches:
+                batch = batches.pop()
+                try:
+                    self._insert(batch)
+                except (IntegrityError, DataError) as e:
+                    if len(batch) == 1:
+                        logger.warning("Dropped technician location of %s: %s", batch[0]["technician_id"], e.orig)
+                        continue
+                    middle = len(batch) // 2
+                    # First half is popped first, so samples keep their order
+                    batches.extend([batch[middle:], batch[:middle]])
+                    continue
+                except (OperationalError, InterfaceError) as e:
+                    unwritten = batch + [row for pending in reversed(batches) for row in pending]
+                    # Put them back in front of anything buffered meanwhile
+                    with self._lock:
+                        self._pending = unwritten + self._pending
+                        excess = len(self._pending) - MAX_BUFFERED_SAMPLES
+                        if excess > 0:
+                            del self._pending[:excess]
+                            self.dropped += excess
+                    logger.warning("Failed to flush %d technician locations, will retry: %s", len(unwritten), e)
+                    return written
+                except Exception:
+                    unwritten = len(batch) + sum(len(pending) for pending in batches)
+                    logger.exception("Dropped %d technician locations that could not be written", unwritten)
+                    return written
+                written += len(batch)
+            return written
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="location-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=FLUSH_INTERVAL_SECONDS * 2)
+            self._thread = None
+        self.flush()
+
+
+location_tracker = LocationTracker()
+
+
+def estimate_eta(position: Dict, speed_kmh: Optional[float], latitude: float, longitude: float) -> Dict:
+    """
+    Speed-based ETA from a position to a destination
+    Straight-line distance is scaled by ROAD_DISTANCE_FACTOR; slow or unknown
+    speeds fall back to DEFAULT_SPEED_KMH
+    """
+    distance_km = haversine_km(position["latitude"], position["longitude"], latitude, longitude)
+    measured = speed_kmh is not None and speed_kmh >= MIN_SPEED_KMH
+    used_speed = speed_kmh if measured else DEFAULT_SPEED_KMH
+    eta_minutes = distance_km * ROAD_DISTANCE_FACTOR / used_speed * 60
+    return {
+        "distance_km": round(distance_km, 2),
+        "speed_kmh": round(used_speed, 1),
+        "speed_source": "measured" if measured else "default",
+        "eta_minutes": math.ceil(eta_minutes),
+    }
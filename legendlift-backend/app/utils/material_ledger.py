@@ -0,0 +1,203 @@
+"""
+Material usage ledger
+Callbacks, repairs and service reports keep the materials of a job as JSON
+for display; when a job is closed they are also written as MaterialUsage rows
+in the same transaction, so material and cost reports are aggregate queries
+on the material_usage table instead of re-parsing every job's JSON
+"""
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.models.material_usage import MaterialUsage
+from app.models.service import ServiceReport
+from app.utils.id_generator import generate_uuid
+
+CENT = Decimal("0.01")
+
+
+class LedgerLine(NamedTuple):
+    material_name: str
+    quantity: int
+    unit: Optional[str]
+    unit_cost: Optional[Decimal]
+    total_cost: Optional[Decimal]
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value)).quantize(CENT)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _to_quantity(value) -> int:
+    try:
+        return max(int(round(float(value))), 0)
+    except (TypeError, ValueError):
+        return 1
+
+
+def parse_materials(items) -> List[LedgerLine]:
+    """
+    Normalize the materials JSON of a job
+    Accepts part names (service reports) and {name, quantity, unit, unit_cost
+    or cost} objects (callbacks, repairs); `cost` is the cost of the line
+    """
+    lines = []
+    for item in items or []:
+        if isinstance(item, str):
+            name, quantity, unit, unit_cost, total_cost = item, 1, None, None, None
+        elif isinstance(item, dict):
+            name = item.get("name") or item.get("material_name")
+            quantity = _to_quantity(item.get("quantity", 1))
+            unit = item.get("unit") or None
+            unit_cost = _to_decimal(item.get("unit_cost"))
+            total_cost = _to_decimal(item.get("total_cost", item.get("cost")))
+            if total_cost is None and unit_cost is not None:
+                total_cost = (unit_cost * quantity).quantize(CENT)
+        else:
+            continue
+
+        name = str(name).strip() if name else ""
+        if not name or quantity <= 0:
+            continue
+        lines.append(LedgerLine(name, quantity, unit, unit_cost, total_cost))
+    return lines
+
+
+def allocate_job_cost(lines: List[LedgerLine], job_cost) -> List[LedgerLine]:
+    """
+    Spread a job-level materials cost over the lines that have no cost of
+    their own, by quantity; lines still without a cost are recorded at 0
+    """
+    job_cost = _to_decimal(job_cost)
+    unpriced = [line for line in lines if line.total_cost is None]
+    if job_cost is None or not unpriced:
+        return [line._replace(total_cost=line.total_cost or Decimal("0.00")) for line in lines]
+
+    known = sum((line.total_cost for line in lines if line.total_cost is not None), Decimal("0.00"))
+    remaining = max(job_cost - known, Decimal("0.00"))
+    quantity = sum(line.quantity for line in unpriced)
+    allocated = []
+    left = remaining
+    for index, line in enumerate(unpriced):
+        if index == len(unpriced) - 1:
+            share = left
+        else:
+            share = (remaining * line.quantity / quantity).quantize(CENT)
+            left -= share
+        allocated.append(line._replace(total_cost=share, unit_cost=(share / line.quantity).quantize(CENT)))
+
+    shares = iter(allocated)
+    return [line if line.total_cost is not None else next(shares) for line in lines]
+
+
+def clear_job_materials(
+    db: Session,
+    service_id: Optional[str] = None,
+    callback_id: Optional[str] = None,
+    repair_id: Optional[str] = None,
+) -> None:
+    """
+    Delete the ledger rows of one job (pass exactly one of the job ids)
+    Call when a closed job is reopened: its materials count again at the next closure
+    """
+    job_filters = {
+        MaterialUsage.service_id: service_id,
+        MaterialUsage.callback_id: callback_id,
+        MaterialUsage.repair_id: repair_id,
+    }
+    column, job_id = next((column, value) for column, value in job_filters.items() if value)
+    db.query(MaterialUsage).filter(column == job_id).delete(synchronize_session=False)
+
+
+def record_job_materials(
+    db: Session,
+    items,
+    customer_id: Optional[str],
+    used_date: datetime,
+    technician_id: Optional[str] = None,
+    service_id: Optional[str] = None,
+    callback_id: Optional[str] = None,
+    repair_id: Optional[str] = None,
+    job_cost=None,
+) -> int:
+    """
+    Replace the ledger rows of one job (pass exactly one of the job ids)
+
+    Call when the job is closed, before committing, so the ledger is written in
+    the same transaction. Closing a job again rewrites its rows. Jobs without a
+    customer (walk-in repairs) have no ledger rows.
+    Returns the number of rows written.
+    """
+    clear_job_materials(db, service_id=service_id, callback_id=callback_id, repair_id=repair_id)
+
+    if not customer_id:
+        return 0
+
+    lines = allocate_job_cost(parse_materials(items), job_cost)
+    for line in lines:
+        db.add(MaterialUsage(
+            id=generate_uuid(),
+            service_id=service_id,
+            callback_id=callback_id,
+            repair_id=repair_id,
+            customer_id=customer_id,
+            technician_id=technician_id,
+            material_name=line.material_name,
+            quantity=line.quantity,
+            unit=line.unit,
+            unit_cost=line.unit_cost,
+            total_cost=line.total_cost,
+            used_date=used_date,
+        ))
+    return len(lines)
+
+
+def _job_technician(technicians, acting_user_id: Optional[str]) -> Optional[str]:
+    """The closing user if assigned to the job, else its first technician"""
+    technicians = technicians or []
+    if acting_user_id in technicians:
+        return acting_user_id
+    return technicians[0] if technicians else None
+
+
+def sync_callback_materials(db: Session, callback, acting_user_id: Optional[str] = None) -> int:
+    return record_job_materials(
+        db,
+        callback.materials_changed,
+        customer_id=callback.customer_id,
+        used_date=callback.completed_at or datetime.utcnow(),
+        technician_id=_job_technician(callback.technicians, acting_user_id),
+        callback_id=callback.id,
+    )
+
+
+def sync_repair_materials(db: Session, repair, acting_user_id: Optional[str] = None) -> int:
+    return record_job_materials(
+        db,
+        repair.materials_used,
+        customer_id=repair.customer_id,
+        used_date=repair.completed_at or datetime.utcnow(),
+        technician_id=_job_technician(repair.technicians, acting_user_id),
+        repair_id=repair.id,
+        job_cost=repair.materials_cost,
+    )
+
+
+def sync_service_report_materials(db: Session, report, service) -> int:
+    """Ledger rows for the parts of every report on the service"""
+    # Make the report changes visible to the query below
+    db.flush()
+    reports = db.query(ServiceReport).filter(ServiceReport.service_id == service.id).all()
+    return record_job_materials(
+        db,
+        [part for service_report in reports for part in service_report.parts_replaced or []],
+        customer_id=service.customer_id,
+        used_date=report.completion_time or report.check_out_time or datetime.utcnow(),
+        technician_id=report.technician_id,
+        service_id=service.id,
+    )
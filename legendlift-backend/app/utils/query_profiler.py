@@ -0,0 +1,199 @@
+"""
+Per-request query profiling
+SQLAlchemy cursor events count queries and database time for the request
+being served (tracked in a context variable); QueryProfilingMiddleware reports
+them in a Server-Timing header, logs requests over the query budget and keeps
+per-route histograms for GET /api/v1/admin/query-stats
+
+Cost per query is two perf_counter() calls and a context variable lookup,
+so it is meant to stay on in production. Stats are per worker process.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi import Request
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.config import settings
+
+logger = logging.getLogger("legendlift.query_profiler")
+
+# Histogram bucket upper bounds (the last bucket is open-ended)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+DURATION_MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestQueryStats:
+    """Queries and database time of one request"""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being served, if any"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.db_seconds += time.perf_counter() - starts.pop()
+    stats.queries += 1
+
+
+def install_query_profiler(engine) -> None:
+    """Attach the cursor event hooks to an engine and set up the profile log"""
+    if not logger.handlers:
+        # One JSON object per line on stderr, next to the uvicorn logs
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _bucket_counts(bounds) -> list:
+    return [0] * (len(bounds) + 1)
+
+
+def _bucket_labels(bounds) -> list:
+    return [f"<={bound}" for bound in bounds] + [f">{bounds[-1]}"]
+
+
+class RouteStatsRegistry:
+    """Per-route aggregates and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.started_at = time.time()
+
+    def record(self, route: str, queries: int, db_ms: float, total_ms: float, over_budget: bool) -> None:
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "requests": 0,
+                    "over_budget": 0,
+                    "queries_total": 0,
+                    "queries_max": 0,
+                    "db_ms_total": 0.0,
+                    "total_ms_total": 0.0,
+                    "total_ms_max": 0.0,
+                    "queries_histogram": _bucket_counts(QUERY_COUNT_BUCKETS),
+                    "db_ms_histogram": _bucket_counts(DURATION_MS_BUCKETS),
+                    "total_ms_histogram": _bucket_counts(DURATION_MS_BUCKETS),
+                }
+            stats["requests"] += 1
+            stats["over_budget"] += over_budget
+            stats["queries_total"] += queries
+            stats["queries_max"] = max(stats["queries_max"], queries)
+            stats["db_ms_total"] += db_ms
+            stats["total_ms_total"] += total_ms
+            stats["total_ms_max"] = max(stats["total_ms_max"], total_ms)
+            stats["queries_histogram"][bisect_left(QUERY_COUNT_BUCKETS, queries)] += 1
+            stats["db_ms_histogram"][bisect_left(DURATION_MS_BUCKETS, db_ms)] += 1
+            stats["total_ms_histogram"][bisect_left(DURATION_MS_BUCKETS, total_ms)] += 1
+
+    def snapshot(self) -> Dict:
+        """Per-route summary, heaviest routes (by mean queries) first"""
+        with self._lock:
+            routes = {
+                route: {key: list(value) if isinstance(value, list) else value for key, value in stats.items()}
+                for route, stats in self._routes.items()
+            }
+
+        query_labels = _bucket_labels(QUERY_COUNT_BUCKETS)
+        duration_labels = _bucket_labels(DURATION_MS_BUCKETS)
+        result = []
+        for route, stats in routes.items():
+            requests = stats["requests"]
+            result.append({
+                "route": route,
+                "requests": requests,
+                "over_budget": stats["over_budget"],
+                "queries_mean": round(stats["queries_total"] / requests, 2),
+                "queries_max": stats["queries_max"],
+                "db_ms_mean": round(stats["db_ms_total"] / requests, 2),
+                "total_ms_mean": round(stats["total_ms_total"] / requests, 2),
+                "total_ms_max": round(stats["total_ms_max"], 2),
+                "queries_histogram": dict(zip(query_labels, stats["queries_histogram"])),
+                "db_ms_histogram": dict(zip(duration_labels, stats["db_ms_histogram"])),
+                "total_ms_histogram": dict(zip(duration_labels, stats["total_ms_histogram"])),
+            })
+        result.sort(key=lambda item: item["queries_mean"], reverse=True)
+        return {
+            "since": self.started_at,
+            "query_budget": settings.QUERY_BUDGET_PER_REQUEST,
+            "routes": result,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes = {}
+            self.started_at = time.time()
+
+
+route_stats = RouteStatsRegistry()
+
+
+class QueryProfilingMiddleware(BaseHTTPMiddleware):
+    """Count queries per request, add Server-Timing and record route stats"""
+
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.db_seconds * 1000
+
+        # Route templates keep the stats bounded; unmatched paths share one entry
+        route = request.scope.get("route")
+        route_path = f"{request.method} {route.path}" if route is not None else "unmatched"
+        over_budget = stats.queries > settings.QUERY_BUDGET_PER_REQUEST
+
+        response.headers.append(
+            "Server-Timing",
+            f'db;dur={db_ms:.1f};desc="{stats.queries} queries", app;dur={total_ms:.1f}',
+        )
+        route_stats.record(route_path, stats.queries, db_ms, total_ms, over_budget)
+
+        if over_budget or settings.QUERY_PROFILING_LOG_ALL:
+            record = {
+                "event": "query_budget_exceeded" if over_budget else "request_profile",
+                "route": route_path,
+                "path": request.url.path,
+                "status": response.status_code,
+                "queries": stats.queries,
+                "query_budget": settings.QUERY_BUDGET_PER_REQUEST,
+                "db_ms": round(db_ms, 1),
+                "total_ms": round(total_ms, 1),
+            }
+            logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps(record))
+
+        return response
@@ -0,0 +1,402 @@
+"""
+Delta sync for offline-capable mobile clients
+Each entity is scanned by its (updated_at, id) index from the client's cursor,
+so a sync only reads and serializes rows that changed; deletes are recorded as
+SyncTombstone rows by mapper events (bulk deletes by do_orm_execute) and
+scanned the same way by (deleted_at, id). A technician taken off a service
+gets a tombstone of their own, since the service itself didn't change.
+
+The sync token is an opaque base64 string holding one cursor per stream
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, delete, event, exists, inspect, or_, select
+from sqlalchemy.orm import Session, joinedload
+from app.models.user import User, UserRole
+from app.models.customer import Customer
+from app.models.service import ServiceSchedule
+from app.models.service_technician import ServiceTechnician
+from app.models.callback import CallBack
+from app.models.repair import Repair
+from app.models.complaint import Complaint
+from app.models.sync_tombstone import SyncTombstone
+from app.schemas.customer import CustomerResponse
+from app.utils.agenda import LEGACY_TECHNICIAN_COLUMNS
+from app.utils.claims import parse_technician_ids
+from app.utils.loaders import service_schedule_load_options, serialize_service_schedule
+
+SYNC_TOKEN_VERSION = 1
+
+# Rows per stream per request; clients keep pulling while has_more is true
+DEFAULT_SYNC_PAGE_SIZE = 500
+MAX_SYNC_PAGE_SIZE = 2000
+
+# updated_at is stamped at flush time, before commit: a finished stream's
+# cursor stays this far behind the server clock so rows committed late are
+# picked up on the next sync (clients upsert, so repeats are harmless)
+SYNC_OVERLAP_SECONDS = 30
+
+# Synced entities in the order they are returned (parents first)
+SYNC_ENTITIES = {
+    "customers": Customer,
+    "services": ServiceSchedule,
+    "callbacks": CallBack,
+    "repairs": Repair,
+    "complaints": Complaint,
+}
+DELETED_STREAM = "deleted"
+
+Cursor = Optional[Tuple[datetime, str]]
+
+
+def encode_sync_token(cursors: Dict[str, Cursor]) -> str:
+    payload = {
+        "v": SYNC_TOKEN_VERSION,
+        "c": {
+            stream: [cursor[0].isoformat(), cursor[1]]
+            for stream, cursor in cursors.items()
+            if cursor is not None
+        },
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: Optional[str]) -> Dict[str, Cursor]:
+    """Cursors from a sync token; an empty token means a full sync"""
+    if not token:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != SYNC_TOKEN_VERSION:
+            raise ValueError("unsupported version")
+        return {
+            stream: (datetime.fromisoformat(value[0]), str(value[1]))
+            for stream, value in payload["c"].items()
+        }
+    except (ValueError, KeyError, TypeError, IndexError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token; sync again without 'since' to start over"
+        )
+
+
+def _after_cursor(time_column, id_column, cursor: Cursor):
+    if cursor is None:
+        return None
+    cursor_time, cursor_id = cursor
+    return or_(time_column > cursor_time, and_(time_column == cursor_time, id_column > cursor_id))
+
+
+def _scan(query, time_column, id_column, cursor: Cursor, limit: int):
+    """Rows after the cursor in (time, id) order; returns (rows, has_more)"""
+    query = query.filter(time_column.isnot(None))
+    condition = _after_cursor(time_column, id_column, cursor)
+    if condition is not None:
+        query = query.filter(condition)
+    rows = query.order_by(time_column, id_column).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def _next_cursor(cursor: Cursor, last: Cursor, has_more: bool, safe_point: datetime) -> Cursor:
+    if has_more:
+        return last
+    # Stream is complete: move up to the safe point, never backwards
+    safe = (safe_point, "")
+    if cursor is not None and cursor > safe:
+        return cursor
+    return safe
+
+
+def _visible_query(db: Session, entity: str, user: User):
+    """Base query for an entity, limited to what the user can see"""
+    model = SYNC_ENTITIES[entity]
+    query = db.query(model)
+    role = user.role
+
+    if entity == "services":
+        query = query.options(*service_schedule_load_options())
+        if role == UserRole.TECHNICIAN:
+            # Same scope as the technician service lists, plus multi-technician assignments
+            query = query.filter(or_(
+                ServiceSchedule.technician_id == user.id,
+                ServiceSchedule.technician2_id == user.id,
+                ServiceSchedule.technician3_id == user.id,
+                exists().where(
+                    ServiceTechnician.service_id == ServiceSchedule.id,
+                    ServiceTechnician.technician_id == user.id,
+                ),
+            ))
+    elif entity in ("callbacks", "repairs", "complaints"):
+        query = query.options(joinedload(model.customer))
+
+    if role == UserRole.CUSTOMER:
+        # Customer accounts only see their company's complaints (as GET /complaints)
+        if entity != "complaints":
+            return None
+        query = query.filter(Complaint.customer_id == user.customer_id)
+
+    return query
+
+
+def _serialize_customer(customer: Customer) -> dict:
+    return CustomerResponse.model_validate(customer).model_dump()
+
+
+def _serialize_callback(callback: CallBack) -> dict:
+    data = {
+        "id": callback.id,
+        "job_id": callback.job_id,
+        "customer_id": callback.customer_id,
+        "created_by_admin_id": callback.created_by_admin_id,
+        "scheduled_date": callback.scheduled_date,
+        "status": callback.status,
+        "description": callback.description,
+        "notes": callback.notes,
+        "technicians": parse_technician_ids(callback.technicians),
+        "responded_at": callback.responded_at,
+        "picked_at": callback.picked_at,
+        "on_the_way_at": callback.on_the_way_at,
+        "at_site_at": callback.at_site_at,
+        "completed_at": callback.completed_at,
+        "created_at": callback.created_at,
+        "updated_at": callback.updated_at,
+    }
+    if callback.customer:
+        data["customer_name"] = callback.customer.name
+        data["customer_job_number"] = callback.customer.job_number
+    return data
+
+
+def _serialize_repair(repair: Repair) -> dict:
+    data = {
+        "id": repair.id,
+        "customer_id": repair.customer_id,
+        "created_by_admin_id": repair.created_by_admin_id,
+        "customer_name": repair.customer_name,
+        "contact_number": repair.contact_number,
+        "scheduled_date": repair.scheduled_date,
+        "status": repair.status,
+        "description": repair.description,
+        "notes": repair.notes,
+        "technicians": parse_technician_ids(repair.technicians),
+        "completed_at": repair.completed_at,
+        "created_at": repair.created_at,
+        "updated_at": repair.updated_at,
+    }
+    if repair.customer:
+        data["existing_customer_name"] = repair.customer.name
+        data["customer_job_number"] = repair.customer.job_number
+    return data
+
+
+def _serialize_complaint(complaint: Complaint) -> dict:
+    data = {
+        "id": complaint.id,
+        "complaint_id": complaint.complaint_id,
+        "customer_id": complaint.customer_id,
+        "user_id": complaint.user_id,
+        "title": complaint.title,
+        "description": complaint.description,
+        "issue_type": complaint.issue_type,
+        "status": complaint.status,
+        "priority": complaint.priority,
+        "assigned_to_id": complaint.assigned_to_id,
+        "resolved_at": complaint.resolved_at,
+        "resolution_notes": complaint.resolution_notes,
+        "created_at": complaint.created_at,
+        "updated_at": complaint.updated_at,
+    }
+    if complaint.customer:
+        data["customer_name"] = complaint.customer.name
+        data["customer_phone"] = complaint.customer.phone
+    return data
+
+
+SERIALIZERS = {
+    "customers": _serialize_customer,
+    "services": serialize_service_schedule,
+    "callbacks": _serialize_callback,
+    "repairs": _serialize_repair,
+    "complaints": _serialize_complaint,
+}
+
+
+def build_sync_payload(db: Session, user: User, since: Optional[str], entities: List[str], limit: int) -> dict:
+    """
+    Changes and deletions visible to the user since the token
+    Every requested stream advances independently; has_more is true while
+    any stream still has rows beyond this page
+    """
+    cursors = decode_sync_token(since)
+    server_time = datetime.utcnow()
+    safe_point = server_time - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+
+    changes = {}
+    has_more = False
+    next_cursors = dict(cursors)
+    for entity in entities:
+        model = SYNC_ENTITIES[entity]
+        query = _visible_query(db, entity, user)
+        if query is None:
+            changes[entity] = []
+            continue
+        cursor = cursors.get(entity)
+        rows, more = _scan(query, model.updated_at, model.id, cursor, limit)
+        changes[entity] = [SERIALIZERS[entity](row) for row in rows]
+        last = (rows[-1].updated_at, rows[-1].id) if rows else None
+        next_cursors[entity] = _next_cursor(cursor, last, more, safe_point)
+        has_more = has_more or more
+
+    # Deletions are ids only, so they are not filtered by entity (one cursor
+    # covers every entity); revocations go to their user only
+    deleted = {entity: [] for entity in SYNC_ENTITIES}
+    cursor = cursors.get(DELETED_STREAM)
+    tombstones, more = _scan(
+        db.query(SyncTombstone).filter(or_(SyncTombstone.user_id.is_(None), SyncTombstone.user_id == user.id)),
+        SyncTombstone.deleted_at, SyncTombstone.id, cursor, limit,
+    )
+    for tombstone in tombstones:
+        deleted.setdefault(tombstone.entity, []).append(tombstone.entity_id)
+    last = (tombstones[-1].deleted_at, tombstones[-1].id) if tombstones else None
+    next_cursors[DELETED_STREAM] = _next_cursor(cursor, last, more, safe_point)
+    has_more = has_more or more
+
+    return {
+        "since": since,
+        "next": encode_sync_token(next_cursors),
+        "has_more": has_more,
+        "server_time": server_time,
+        "changes": changes,
+        "deleted": deleted,
+    }
+
+
+def _insert_tombstone(connection, entity: str, entity_id: str, user_id: Optional[str] = None) -> None:
+    connection.execute(SyncTombstone.__table__.insert().values(
+        id=str(uuid.uuid4()),
+        entity=entity,
+        entity_id=entity_id,
+        deleted_at=datetime.utcnow(),
+        user_id=user_id,
+    ))
+
+
+def _record_tombstone(entity: str):
+    def after_delete(mapper, connection, target):
+        _insert_tombstone(connection, entity, target.id)
+    return after_delete
+
+
+for _entity, _model in SYNC_ENTITIES.items():
+    event.listen(_model, "after_delete", _record_tombstone(_entity))
+
+
+def _revoke_services(connection, pairs, removed_assignment_ids=()) -> None:
+    """
+    Tombstone (service_id, technician_id) pairs the technician can no longer
+    see; assignments in removed_assignment_ids are about to be deleted
+    """
+    for service_id, technician_id in pairs:
+        assigned = exists().where(
+            ServiceTechnician.service_id == ServiceSchedule.id,
+            ServiceTechnician.technician_id == technician_id,
+            ServiceTechnician.id.notin_(removed_assignment_ids),
+        )
+        visible = or_(
+            *(getattr(ServiceSchedule, column) == technician_id for column in LEGACY_TECHNICIAN_COLUMNS),
+            assigned,
+        )
+        row = connection.execute(
+            select(ServiceSchedule.id, visible).where(ServiceSchedule.id == service_id)
+        ).first()
+        # A deleted service already has a tombstone for everyone
+        if row is not None and not row[1]:
+            _insert_tombstone(connection, "services", service_id, technician_id)
+
+
+def _restore_services(connection, pairs) -> None:
+    """Drop revocations of services the technician can see again"""
+    for service_id, technician_id in pairs:
+        connection.execute(delete(SyncTombstone).where(
+            SyncTombstone.entity == "services",
+            SyncTombstone.entity_id == service_id,
+            SyncTombstone.user_id == technician_id,
+        ))
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_reassigned_services(session, flush_context, instances):
+    # The other technicians on a service see its crew change on their next sync
+    for assignment in (*session.new, *session.deleted):
+        if isinstance(assignment, ServiceTechnician) and assignment.service_id:
+            service = session.get(ServiceSchedule, assignment.service_id)
+            if service is not None and service not in session.deleted:
+                service.updated_at = datetime.utcnow()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_service_visibility(session, flush_context):
+    # Flushed state is still pre-flush here: deleted assignments and the old
+    # values of the legacy technician columns are available
+    lost, gained = set(), set()
+    for assignment in session.deleted:
+        if isinstance(assignment, ServiceTechnician):
+            lost.add((assignment.service_id, assignment.technician_id))
+    for assignment in session.new:
+        if isinstance(assignment, ServiceTechnician):
+            gained.add((assignment.service_id, assignment.technician_id))
+    for service in session.dirty:
+        if not isinstance(service, ServiceSchedule):
+            continue
+        state = inspect(service)
+        for column in LEGACY_TECHNICIAN_COLUMNS:
+            history = state.attrs[column].history
+            lost.update((service.id, old) for old in history.deleted if old)
+            gained.update((service.id, new) for new in history.added if new)
+    if not lost and not gained:
+        return
+    connection = session.connection()
+    _revoke_services(connection, lost - gained)
+    _restore_services(connection, gained)
+
+
+# Tombstoned entities by model
+SYNC_ENTITY_NAMES = {model: entity for entity, model in SYNC_ENTITIES.items()}
+
+
+def _rows_to_delete(statement, *columns):
+    """SELECT of the columns of the rows a DELETE statement matches"""
+    query = select(*columns)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    return query
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_deletes(orm_execute_state):
+    # Query.delete() and ORM delete() statements skip the mapper events;
+    # read what they will delete first (same transaction)
+    if not orm_execute_state.is_delete or orm_execute_state.bind_mapper is None:
+        return
+    model = orm_execute_state.bind_mapper.class_
+    statement = orm_execute_state.statement
+    connection = orm_execute_state.session.connection()
+    if model in SYNC_ENTITY_NAMES:
+        ids = connection.execute(_rows_to_delete(statement, model.id)).scalars().all()
+        for entity_id in ids:
+            _insert_tombstone(connection, SYNC_ENTITY_NAMES[model], entity_id)
+    elif model is ServiceTechnician:
+        assignments = connection.execute(_rows_to_delete(
+            statement, ServiceTechnician.id, ServiceTechnician.service_id, ServiceTechnician.technician_id,
+        )).all()
+        _revoke_services(
+            connection,
+            {(service_id, technician_id) for _, service_id, technician_id in assignments},
+            [assignment_id for assignment_id, _, _ in assignments],
+        )
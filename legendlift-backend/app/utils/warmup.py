@@ -0,0 +1,120 @@
+"""
+Start-up warm-up behind the /ready endpoint
+The server accepts requests as soon as the app is imported; this background
+thread then does the work that would otherwise land on the first requests:
+import the remaining routers, configure the ORM mappers, open a few pooled
+database connections and build the in-memory customer spatial index
+Failed steps (database not reachable yet) are retried until they succeed
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from app.api.routers import LazyRouters
+from app.db.session import SessionLocal, engine
+from app.utils.geo_index import customer_index
+
+logger = logging.getLogger("legendlift.warmup")
+
+# Connections opened (and returned to the pool) during warm-up
+WARM_POOL_CONNECTIONS = 4
+
+# Head start for the requests that arrive right after a restart: warming at
+# the same time would slow them down (imports hold the GIL)
+START_DELAY_SECONDS = 1.0
+
+RETRY_INTERVAL_SECONDS = 5
+
+
+def _warm_pool() -> None:
+    size = getattr(engine.pool, "size", lambda: 1)()
+    connections = []
+    try:
+        for _ in range(max(1, min(size, WARM_POOL_CONNECTIONS))):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _warm_caches() -> None:
+    db = SessionLocal()
+    try:
+        customer_index.ensure_fresh(db)
+    finally:
+        db.close()
+
+
+class Warmup:
+    """Runs the warm-up steps once in a background thread and reports progress"""
+
+    def __init__(self):
+        self._thread = None
+        self._stopping = threading.Event()
+        self._done = {}
+        self._started_at = None
+        self._finished_at = None
+        self.error = None
+
+    def _steps(self, routers: LazyRouters) -> List[Tuple[str, Callable[[], None]]]:
+        return [
+            ("routers", routers.load_all),
+            ("mappers", configure_mappers),
+            ("pool", _warm_pool),
+            ("caches", _warm_caches),
+        ]
+
+    def _run(self, routers: LazyRouters) -> None:
+        steps = self._steps(routers)
+        if self._stopping.wait(START_DELAY_SECONDS):
+            return
+        while not self._stopping.is_set():
+            for name, step in steps:
+                if self._done.get(name):
+                    continue
+                try:
+                    step()
+                except Exception as exc:
+                    self.error = f"{name}: {exc}"
+                    logger.warning("Warm-up step %s failed, retrying in %ss: %s", name, RETRY_INTERVAL_SECONDS, exc)
+                    break
+                self._done[name] = True
+            else:
+                self.error = None
+                self._finished_at = time.monotonic()
+                logger.info("Warm-up finished in %.0f ms", (self._finished_at - self._started_at) * 1000)
+                return
+            self._stopping.wait(RETRY_INTERVAL_SECONDS)
+
+    def start(self, routers: LazyRouters) -> None:
+        """Start the warm-up thread (idempotent)"""
+        if self._thread is not None:
+            return
+        self._started_at = time.monotonic()
+        self._done = {name: False for name, _ in self._steps(routers)}
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, args=(routers,), name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._finished_at is not None
+
+    def status(self) -> Dict:
+        finished_at = self._finished_at
+        return {
+            "status": "ready" if self.ready else "warming",
+            "checks": dict(self._done),
+            "warmup_ms": round((finished_at - self._started_at) * 1000, 1) if finished_at is not None else None,
+            "error": self.error,
+        }
+
+
+warmup = Warmup()
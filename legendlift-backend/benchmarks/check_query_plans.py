@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Query plan regression check
+Runs EXPLAIN for the registered hot queries (same filter/sort shape as the
+router code they mirror) against the seeded benchmark database and fails if
+any of them reads a hot table with a sequential scan
+
+- SQLite: EXPLAIN QUERY PLAN; a "SCAN <table>" step without an index is a
+  sequential scan. "USE TEMP B-TREE" (sort not served by an index) is
+  reported as a warning.
+- PostgreSQL: EXPLAIN (FORMAT JSON); any "Seq Scan" node fails.
+
+Statistics are refreshed with ANALYZE first so the planner sees the data.
+
+Usage:
+    python benchmarks/seed_data.py --customers 10000 --reset
+    python benchmarks/check_query_plans.py
+    python benchmarks/check_query_plans.py --only complaints_assigned --verbose
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from seed_data import DEFAULT_DATABASE_URL, BENCH_ADMIN_EMAIL  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fail if a hot query falls back to a sequential scan")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--only", default=None, help="Comma-separated query names")
+    parser.add_argument("--skip-analyze", action="store_true", help="Don't refresh planner statistics first")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    return parser.parse_args()
+
+
+def build_hot_queries(db):
+    """
+    (name, source, query) for every registered hot query
+    Parameters come from the seeded data so selectivity is realistic
+    """
+    from sqlalchemy import and_, func, or_
+    from app.models.user import User, UserRole
+    from app.models.customer import Customer
+    from app.models.service import ServiceSchedule, ServiceReport, ServiceStatus
+    from app.models.callback import CallBack, CallBackStatus
+    from app.models.repair import Repair, RepairStatus
+    from app.models.complaint import Complaint, ComplaintStatus
+    from app.models.payment import Payment
+    from app.models.technician_agenda import TechnicianAgenda
+
+    # Busiest customer and technician: the worst realistic case for their history lists
+    customer_id = db.query(ServiceSchedule.customer_id).group_by(
+        ServiceSchedule.customer_id
+    ).order_by(func.count().desc()).limit(1).scalar()
+    technician_id = db.query(User.id).filter(User.role == UserRole.TECHNICIAN).order_by(User.email).limit(1).scalar()
+    service_id = db.query(ServiceReport.service_id).limit(1).scalar()
+    if customer_id is None or technician_id is None:
+        sys.exit("❌ No seeded data found - run benchmarks/seed_data.py first")
+
+    customer = db.get(Customer, customer_id)
+    period_start = datetime.combine(customer.amc_valid_from, datetime.min.time())
+    period_end = datetime.combine(customer.amc_valid_to, datetime.max.time())
+    now = datetime.utcnow()
+    last_month = now - timedelta(days=30)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    return [
+        ("services_by_customer", "services.get_service_schedules",
+         db.query(ServiceSchedule).filter(ServiceSchedule.customer_id == customer_id)
+         .order_by(ServiceSchedule.scheduled_date.desc()).limit(100)),
+        ("services_amc_period", "advanced_reports customer AMC report",
+         db.query(ServiceSchedule).filter(
+             ServiceSchedule.customer_id == customer_id,
+             ServiceSchedule.scheduled_date >= period_start,
+             ServiceSchedule.scheduled_date <= period_end,
+         ).order_by(ServiceSchedule.scheduled_date)),
+        ("services_technician_history", "technician_services.get_service_history",
+         db.query(ServiceSchedule).filter(
+             ServiceSchedule.technician_id == technician_id,
+             ServiceSchedule.status == ServiceStatus.COMPLETED,
+         ).order_by(ServiceSchedule.actual_date.desc()).limit(50)),
+        ("services_technician_pending", "technician_services.check_in_service",
+         db.query(ServiceSchedule.id).filter(
+             ServiceSchedule.customer_id == customer_id,
+             ServiceSchedule.technician_id == technician_id,
+             ServiceSchedule.status.in_([ServiceStatus.PENDING, ServiceStatus.SCHEDULED]),
+         )),
+        ("services_open_by_date", "technician_services.get_available_tickets",
+         db.query(ServiceSchedule.id).filter(
+             ServiceSchedule.status.in_([ServiceStatus.PENDING, ServiceStatus.SCHEDULED]),
+         ).order_by(ServiceSchedule.scheduled_date, ServiceSchedule.id).limit(50)),
+        ("services_dashboard_window", "dashboard.get_dashboard_overview",
+         db.query(func.count(ServiceSchedule.id)).filter(ServiceSchedule.created_at >= last_month)),
+        ("services_dashboard_completed", "dashboard.get_dashboard_overview",
+         db.query(func.count(ServiceSchedule.id)).filter(
+             ServiceSchedule.created_at >= last_month,
+             ServiceSchedule.status == ServiceStatus.COMPLETED,
+         )),
+        ("services_monthly_report", "reports.get_monthly_report",
+         db.query(ServiceSchedule).filter(and_(
+             ServiceSchedule.created_at >= month_start,
+             ServiceSchedule.created_at < now,
+         ))),
+        ("reports_by_service", "services.get_service_reports",
+         db.query(ServiceReport).filter(ServiceReport.service_id == service_id)
+         .order_by(ServiceReport.created_at.desc()).limit(100)),
+        ("reports_dashboard_window", "dashboard.get_dashboard_overview",
+         db.query(func.count(ServiceReport.id)).filter(
+             ServiceReport.created_at >= last_month,
+             ServiceReport.check_out_time.isnot(None),
+         )),
+        ("callbacks_amc_period", "advanced_reports customer AMC report",
+         db.query(CallBack).filter(
+             CallBack.customer_id == customer_id,
+             CallBack.scheduled_date >= period_start,
+             CallBack.scheduled_date <= period_end,
+         ).order_by(CallBack.scheduled_date)),
+        ("callbacks_dashboard_completed", "dashboard.get_dashboard_overview",
+         db.query(func.count(CallBack.id)).filter(
+             CallBack.created_at >= last_month,
+             CallBack.status == CallBackStatus.COMPLETED,
+         )),
+        ("repairs_amc_period", "advanced_reports customer AMC report",
+         db.query(Repair).filter(
+             Repair.customer_id == customer_id,
+             Repair.created_at >= period_start,
+             Repair.created_at <= period_end,
+         ).order_by(Repair.created_at)),
+        ("repairs_dashboard_completed", "dashboard.get_dashboard_overview",
+         db.query(func.count(Repair.id)).filter(
+             Repair.created_at >= last_month,
+             Repair.status == RepairStatus.COMPLETED,
+         )),
+        ("complaints_assigned", "complaints.get_my_callbacks",
+         db.query(Complaint).filter(Complaint.assigned_to_id == technician_id)),
+        ("complaints_available", "complaints.get_available_callbacks",
+         db.query(Complaint).filter(
+             Complaint.assigned_to_id.is_(None),
+             or_(Complaint.status == ComplaintStatus.OPEN, Complaint.status == ComplaintStatus.IN_PROGRESS),
+         )),
+        ("complaints_by_customer", "complaints.get_complaints",
+         db.query(Complaint).filter(Complaint.customer_id == customer_id)
+         .order_by(Complaint.created_at.desc()).limit(100)),
+        ("payments_by_customer", "payments.get_payments",
+         db.query(Payment).filter(Payment.customer_id == customer_id)
+         .order_by(Payment.due_date.desc()).limit(100)),
+        ("payments_amc_period", "advanced_reports customer AMC report",
+         db.query(Payment).filter(
+             Payment.customer_id == customer_id,
+             or_(
+                 and_(Payment.due_date >= period_start, Payment.due_date <= period_end),
+                 and_(Payment.paid_date >= period_start, Payment.paid_date <= period_end),
+             ),
+         ).order_by(Payment.due_date)),
+        ("agenda_today", "technician_services.get_my_today_services",
+         db.query(TechnicianAgenda.service_id).filter(
+             TechnicianAgenda.technician_id == technician_id,
+             TechnicianAgenda.day <= now.date(),
+         ).order_by(TechnicianAgenda.day)),
+        ("sync_services_changed", "sync.build_sync_payload",
+         db.query(ServiceSchedule.id).filter(
+             ServiceSchedule.updated_at.isnot(None),
+             ServiceSchedule.updated_at > last_month,
+         ).order_by(ServiceSchedule.updated_at, ServiceSchedule.id).limit(500)),
+    ]
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN <statement>, compiled with the statement's own bind parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement, prefix):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return f"{element.prefix} {compiler.process(element.statement, **kw)}"
+
+
+def explain_sqlite(conn, statement):
+    """(plan lines, sequential scans, warnings)"""
+    rows = conn.execute(Explain(statement, "EXPLAIN QUERY PLAN")).fetchall()
+    details = [row[-1] for row in rows]
+    scans = [
+        detail for detail in details
+        if detail.startswith("SCAN ") and "INDEX" not in detail
+        and not detail.startswith(("SCAN CONSTANT ROW", "SCAN (subquery"))
+    ]
+    warnings = [detail for detail in details if detail.startswith("USE TEMP B-TREE")]
+    return details, scans, warnings
+
+
+def explain_postgresql(conn, statement):
+    """(plan lines, sequential scans, warnings)"""
+    plan = conn.execute(Explain(statement, "EXPLAIN (FORMAT JSON)")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    lines, scans, warnings = [], [], []
+
+    def walk(node, depth):
+        label = node["Node Type"]
+        if node.get("Relation Name"):
+            label += f" on {node['Relation Name']}"
+        if node.get("Index Name"):
+            label += f" using {node['Index Name']}"
+        lines.append("  " * depth + label)
+        if node["Node Type"] == "Seq Scan":
+            scans.append(label)
+        if node["Node Type"] == "Sort":
+            warnings.append(f"Sort on {', '.join(node.get('Sort Key', []))}")
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"], 0)
+    return lines, scans, warnings
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    os.environ.setdefault("FIRST_SUPERUSER_EMAIL", BENCH_ADMIN_EMAIL)
+    os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "benchmark")
+
+    from app.db.session import SessionLocal, engine
+
+    explain = {"sqlite": explain_sqlite, "postgresql": explain_postgresql}.get(engine.dialect.name)
+    if explain is None:
+        sys.exit(f"❌ Unsupported database: {engine.dialect.name}")
+
+    print("=" * 60)
+    print("LegendLift query plan check")
+    print("=" * 60)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+
+    if not args.skip_analyze:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        print("📊 Planner statistics refreshed (ANALYZE)")
+
+    db = SessionLocal()
+    try:
+        queries = build_hot_queries(db)
+        if args.only:
+            wanted = {name.strip() for name in args.only.split(",")}
+            queries = [query for query in queries if query[0] in wanted]
+
+        failures = []
+        print(f"\n{'query':<32}result")
+        with engine.connect() as conn:
+            for name, source, query in queries:
+                lines, scans, warnings = explain(conn, query.statement)
+                if scans:
+                    failures.append(name)
+                    print(f"{name:<32}❌ sequential scan: {'; '.join(scans)}  ({source})")
+                elif warnings:
+                    print(f"{name:<32}✓ index  ⚠️  {'; '.join(warnings)}")
+                else:
+                    print(f"{name:<32}✓ index")
+                if args.verbose or scans:
+                    for line in lines:
+                        print(f"    {line}")
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n❌ {len(failures)} of {len(queries)} hot queries use a sequential scan: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\n✅ All {len(queries)} hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
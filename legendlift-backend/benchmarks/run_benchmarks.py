@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+In-process API benchmark
+Drives the FastAPI app through an ASGI test client (no server, no network)
+against a seeded database, and records p50/p95/p99 latency and query counts
+per endpoint to JSON so runs can be compared between commits
+
+Query counts and DB time come from the Server-Timing header added by the
+query profiling middleware.
+
+Usage:
+    python benchmarks/seed_data.py --customers 10000 --reset
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<previous>.json --fail-on-regression
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from seed_data import DEFAULT_DATABASE_URL, BENCH_ADMIN_EMAIL  # noqa: E402
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+SERVER_TIMING_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark hot API endpoints in-process")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", default=None, help="Comma-separated benchmark names")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed p95 slowdown before flagging (0.20 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = (len(ordered) - 1) * fraction
+    low = int(index)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (index - low)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_scenarios(db):
+    """(name, user email, path, params) for the hot endpoints, using ids from the seeded data"""
+    from sqlalchemy import func
+    from app.models.user import User, UserRole
+    from app.models.customer import Customer
+    from app.models.callback import CallBack
+    from app.models.technician_agenda import TechnicianAgenda
+
+    # Busiest technician today gives the heaviest realistic morning board
+    technician = db.query(User.email).join(
+        TechnicianAgenda, TechnicianAgenda.technician_id == User.id
+    ).filter(
+        TechnicianAgenda.day <= date.today()
+    ).group_by(User.email).order_by(func.count().desc()).first()
+    if technician is None:
+        technician = db.query(User.email).filter(User.role == UserRole.TECHNICIAN).first()
+    customer = db.query(Customer).filter(Customer.latitude.isnot(None)).order_by(Customer.job_number).first()
+    callback = db.query(CallBack.id).order_by(CallBack.job_id).first()
+    if technician is None or customer is None:
+        sys.exit("❌ No seeded data found - run benchmarks/seed_data.py first")
+
+    admin = BENCH_ADMIN_EMAIL
+    tech = technician.email
+    today = date.today().isoformat()
+    scenarios = [
+        ("customers_list", admin, "/api/v1/customers/", {"limit": 100}),
+        ("customers_nearby", tech, "/api/v1/customers/nearby", {"lat": customer.latitude, "lng": customer.longitude, "radius": 3}),
+        ("customer_detail", admin, f"/api/v1/customers/{customer.id}", {}),
+        ("service_schedules", admin, "/api/v1/services/schedules", {"limit": 100}),
+        ("services_today", admin, "/api/v1/services/schedules/today", {}),
+        ("dispatch_plan", admin, "/api/v1/services/dispatch-plan", {"date": today}),
+        ("technician_today", tech, "/api/v1/technician/my-services/today", {}),
+        ("available_tickets", tech, "/api/v1/technician/available-tickets", {}),
+        ("callbacks_list", admin, "/api/v1/callbacks/", {"limit": 100}),
+        ("repairs_list", admin, "/api/v1/repairs/", {"limit": 100}),
+        ("complaints_list", admin, "/api/v1/complaints/", {"limit": 100}),
+        ("dashboard_overview", admin, "/api/v1/dashboard/overview", {}),
+        ("sync_technician", tech, "/api/v1/sync", {"limit": 500}),
+    ]
+    if callback is not None:
+        scenarios.append(("callback_detail", admin, f"/api/v1/callbacks/{callback.id}", {}))
+    return scenarios
+
+
+def run_scenario(client, headers, path, params, iterations, warmup):
+    latencies, db_times, queries, statuses = [], [], [], set()
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        response = client.get(path, params=params, headers=headers)
+        elapsed = (time.perf_counter() - started) * 1000
+        if i < warmup:
+            continue
+        statuses.add(response.status_code)
+        latencies.append(elapsed)
+        match = SERVER_TIMING_RE.search(response.headers.get("server-timing", ""))
+        if match:
+            db_times.append(float(match.group(1)))
+            queries.append(int(match.group(2)))
+    return {
+        "status": sorted(statuses),
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "min_ms": round(min(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+        "queries": int(statistics.median(queries)) if queries else None,
+        "db_p50_ms": round(percentile(db_times, 0.50), 2) if db_times else None,
+    }
+
+
+def compare(current, baseline_path, threshold):
+    """Print deltas against an earlier run; returns the names that regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparison with {os.path.basename(baseline_path)} (commit {baseline['meta'].get('commit')})")
+    print(f"{'benchmark':<22}{'p95 before':>12}{'p95 now':>10}{'change':>9}{'queries':>12}")
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<22}{'-':>12}{result['p95_ms']:>10.1f}{'new':>9}")
+            continue
+        change = result["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        query_change = f"{before['queries']}->{result['queries']}"
+        slower = change > threshold
+        more_queries = (result["queries"] or 0) > (before["queries"] or 0)
+        flag = "  ⚠️" if slower or more_queries else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<22}{before['p95_ms']:>12.1f}{result['p95_ms']:>10.1f}{change:>+9.0%}{query_change:>12}{flag}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    os.environ.setdefault("FIRST_SUPERUSER_EMAIL", BENCH_ADMIN_EMAIL)
+    os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "benchmark")
+    os.environ["QUERY_PROFILING_ENABLED"] = "True"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.session import SessionLocal, engine
+    import app.models as models
+
+    # Over-budget warnings would interleave with the table; counts are recorded below
+    logging.getLogger("legendlift.query_profiler").setLevel(logging.ERROR)
+
+    db = SessionLocal()
+    scenarios = build_scenarios(db)
+    scale = {
+        "customers": db.query(func.count(models.Customer.id)).scalar(),
+        "services": db.query(func.count(models.ServiceSchedule.id)).scalar(),
+        "callbacks": db.query(func.count(models.CallBack.id)).scalar(),
+        "technicians": db.query(func.count(models.User.id)).filter(models.User.role == models.UserRole.TECHNICIAN).scalar(),
+    }
+    db.close()
+
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",")}
+        scenarios = [scenario for scenario in scenarios if scenario[0] in wanted]
+
+    print("=" * 60)
+    print("LegendLift API benchmark")
+    print("=" * 60)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"Scale:    {scale}")
+    print(f"\n{'benchmark':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'db p50':>9}  status")
+
+    client = TestClient(app)
+    tokens = {}
+    results = {}
+    for name, email, path, params in scenarios:
+        if email not in tokens:
+            tokens[email] = {"Authorization": f"Bearer {create_access_token(email)}"}
+        result = run_scenario(client, tokens[email], path, params, args.iterations, args.warmup)
+        result["path"] = path
+        results[name] = result
+        print(f"{name:<22}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+              f"{result['queries'] if result['queries'] is not None else '-':>9}"
+              f"{result['db_p50_ms'] if result['db_p50_ms'] is not None else '-':>9}  {result['status']}")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dialect": engine.dialect.name,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.utcnow():%Y%m%d-%H%M%S}-{commit}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print(f"\n⚠️  Regressions: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seeded benchmark data generator
+Builds a reproducible LegendLift dataset at configurable scale (10k - 1M
+customers/services) with NumPy and bulk inserts it in chunks
+
+Distributions:
+- customers clustered around area centres, routes per area, 3% without GPS,
+  services_per_year weighted towards monthly AMCs, 85% active AMCs
+- services spread over +/- 6 months; past ones mostly completed (with reports
+  and parts), the rest pending/overdue; future ones pending or scheduled;
+  the primary technician usually owns the customer's route
+- callbacks, repairs and complaints per customer with realistic status and
+  priority mixes; closed callbacks/repairs carry material lists
+- one AMC contract per customer with four quarterly payments; past
+  instalments mostly paid
+- created_at follows the business events (AMC start for planned visits,
+  report check-out, callback raised), so time-window queries see a
+  realistic spread
+
+Usage:
+    python benchmarks/seed_data.py --customers 10000 --services 100000
+    python benchmarks/seed_data.py --database-url postgresql://... --customers 1000000 --services 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, date
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(BACKEND_DIR, 'benchmarks', 'bench.db')}"
+BENCH_ADMIN_EMAIL = "bench-admin@legendlift.com"
+BENCH_PASSWORD_HASH = "not-a-valid-hash"  # Benchmarks authenticate with minted tokens
+
+AREAS = [
+    # name, latitude, longitude, share of customers
+    ("Central Delhi", 28.6330, 77.2194, 0.18),
+    ("South Delhi", 28.5245, 77.2066, 0.27),
+    ("North Delhi", 28.7041, 77.1025, 0.15),
+    ("East Delhi", 28.6280, 77.2950, 0.15),
+    ("West Delhi", 28.6510, 77.0500, 0.15),
+    ("Gurugram", 28.4595, 77.0266, 0.10),
+]
+SERVICES_PER_YEAR = ([6, 9, 10, 12], [0.15, 0.10, 0.15, 0.60])
+MATERIALS = [
+    "Door sensor", "Landing door roller", "Car door belt", "Traction rope", "Brake pad",
+    "Limit switch", "Push button", "Display board", "Relay", "Contactor",
+    "Guide shoe liner", "Hydraulic oil", "Controller fuse", "Encoder", "Battery (ARD)",
+]
+CALLBACK_STATUSES = (["PENDING", "PICKED", "ON_THE_WAY", "AT_SITE", "IN_PROGRESS", "COMPLETED", "CANCELLED"],
+                     [0.08, 0.04, 0.02, 0.02, 0.04, 0.75, 0.05])
+REPAIR_STATUSES = (["PENDING", "IN_PROGRESS", "COMPLETED", "CANCELLED"], [0.15, 0.10, 0.70, 0.05])
+COMPLAINT_STATUSES = (["OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED"], [0.15, 0.10, 0.45, 0.30])
+COMPLAINT_PRIORITIES = (["LOW", "MEDIUM", "HIGH", "URGENT"], [0.25, 0.45, 0.22, 0.08])
+ISSUE_TYPES = ["breakdown", "noise", "door_issue", "stuck", "display", "other"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a seeded benchmark dataset")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+                        help="Target database (default: benchmarks/bench.db)")
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--services", type=int, default=None, help="Default: 10 per customer")
+    parser.add_argument("--technicians", type=int, default=None, help="Default: one per 200 customers (min 5)")
+    parser.add_argument("--callbacks-per-customer", type=float, default=0.3)
+    parser.add_argument("--repairs-per-customer", type=float, default=0.1)
+    parser.add_argument("--complaints-per-customer", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    return parser.parse_args()
+
+
+def make_ids(rng, count):
+    """Reproducible UUID4 strings"""
+    words = rng.integers(0, 2 ** 63, size=(count, 2), dtype=np.int64).astype(np.uint64)
+    return [str(uuid.UUID(int=(int(hi) << 64) | int(lo), version=4)) for hi, lo in words]
+
+
+def pick(rng, choices, size):
+    values, weights = choices
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights)]
+
+
+def materials_list(rng, count):
+    names = rng.choice(len(MATERIALS), size=count, replace=False)
+    return [{"name": MATERIALS[i], "quantity": int(q)} for i, q in zip(names, rng.integers(1, 4, size=count))]
+
+
+class Seeder:
+    def __init__(self, args):
+        from app.db.session import engine
+        self.engine = engine
+        self.args = args
+        self.rng = np.random.default_rng(args.seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.today = datetime.combine(date.today(), datetime.min.time())
+        self.counts = {}
+
+    def insert(self, table, columns):
+        """Bulk insert column arrays in chunks"""
+        names = list(columns)
+        total = len(columns[names[0]])
+        chunk = self.args.chunk_size
+        started = time.time()
+        with self.engine.begin() as conn:
+            for start in range(0, total, chunk):
+                end = min(start + chunk, total)
+                values = [columns[name][start:end] for name in names]
+                rows = [dict(zip(names, row)) for row in zip(*values)]
+                conn.execute(table.insert(), rows)
+        elapsed = time.time() - started
+        self.counts[table.name] = self.counts.get(table.name, 0) + total
+        print(f"  ✓ {table.name}: {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    def users(self, technician_count):
+        from app.models.user import User, UserRole
+        ids = make_ids(self.rng, technician_count + 1)
+        self.admin_id = ids[0]
+        self.technician_ids = np.asarray(ids[1:], dtype=object)
+        self.insert(User.__table__, {
+            "id": ids,
+            "name": ["Bench Admin"] + [f"Bench Technician {i + 1}" for i in range(technician_count)],
+            "email": [BENCH_ADMIN_EMAIL] + [f"bench-tech-{i + 1}@legendlift.com" for i in range(technician_count)],
+            "phone": [f"9{i:09d}" for i in range(technician_count + 1)],
+            "hashed_password": [BENCH_PASSWORD_HASH] * (technician_count + 1),
+            "role": [UserRole.ADMIN] + [UserRole.TECHNICIAN] * technician_count,
+            "active": [True] * (technician_count + 1),
+            "created_at": [self.now] * (technician_count + 1),
+            "updated_at": [self.now] * (technician_count + 1),
+        })
+
+    def customers(self, count):
+        from app.models.customer import Customer, AMCStatus
+        rng = self.rng
+        area_index = rng.choice(len(AREAS), size=count, p=[area[3] for area in AREAS])
+        centres = np.array([[area[1], area[2]] for area in AREAS])
+        coords = centres[area_index] + rng.normal(0, 0.04, size=(count, 2))
+        missing = rng.random(count) < 0.03
+        latitude = np.where(missing, np.nan, coords[:, 0])
+        longitude = np.where(missing, np.nan, coords[:, 1])
+
+        # Routes are numbered per area so each route stays geographically tight
+        routes_per_area = max(1, count // (150 * len(AREAS)))
+        route = area_index * routes_per_area + rng.integers(0, routes_per_area, size=count) + 1
+        services_per_year = np.asarray(SERVICES_PER_YEAR[0])[rng.choice(4, size=count, p=SERVICES_PER_YEAR[1])]
+        valid_from = shift(self.today, days=-rng.integers(0, 365, size=count))
+        active = rng.random(count) < 0.85
+        amount = np.round(rng.lognormal(mean=10.3, sigma=0.4, size=count), -2)
+
+        self.customer_ids = np.asarray(make_ids(rng, count), dtype=object)
+        self.customer_route = route
+        self.customer_services_per_year = services_per_year
+        self.customer_valid_from = valid_from
+        self.customer_amount = amount
+        self.customer_active = active
+        self.insert(Customer.__table__, {
+            "id": self.customer_ids,
+            "job_number": [f"BJ-{i + 1:07d}" for i in range(count)],
+            "name": [f"{AREAS[a][0].split()[0]} Tower {i + 1}" for i, a in enumerate(area_index)],
+            "area": [AREAS[a][0] for a in area_index],
+            "address": [f"{i % 500 + 1} Bench Road, {AREAS[a][0]}" for i, a in enumerate(area_index)],
+            "contact_person": [f"Facility Manager {i + 1}" for i in range(count)],
+            "phone": [f"8{i:09d}" for i in range(count)],
+            "latitude": [None if np.isnan(v) else float(v) for v in latitude],
+            "longitude": [None if np.isnan(v) else float(v) for v in longitude],
+            "route": route.tolist(),
+            "amc_valid_from": [d.date() for d in valid_from],
+            "amc_valid_to": [(d + timedelta(days=365)).date() for d in valid_from],
+            "services_per_year": services_per_year.tolist(),
+            "amc_amount": amount.tolist(),
+            "amc_amount_received": np.round(amount * rng.choice([0, 0.5, 1], size=count, p=[0.2, 0.2, 0.6]), 2).tolist(),
+            "amc_status": [AMCStatus.ACTIVE if a else AMCStatus.INACTIVE for a in active],
+            "aiims_status": (rng.random(count) < 0.05).tolist(),
+            "number_of_floors": rng.integers(2, 25, size=count).tolist(),
+            "created_at": [self.now] * count,
+            "updated_at": [self.now] * count,
+        })
+
+    def payments(self):
+        """One AMC contract per customer, paid in quarterly instalments"""
+        from app.models.contract import AMCContract, ContractType, ServiceFrequency
+        from app.models.payment import Payment, PaymentStatus
+        rng = self.rng
+        count = len(self.customer_ids)
+        contract_ids = np.asarray(make_ids(rng, count), dtype=object)
+        start = np.asarray(self.customer_valid_from, dtype="datetime64[us]")
+        self.insert(AMCContract.__table__, {
+            "id": contract_ids,
+            "customer_id": self.customer_ids,
+            "contract_type": [ContractType.ACTIVE if a else ContractType.CLOSED for a in self.customer_active],
+            "start_date": list(start.astype(object)),
+            "end_date": list(shift(start, days=365)),
+            "service_frequency": [ServiceFrequency.MONTHLY if n == 12 else ServiceFrequency.BI_MONTHLY
+                                  for n in self.customer_services_per_year],
+            "total_services": self.customer_services_per_year.tolist(),
+            "pending_services": self.customer_services_per_year.tolist(),
+            "amount": self.customer_amount.tolist(),
+            "created_at": list(start.astype(object)),
+            "updated_at": [self.now] * count,
+        })
+
+        instalments = 4
+        customer_index = np.repeat(np.arange(count), instalments)
+        due = shift(start[customer_index], days=np.tile(np.arange(instalments) * 91, count))
+        past_due = np.asarray(due, dtype="datetime64[us]") < np.datetime64(self.now, "us")
+        roll = rng.random(len(due))
+        status = np.where(past_due, np.where(roll < 0.8, "PAID", np.where(roll < 0.9, "OVERDUE", "PARTIAL")), "PENDING")
+        paid = status == "PAID"
+        paid_date = np.minimum(
+            shift(due, days=rng.integers(-5, 20, size=len(due))).astype("datetime64[us]"),
+            np.datetime64(self.now, "us"),
+        ).astype(object)
+        self.insert(Payment.__table__, {
+            "id": make_ids(rng, len(due)),
+            "customer_id": self.customer_ids[customer_index],
+            "contract_id": contract_ids[customer_index],
+            "amount": np.round(self.customer_amount[customer_index] / instalments, 2).tolist(),
+            "due_date": list(due),
+            "paid_date": list(np.where(paid, paid_date, None)),
+            "status": [PaymentStatus[s] for s in status],
+            "created_at": list(shift(due, days=-30)),
+            "updated_at": [self.now] * len(due),
+        })
+
+    def services(self, count):
+        from app.models.service import ServiceSchedule, ServiceReport, ServiceStatus, ServiceType
+        from app.models.technician_agenda import TechnicianAgenda
+        rng = self.rng
+        technician_count = len(self.technician_ids)
+
+        # More visits for customers with more services per year
+        weights = self.customer_services_per_year / self.customer_services_per_year.sum()
+        customer_index = rng.choice(len(self.customer_ids), size=count, p=weights)
+        offset_days = rng.integers(-180, 181, size=count)
+        scheduled = shift(self.today, days=offset_days, hours=rng.integers(9, 18, size=count))
+
+        past = offset_days < 0
+        roll = rng.random(count)
+        status = np.where(
+            past,
+            np.select([roll < 0.88, roll < 0.97, roll < 0.98], ["completed", "pending", "in_progress"], "overdue"),
+            np.where(offset_days == 0,
+                     np.select([roll < 0.3, roll < 0.5], ["completed", "in_progress"], "pending"),
+                     np.where(roll < 0.7, "pending", "scheduled")),
+        )
+
+        # Primary technician owns the route most of the time
+        route_owner = self.customer_route[customer_index] % technician_count
+        technician = np.where(rng.random(count) < 0.8, route_owner, rng.integers(0, technician_count, size=count))
+        has_second = rng.random(count) < 0.25
+        second = (technician + rng.integers(1, max(technician_count, 2), size=count)) % technician_count
+        unassigned = (status == "pending") & (rng.random(count) < 0.1)
+
+        status_enum = {s.value: s for s in ServiceStatus}
+        days_overdue = np.where(past & np.isin(status, ["pending", "overdue"]), -offset_days, 0)
+        service_ids = np.asarray(make_ids(rng, count), dtype=object)
+        technician_ids = np.where(unassigned, None, self.technician_ids[technician])
+        technician2_ids = np.where(has_second & ~unassigned, self.technician_ids[second], None)
+        completed = status == "completed"
+        # Visits are planned when the AMC year starts (never after the visit itself)
+        created = np.minimum(
+            self.customer_valid_from[customer_index].astype("datetime64[us]"),
+            np.asarray(scheduled, dtype="datetime64[us]") - np.timedelta64(1, "D"),
+        ).astype(object)
+
+        self.insert(ServiceSchedule.__table__, {
+            "id": service_ids,
+            "service_id": [f"BSRV-{i + 1:08d}" for i in range(count)],
+            "customer_id": self.customer_ids[customer_index],
+            "scheduled_date": list(scheduled),
+            "actual_date": [d if c else None for d, c in zip(scheduled, completed)],
+            "status": [status_enum[s] for s in status],
+            "technician_id": technician_ids,
+            "technician2_id": technician2_ids,
+            "days_overdue": days_overdue.tolist(),
+            "overdue_days": days_overdue.tolist(),
+            "is_high_priority": (days_overdue > 10).tolist(),
+            "is_adhoc": ["false"] * count,
+            "service_type": [ServiceType.SERVICE] * count,
+            "created_at": list(created),
+            "updated_at": [self.now] * count,
+            "version": [0] * count,
+        })
+
+        # One report per completed visit; ~30% replaced parts
+        done = np.flatnonzero(completed)
+        parts_count = np.where(rng.random(len(done)) < 0.3, rng.integers(1, 4, size=len(done)), 0)
+        check_out = [scheduled[i] + timedelta(minutes=int(m)) for i, m in zip(done, rng.integers(30, 150, size=len(done)))]
+        self.insert(ServiceReport.__table__, {
+            "id": make_ids(rng, len(done)),
+            "report_id": [f"BRPT-{i + 1:08d}" for i in range(len(done))],
+            "service_id": service_ids[done],
+            "technician_id": self.technician_ids[technician[done]],
+            "check_in_time": [scheduled[i] for i in done],
+            "check_out_time": check_out,
+            "work_done": ["Routine AMC service"] * len(done),
+            "parts_replaced": [[MATERIALS[j] for j in rng.choice(len(MATERIALS), size=n, replace=False)] if n else [] for n in parts_count],
+            "rating": rng.choice([3, 4, 5], size=len(done), p=[0.1, 0.4, 0.5]).tolist(),
+            "created_at": check_out,
+            "updated_at": [self.now] * len(done),
+        })
+
+        # Agenda index rows for open services (primary and second technician)
+        open_mask = np.isin(status, ["pending", "scheduled", "in_progress"])
+        agenda = {"technician_id": [], "service_id": [], "day": [], "status": [], "is_primary": [], "order": []}
+        for column, is_primary in ((technician_ids, True), (technician2_ids, False)):
+            rows = np.flatnonzero(open_mask & (column != None))  # noqa: E711 - object array comparison
+            agenda["technician_id"].extend(column[rows])
+            agenda["service_id"].extend(service_ids[rows])
+            agenda["day"].extend(scheduled[i].date() for i in rows)
+            agenda["status"].extend(status_enum[s] for s in status[rows])
+            agenda["is_primary"].extend([is_primary] * len(rows))
+            agenda["order"].extend([0 if is_primary else 1] * len(rows))
+        total = len(agenda["service_id"])
+        agenda["id"] = make_ids(rng, total)
+        agenda["created_at"] = [self.now] * total
+        agenda["updated_at"] = [self.now] * total
+        self.insert(TechnicianAgenda.__table__, agenda)
+
+    def jobs(self):
+        from app.models.callback import CallBack, CallBackStatus, LiftStatus
+        from app.models.repair import Repair, RepairStatus
+        from app.models.complaint import Complaint, ComplaintStatus, ComplaintPriority
+        rng = self.rng
+        args = self.args
+        customer_count = len(self.customer_ids)
+        technician_count = len(self.technician_ids)
+
+        def technician_lists(size, max_count):
+            counts = rng.integers(1, max_count + 1, size=size)
+            firsts = rng.integers(0, technician_count, size=size)
+            return [
+                [self.technician_ids[(first + k) % technician_count] for k in range(n)]
+                for first, n in zip(firsts, counts)
+            ]
+
+        # Callbacks
+        count = int(customer_count * args.callbacks_per_customer)
+        status = pick(rng, CALLBACK_STATUSES, count)
+        scheduled = shift(self.today, days=-rng.integers(0, 180, size=count), hours=rng.integers(8, 20, size=count))
+        closed = status == "COMPLETED"
+        self.insert(CallBack.__table__, {
+            "id": make_ids(rng, count),
+            "job_id": [f"BCB-{i + 1:07d}" for i in range(count)],
+            "customer_id": self.customer_ids[rng.integers(0, customer_count, size=count)],
+            "created_by_admin_id": [self.admin_id] * count,
+            "scheduled_date": list(scheduled),
+            "status": [CallBackStatus[s] for s in status],
+            "description": ["Lift not responding"] * count,
+            "technicians": [t if s != "PENDING" else [] for t, s in zip(technician_lists(count, 2), status)],
+            "materials_changed": [materials_list(rng, int(n)) if c else None
+                                  for c, n in zip(closed, rng.integers(0, 4, size=count))],
+            "lift_status_on_closure": [LiftStatus.NORMAL_RUNNING if c else None for c in closed],
+            "completed_at": [d + timedelta(hours=3) if c else None for d, c in zip(scheduled, closed)],
+            "created_at": list(shift(scheduled, hours=-rng.integers(1, 12, size=count))),
+            "updated_at": [self.now] * count,
+            "version": [0] * count,
+        })
+
+        # Repairs
+        count = int(customer_count * args.repairs_per_customer)
+        status = pick(rng, REPAIR_STATUSES, count)
+        scheduled = shift(self.today, days=-rng.integers(-30, 180, size=count))
+        closed = status == "COMPLETED"
+        self.insert(Repair.__table__, {
+            "id": make_ids(rng, count),
+            "customer_id": self.customer_ids[rng.integers(0, customer_count, size=count)],
+            "created_by_admin_id": [self.admin_id] * count,
+            "scheduled_date": list(scheduled),
+            "status": [RepairStatus[s] for s in status],
+            "description": ["Component replacement"] * count,
+            "technicians": technician_lists(count, 3),
+            "materials_used": [materials_list(rng, int(n)) if c else None
+                               for c, n in zip(closed, rng.integers(1, 5, size=count))],
+            "total_cost": np.round(rng.lognormal(8.5, 0.6, size=count), 2).tolist(),
+            "completed_at": [d + timedelta(days=1) if c else None for d, c in zip(scheduled, closed)],
+            "created_at": list(np.minimum(
+                shift(scheduled, days=-rng.integers(1, 8, size=count)).astype("datetime64[us]"),
+                np.datetime64(self.now, "us"),
+            ).astype(object)),
+            "updated_at": [self.now] * count,
+            "version": [0] * count,
+        })
+
+        # Complaints
+        count = int(customer_count * args.complaints_per_customer)
+        status = pick(rng, COMPLAINT_STATUSES, count)
+        assigned = (status != "OPEN") | (rng.random(count) < 0.3)
+        self.insert(Complaint.__table__, {
+            "id": make_ids(rng, count),
+            "complaint_id": [f"BCMP-{i + 1:07d}" for i in range(count)],
+            "customer_id": self.customer_ids[rng.integers(0, customer_count, size=count)],
+            "title": ["Lift issue"] * count,
+            "description": ["Reported by facility manager"] * count,
+            "issue_type": [ISSUE_TYPES[i] for i in rng.integers(0, len(ISSUE_TYPES), size=count)],
+            "priority": [ComplaintPriority[p] for p in pick(rng, COMPLAINT_PRIORITIES, count)],
+            "status": [ComplaintStatus[s] for s in status],
+            "assigned_to_id": np.where(assigned, self.technician_ids[rng.integers(0, technician_count, size=count)], None),
+            "created_at": list(shift(self.now, hours=-rng.integers(0, 24 * 180, size=count))),
+            "updated_at": [self.now] * count,
+            "version": [0] * count,
+        })
+
+
+def shift(base, days=0, hours=0):
+    """base + days + hours (arrays) as an object array of datetimes"""
+    values = np.asarray(base, dtype="datetime64[us]") + np.asarray(days).astype("timedelta64[D]") + np.asarray(hours).astype("timedelta64[h]")
+    return values.astype("datetime64[us]").astype(object)
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    os.environ.setdefault("FIRST_SUPERUSER_EMAIL", BENCH_ADMIN_EMAIL)
+    os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "benchmark")
+
+    from app.db.session import engine, Base
+    import app.models  # noqa: F401 - register every table
+
+    services = args.services if args.services is not None else args.customers * 10
+    technicians = args.technicians or max(5, args.customers // 200)
+
+    print("=" * 60)
+    print("LegendLift benchmark data generator")
+    print("=" * 60)
+    print(f"Database:    {engine.url.render_as_string(hide_password=True)}")
+    print(f"Customers:   {args.customers:,}")
+    print(f"Services:    {services:,}")
+    print(f"Technicians: {technicians:,}")
+    print(f"Seed:        {args.seed}")
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+        print("🗑️  Dropped existing tables")
+    Base.metadata.create_all(bind=engine)
+
+    started = time.time()
+    seeder = Seeder(args)
+    seeder.users(technicians)
+    seeder.customers(args.customers)
+    seeder.payments()
+    seeder.services(services)
+    seeder.jobs()
+
+    print(f"\n✅ Seeded {sum(seeder.counts.values()):,} rows in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cold start benchmark
+Starts the API with uvicorn in a fresh process several times and measures,
+from process start:
+- listening: first answer from /health
+- first request: first answered API call (admin customer list), i.e. what a
+  client hitting the server right after a restart waits for
+- ready: first 200 from /ready (pools and caches warm)
+
+--profile also prints an import-time profile of `import app.main`
+(python -X importtime), grouped by package, with the slowest app modules.
+
+Usage:
+    python benchmarks/seed_data.py --customers 10000 --reset
+    python benchmarks/startup_benchmark.py --profile
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from seed_data import DEFAULT_DATABASE_URL, BENCH_ADMIN_EMAIL  # noqa: E402
+
+FIRST_REQUEST_PATH = "/api/v1/customers/"
+POLL_INTERVAL_SECONDS = 0.005
+START_TIMEOUT_SECONDS = 60
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure API cold start")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=0, help="Port for the server (default: a free one)")
+    parser.add_argument("--profile", action="store_true", help="Also print an import-time profile")
+    parser.add_argument("--top", type=int, default=15, help="Rows in the import-time profile")
+    return parser.parse_args()
+
+
+def server_env(database_url):
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env.setdefault("SECRET_KEY", "benchmark-secret-key")
+    env.setdefault("FIRST_SUPERUSER_EMAIL", BENCH_ADMIN_EMAIL)
+    env.setdefault("FIRST_SUPERUSER_PASSWORD", "benchmark")
+    return env
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(client, url, headers=None, accept=(200,)):
+    """Poll url until it answers with an accepted status; returns perf_counter time or None"""
+    deadline = time.perf_counter() + START_TIMEOUT_SECONDS
+    while time.perf_counter() < deadline:
+        try:
+            response = client.get(url, headers=headers)
+            if response.status_code in accept:
+                return time.perf_counter()
+            if response.status_code == 404:
+                return None
+        except httpx.TransportError:
+            pass
+        time.sleep(POLL_INTERVAL_SECONDS)
+    raise RuntimeError(f"{url} did not answer within {START_TIMEOUT_SECONDS}s")
+
+
+def run_once(env, port, headers):
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        with httpx.Client(timeout=30) as client:
+            listening = wait_for(client, f"{base}/health")
+            first_request = wait_for(client, f"{base}{FIRST_REQUEST_PATH}?limit=20", headers=headers)
+            ready = wait_for(client, f"{base}/ready")
+    except RuntimeError:
+        process.kill()
+        print(process.stderr.read().decode(errors="replace")[-2000:])
+        raise
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    def elapsed(moment):
+        return round((moment - started) * 1000, 1) if moment is not None else None
+
+    return {"listening_ms": elapsed(listening), "first_request_ms": elapsed(first_request), "ready_ms": elapsed(ready)}
+
+
+def import_profile(env, top):
+    """Cumulative import time of app.main, by top-level package and by app module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    by_package = defaultdict(int)
+    app_modules = []
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        by_package[module.split(".")[0]] += int(self_us)
+        total += int(self_us)
+        if module.startswith("app."):
+            app_modules.append((int(cumulative_us), module))
+
+    print(f"\nImport profile of app.main: {total / 1000:.0f} ms total")
+    print(f"{'package':<34}{'ms':>8}{'share':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<34}{self_us / 1000:>8.1f}{self_us / total:>8.0%}")
+    print(f"\n{'app module (cumulative)':<34}{'ms':>8}")
+    for cumulative_us, module in sorted(app_modules, reverse=True)[:top]:
+        print(f"{module:<34}{cumulative_us / 1000:>8.1f}")
+
+
+def main():
+    args = parse_args()
+    env = server_env(args.database_url)
+    os.environ.update({key: env[key] for key in ("DATABASE_URL", "SECRET_KEY", "FIRST_SUPERUSER_EMAIL", "FIRST_SUPERUSER_PASSWORD")})
+    from app.core.security import create_access_token
+    headers = {"Authorization": f"Bearer {create_access_token(BENCH_ADMIN_EMAIL)}"}
+
+    print("=" * 60)
+    print("LegendLift cold start benchmark")
+    print("=" * 60)
+    print(f"\n{'run':<6}{'listening':>12}{'first request':>16}{'ready':>10}  (ms from process start)")
+    runs = []
+    for i in range(args.runs):
+        result = run_once(env, args.port or free_port(), headers)
+        runs.append(result)
+        ready = result["ready_ms"] if result["ready_ms"] is not None else "-"
+        print(f"{i + 1:<6}{result['listening_ms']:>12.1f}{result['first_request_ms']:>16.1f}{ready:>10}")
+
+    readies = [run["ready_ms"] for run in runs if run["ready_ms"] is not None]
+    print(f"{'median':<6}{statistics.median(run['listening_ms'] for run in runs):>12.1f}"
+          f"{statistics.median(run['first_request_ms'] for run in runs):>16.1f}"
+          f"{statistics.median(readies) if readies else '-':>10}")
+
+    if args.profile:
+        import_profile(env, args.top)
+
+
+if __name__ == "__main__":
+    main()
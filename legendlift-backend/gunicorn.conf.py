@@ -0,0 +1,54 @@
+"""
+gunicorn configuration for production (`python run.py --prod`)
+
+The app is imported once in the master and forked into the workers
+(preload), workers are recycled after SERVER_MAX_REQUESTS requests, and
+signals to the master give graceful restarts without dropping requests:
+    kill -HUP  <pid>   replace the workers with the code already loaded
+    kill -USR2 <pid>   start a new master (pid in gunicorn.pid.2) with new
+                       code next to the old one, then
+    kill -TERM <pid>   stop the old one once the new workers are up
+The master pid is written to gunicorn.pid
+"""
+import os
+from app.core.config import settings
+
+wsgi_app = "app.main:app"
+bind = f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+workers = settings.SERVER_WORKER_COUNT
+# Read by the preloaded app (settings.RUNNING_WORKER_COUNT), also when
+# gunicorn is started with this file directly
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "app.core.server.LegendLiftUvicornWorker"
+preload_app = True
+
+# Recycling: the jitter keeps the workers from restarting all at once
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+# Passed to uvicorn as timeout_keep_alive
+keepalive = settings.SERVER_KEEPALIVE_SECONDS
+timeout = settings.SERVER_TIMEOUT_SECONDS
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+
+pidfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.pid")
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
+proc_name = "legendlift-api"
+
+
+def when_ready(server):
+    # Preloaded master: import the lazy routers and configure the mappers once
+    # here, so the forked workers share them instead of each loading its own
+    from sqlalchemy.orm import configure_mappers
+    from app.main import api_routers
+    api_routers.load_all()
+    configure_mappers()
+
+
+def post_fork(server, worker):
+    # Connections pooled by the master before the fork must not be shared;
+    # each worker opens its own (close=False leaves the master's alone)
+    from app.db.session import engine
+    engine.dispose(close=False)
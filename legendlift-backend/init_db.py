@@ -1,9 +1,14 @@
 """
 Initialize database with admin user and sample data for testing
 """
+import os
 import sys
+from alembic import command
+from alembic.config import Config
+from app.db.schema_check import check_versioned
+from app.db.session import engine
 from sqlalchemy.orm import Session
-from app.db.session import engine, Base, get_db
+from app.db.session import get_db
 from app.models.user import User, UserRole
 from app.models.customer import Customer
 from app.models.service import ServiceSchedule, ServiceStatus
@@ -15,10 +20,11 @@ def init_database():
     """Initialize database with tables and sample data"""
     print("🚀 Initializing LegendLift Database...")
 
-    # Create all tables
-    print("📊 Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables created successfully!")
+    # Create or upgrade tables through the migration chain
+    print("📊 Applying database migrations (alembic upgrade head)...")
+    check_versioned(engine)
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), "head")
+    print("✅ Database schema is up to date!")
 
     # Get database session
     db = next(get_db())
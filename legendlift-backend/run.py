@@ -1,9 +1,20 @@
 """
-Run the FastAPI application with uvicorn
+Run the FastAPI application
+
+    python run.py          development: single uvicorn process with auto-reload
+    python run.py --prod   production: gunicorn with SERVER_WORKERS uvicorn
+                           workers, configured in gunicorn.conf.py
 """
+import argparse
+import os
+import shutil
+import sys
 import uvicorn
 
-if __name__ == "__main__":
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_dev():
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -11,3 +22,52 @@ if __name__ == "__main__":
         reload=True,
         log_level="info",
     )
+
+
+def run_prod():
+    from app.core.config import settings
+
+    # Tells the app how many workers share its in-process state (see
+    # settings.RUNNING_WORKER_COUNT); inherited by the workers
+    os.environ["WEB_CONCURRENCY"] = str(settings.SERVER_WORKER_COUNT)
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        # gunicorn does not run on Windows: plain uvicorn workers, without
+        # preload, recycling or graceful restarts
+        print("⚠️  gunicorn not available, starting uvicorn workers")
+        uvicorn.run(
+            "app.main:app",
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            workers=settings.SERVER_WORKER_COUNT,
+            loop=settings.SERVER_LOOP,
+            http=settings.SERVER_HTTP,
+            timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+            log_level="info",
+        )
+        return
+
+    # The gunicorn script, not `python -m gunicorn`: the master re-executes its
+    # own command line on USR2, and the `-m` form does not survive that
+    search_path = os.pathsep.join([os.path.dirname(sys.executable), os.environ.get("PATH", "")])
+    gunicorn_bin = shutil.which("gunicorn", path=search_path)
+    if not gunicorn_bin:
+        print("❌ gunicorn is installed but its script was not found on PATH "
+              "(looked next to the Python executable too); reinstall gunicorn")
+        sys.exit(1)
+    config = os.path.join(BASE_DIR, "gunicorn.conf.py")
+    os.chdir(BASE_DIR)
+    os.execv(gunicorn_bin, [gunicorn_bin, "--config", config])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the LegendLift API")
+    parser.add_argument("--prod", action="store_true", help="multi-worker production server")
+    args = parser.parse_args()
+
+    if args.prod:
+        run_prod()
+    else:
+        run_dev()
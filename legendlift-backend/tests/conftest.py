@@ -0,0 +1,263 @@
+"""
+Shared fixtures for the API tests
+Every test runs against a fresh SQLite database built from the models; the
+app is imported only after the environment below points it there
+"""
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="legendlift-tests-"), "test.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("FIRST_SUPERUSER_EMAIL", "admin@test.legendlift.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "not-used")
+# Query counts must not depend on what an earlier request left in the cache
+os.environ["CACHE_BACKEND"] = "none"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import app.models as models  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils.agenda import sync_service_agenda  # noqa: E402
+
+ADMIN_EMAIL = "admin@test.legendlift.com"
+TECHNICIAN_COUNT = 5
+
+
+def auth_headers(email: str) -> dict:
+    """Bearer header for a seeded user"""
+    return {"Authorization": f"Bearer {create_access_token(subject=email)}"}
+
+
+def technician_email(index: int) -> str:
+    return f"tech{index}@test.legendlift.com"
+
+
+def assert_constant_queries(count_queries, url, headers, **params):
+    """Query count of a small and a large page of url; both must match"""
+    small, small_rows = count_queries(url, headers, limit=3, **params)
+    large, large_rows = count_queries(url, headers, limit=30, **params)
+    assert len(small_rows) == 3
+    assert len(large_rows) > 3
+    assert small == large, f"{url}: {small} queries for 3 rows, {large} for {len(large_rows)}"
+
+
+class QueryCounter:
+    """Statements sent to the database while counting() is active"""
+
+    def __init__(self):
+        self.statements = []
+        self._active = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self._active:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @contextmanager
+    def counting(self):
+        self.statements = []
+        self._active = True
+        try:
+            yield self
+        finally:
+            self._active = False
+
+
+@pytest.fixture
+def db():
+    """Fresh schema per test and a session on it"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    return TestClient(app)
+
+
+@pytest.fixture
+def query_counter():
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def count_queries(client, query_counter):
+    """
+    count_queries(url, headers, **params) -> (queries, response JSON)
+    Requests the URL once to load its router lazily, then counts a second run
+    """
+    def run(url, headers, **params):
+        client.get(url, headers=headers, params=params)
+        with query_counter.counting():
+            response = client.get(url, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        return query_counter.count, response.json()
+
+    return run
+
+
+@pytest.fixture
+def seed(db):
+    """
+    Admin, technicians, customers and jobs of every kind
+    Returns the IDs; technician i logs in as technician_email(i)
+    """
+    admin = models.User(
+        id=str(uuid.uuid4()), name="Admin", email=ADMIN_EMAIL, phone="9000000000",
+        hashed_password="not-used", role=models.UserRole.ADMIN, active=True,
+    )
+    technicians = [
+        models.User(
+            id=str(uuid.uuid4()), name=f"Technician {i}", email=technician_email(i), phone=f"90000000{i:02d}",
+            hashed_password="not-used", role=models.UserRole.TECHNICIAN, active=True,
+        )
+        for i in range(TECHNICIAN_COUNT)
+    ]
+    db.add(admin)
+    db.add_all(technicians)
+
+    customers = [
+        models.Customer(
+            id=str(uuid.uuid4()), job_number=f"JOB-{i:03d}", name=f"Customer {i}", area=f"Area {i % 3}",
+            address="Main road", contact_person="Manager", phone="9100000000", route=i % 4 + 1,
+            latitude=12.9 + i * 0.01, longitude=77.5 + i * 0.01,
+            amc_valid_from=date.today() - timedelta(days=100), amc_valid_to=date.today() + timedelta(days=265),
+            services_per_year=12, amc_status=models.AMCStatus.ACTIVE,
+        )
+        for i in range(10)
+    ]
+    db.add_all(customers)
+    db.flush()
+
+    now = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0)
+    services = []
+    for i in range(60):
+        completed = i % 3 == 0
+        services.append(models.ServiceSchedule(
+            id=str(uuid.uuid4()), service_id=f"SRV-{i:03d}", customer_id=customers[i % len(customers)].id,
+            scheduled_date=now - timedelta(days=i % 10) if completed else now + timedelta(days=i % 10),
+            actual_date=now - timedelta(days=i % 10) if completed else None,
+            status=models.ServiceStatus.COMPLETED if completed else models.ServiceStatus.PENDING,
+            service_type=models.ServiceType.SERVICE,
+        ))
+    db.add_all(services)
+    db.flush()
+    for i, service in enumerate(services):
+        # Two or three technicians per job, rotating through the team
+        assign_technicians(db, service, [technicians[(i + k) % TECHNICIAN_COUNT] for k in range(i % 2 + 2)])
+        if service.status == models.ServiceStatus.COMPLETED:
+            db.add(models.ServiceReport(
+                id=str(uuid.uuid4()), report_id=f"RPT-{i:03d}", service_id=service.id,
+                technician_id=service.technician_id, check_in_time=service.actual_date,
+                check_out_time=service.actual_date + timedelta(hours=1), work_done="Serviced", rating=4,
+            ))
+
+    for i in range(40):
+        customer = customers[i % len(customers)]
+        tech_ids = [technicians[i % TECHNICIAN_COUNT].id, technicians[(i + 1) % TECHNICIAN_COUNT].id]
+        db.add(models.CallBack(
+            id=str(uuid.uuid4()), job_id=f"CB-{i:03d}", customer_id=customer.id, created_by_admin_id=admin.id,
+            scheduled_date=now, status=models.CallBackStatus.PENDING if i % 2 else models.CallBackStatus.IN_PROGRESS,
+            technicians=tech_ids,
+        ))
+        db.add(models.Repair(
+            id=str(uuid.uuid4()), customer_id=customer.id, created_by_admin_id=admin.id,
+            scheduled_date=now, status=models.RepairStatus.PENDING, technicians=tech_ids,
+        ))
+        db.add(models.Complaint(
+            id=str(uuid.uuid4()), complaint_id=f"CMP-{i:03d}", customer_id=customer.id, title="Lift noise",
+            description="Noise between floors", issue_type="noise", priority=models.ComplaintPriority.HIGH,
+            status=models.ComplaintStatus.OPEN, assigned_to_id=tech_ids[0],
+        ))
+        contract = models.AMCContract(
+            id=str(uuid.uuid4()), customer_id=customer.id, contract_type=models.ContractType.ACTIVE,
+            start_date=now, end_date=now + timedelta(days=365), service_frequency=models.ServiceFrequency.MONTHLY,
+            total_services=12, pending_services=12, amount=12000,
+        )
+        db.add(contract)
+        db.flush()
+        db.add(models.Payment(
+            id=str(uuid.uuid4()), customer_id=customer.id, contract_id=contract.id, amount=3000,
+            due_date=now, status=models.PaymentStatus.PENDING,
+        ))
+    db.commit()
+
+    return {
+        "admin": admin.id,
+        "technicians": [technician.id for technician in technicians],
+        "customers": [customer.id for customer in customers],
+        "services": [service.id for service in services],
+    }
+
+
+def assign_technicians(db, service, technicians) -> None:
+    """Assign technicians the way the API does (assignment rows, legacy columns, agenda)"""
+    for order, technician in enumerate(technicians):
+        db.add(models.ServiceTechnician(
+            id=str(uuid.uuid4()), service_id=service.id, technician_id=technician.id,
+            is_primary=order == 0, order=order,
+        ))
+    service.technician_id = technicians[0].id if technicians else None
+    service.technician2_id = technicians[1].id if len(technicians) > 1 else None
+    service.technician3_id = technicians[2].id if len(technicians) > 2 else None
+    sync_service_agenda(db, service)
+
+
+@pytest.fixture
+def add_today_services(db, seed):
+    """
+    add_today_services(count, technician_indexes) -> services
+    Open services due today for the seeded technicians
+    """
+    def add(count, technician_indexes=(0,)):
+        technicians = db.query(models.User).filter(
+            models.User.id.in_([seed["technicians"][i] for i in technician_indexes])
+        ).all()
+        technicians.sort(key=lambda technician: seed["technicians"].index(technician.id))
+        now = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        services = []
+        for i in range(count):
+            service = models.ServiceSchedule(
+                id=str(uuid.uuid4()), service_id=f"TODAY-{uuid.uuid4().hex[:8]}", customer_id=seed["customers"][0],
+                scheduled_date=now + timedelta(minutes=i), status=models.ServiceStatus.SCHEDULED,
+                service_type=models.ServiceType.SERVICE,
+            )
+            db.add(service)
+            db.flush()
+            assign_technicians(db, service, technicians)
+            services.append(service)
+        db.commit()
+        return services
+
+    return add
+
+
+@pytest.fixture
+def admin_headers(seed):
+    return auth_headers(ADMIN_EMAIL)
+
+
+@pytest.fixture
+def technician_headers(seed):
+    return auth_headers(technician_email(0))
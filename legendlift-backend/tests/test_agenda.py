@@ -0,0 +1,75 @@
+"""
+Every way of creating or assigning a service puts it on the technicians' boards
+"""
+import uuid
+from datetime import datetime
+
+import app.models as models
+from conftest import auth_headers, technician_email
+
+API = "/api/v1"
+
+
+def today_service_ids(client, technician_index):
+    response = client.get(f"{API}/technician/my-services/today", headers=auth_headers(technician_email(technician_index)))
+    assert response.status_code == 200, response.text
+    return {row["id"] for row in response.json()}
+
+
+def agenda_entries(db, service_id):
+    rows = db.query(models.TechnicianAgenda).filter(models.TechnicianAgenda.service_id == service_id).all()
+    return {(row.technician_id, row.is_primary, row.order) for row in rows}
+
+
+def test_admin_created_service(client, db, seed, admin_headers):
+    technicians = seed["technicians"]
+    response = client.post(f"{API}/services/schedules", headers=admin_headers, json={
+        "customer_id": seed["customers"][0], "scheduled_date": datetime.now().isoformat(),
+        "status": "scheduled", "technician_id": technicians[0], "technician2_id": technicians[1],
+    })
+    assert response.status_code == 201, response.text
+    service_id = response.json()["id"]
+
+    assert agenda_entries(db, service_id) == {(technicians[0], True, 0), (technicians[1], False, 1)}
+    assert service_id in today_service_ids(client, 0)
+    assert service_id in today_service_ids(client, 1)
+
+
+def test_admin_reassigns_service(client, db, seed, admin_headers):
+    technicians = seed["technicians"]
+    response = client.post(f"{API}/services/schedules", headers=admin_headers, json={
+        "customer_id": seed["customers"][0], "scheduled_date": datetime.now().isoformat(),
+        "status": "scheduled", "technician_id": technicians[0],
+    })
+    service_id = response.json()["id"]
+
+    response = client.put(f"{API}/services/schedules/{service_id}", headers=admin_headers, json={
+        "technician_id": technicians[3],
+    })
+    assert response.status_code == 200, response.text
+    assert service_id not in today_service_ids(client, 0)
+    assert service_id in today_service_ids(client, 3)
+
+
+def test_adhoc_registered_service(client, db, seed):
+    response = client.post(f"{API}/technician/register-service", headers=auth_headers(technician_email(2)), json={
+        "customer_id": seed["customers"][0], "service_type": "SERVICE",
+    })
+    assert response.status_code == 201, response.text
+    assert response.json()["id"] in today_service_ids(client, 2)
+
+
+def test_check_in_created_service(client, db, seed):
+    # A customer with no open service for the technician, so check-in creates one
+    customer = models.Customer(
+        id=str(uuid.uuid4()), job_number="JOB-NEW", name="New customer", area="Area 9",
+        address="Main road", contact_person="Manager", phone="9100000000", route=1,
+    )
+    db.add(customer)
+    db.commit()
+
+    response = client.post(f"{API}/technician/check-in", headers=auth_headers(technician_email(2)), json={
+        "customer_id": customer.id, "location": {}, "service_type": "SERVICE",
+    })
+    assert response.status_code == 201, response.text
+    assert response.json()["service_db_id"] in today_service_ids(client, 2)
@@ -0,0 +1,41 @@
+"""
+Cache backend selection
+"""
+import pytest
+
+from app.core.config import settings
+from app.utils import cache
+
+
+@pytest.mark.parametrize("web_concurrency, redis_url, expected", [
+    (None, None, "memory"),
+    ("1", None, "memory"),
+    ("4", None, "none"),
+    ("4", "redis://localhost:6379/0", "redis"),
+])
+def test_auto_backend(monkeypatch, web_concurrency, redis_url, expected):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "auto")
+    monkeypatch.setattr(settings, "CACHE_REDIS_URL", redis_url)
+    if web_concurrency is None:
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("WEB_CONCURRENCY", web_concurrency)
+    assert cache.backend_name() == expected
+
+
+def test_auto_backend_ignores_the_production_worker_setting(monkeypatch):
+    # SERVER_WORKERS sizes `run.py --prod`; the dev server is still one process
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "auto")
+    monkeypatch.setattr(settings, "CACHE_REDIS_URL", None)
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 16)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert cache.backend_name() == "memory"
+
+
+def test_memory_backend_with_several_workers_warns(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with caplog.at_level("WARNING", logger="legendlift.cache"):
+        backend = cache.create_backend()
+    assert isinstance(backend, cache.MemoryCacheBackend)
+    assert "4 workers" in caplog.text
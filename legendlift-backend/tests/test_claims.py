@@ -0,0 +1,160 @@
+"""
+Concurrent claims: exactly one technician wins a job, however many race for it
+Each claimer runs in its own thread with its own session, released together
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+import app.models as models
+from app.api.endpoints.repairs import join_repair
+from app.api.endpoints.technician_services import pick_ticket
+from app.db.session import SessionLocal
+from app.utils.claims import CLAIM_CONFLICT_DETAIL, claim_complaint
+
+CLAIMERS = 100
+
+
+def race(claim, technician_ids):
+    """Run claim(db, technician_id) for every ID at once; returns the results"""
+    barrier = threading.Barrier(len(technician_ids))
+
+    def run(technician_id):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            return claim(db, technician_id)
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=len(technician_ids)) as pool:
+        return list(pool.map(run, technician_ids))
+
+
+@pytest.fixture
+def claimers(db):
+    """CLAIMERS technicians and an open complaint, service and repair to fight over"""
+    technicians = [
+        models.User(
+            id=str(uuid.uuid4()), name=f"Claimer {i}", email=f"claimer{i}@test.legendlift.com", phone=f"8{i:09d}",
+            hashed_password="not-used", role=models.UserRole.TECHNICIAN, active=True,
+        )
+        for i in range(CLAIMERS)
+    ]
+    customer = models.Customer(
+        id=str(uuid.uuid4()), job_number="JOB-RACE", name="Race Towers", area="Centre", address="Main road",
+        contact_person="Manager", phone="9100000000", route=1,
+    )
+    complaint = models.Complaint(
+        id=str(uuid.uuid4()), complaint_id="CMP-RACE", customer_id=customer.id, title="Lift stuck",
+        description="Stuck at floor 3", issue_type="stuck", priority=models.ComplaintPriority.URGENT,
+        status=models.ComplaintStatus.OPEN,
+    )
+    service = models.ServiceSchedule(
+        id=str(uuid.uuid4()), service_id="SRV-RACE", customer_id=customer.id,
+        status=models.ServiceStatus.PENDING, service_type=models.ServiceType.SERVICE,
+    )
+    repair = models.Repair(
+        id=str(uuid.uuid4()), customer_id=customer.id, created_by_admin_id=technicians[0].id,
+        scheduled_date=datetime.now(), status=models.RepairStatus.PENDING, technicians=[],
+    )
+    db.add_all([*technicians, customer, complaint, service, repair])
+    db.commit()
+    return {
+        "technicians": [t.id for t in technicians], "complaint": complaint.id, "service": service.id,
+        "repair": repair.id,
+    }
+
+
+def test_claim_complaint_race(db, claimers):
+    def claim(session, technician_id):
+        won = claim_complaint(session, claimers["complaint"], technician_id)
+        session.commit()
+        return won
+
+    results = race(claim, claimers["technicians"])
+
+    assert results.count(True) == 1
+    winner = claimers["technicians"][results.index(True)]
+    complaint = db.get(models.Complaint, claimers["complaint"])
+    assert complaint.assigned_to_id == winner
+    assert complaint.status == models.ComplaintStatus.IN_PROGRESS
+
+
+def pick(service_id):
+    def claim(session, technician_id):
+        user = session.get(models.User, technician_id)
+        try:
+            pick_ticket(service_id, db=session, current_user=user)
+            return 200
+        except HTTPException as exc:
+            if exc.status_code == 409:
+                assert exc.detail == CLAIM_CONFLICT_DETAIL
+            return exc.status_code
+
+    return claim
+
+
+def assignment_rows(db, service_id):
+    return db.query(models.ServiceTechnician).filter(models.ServiceTechnician.service_id == service_id).all()
+
+
+def test_pick_ticket_same_technician_race(db, claimers):
+    # A double-tapped pick from one technician sent CLAIMERS times at once
+    technician_id = claimers["technicians"][0]
+    results = race(pick(claimers["service"]), [technician_id] * CLAIMERS)
+
+    assert results.count(200) == 1
+    assert set(results) <= {200, 400, 409}
+    rows = assignment_rows(db, claimers["service"])
+    assert [row.technician_id for row in rows] == [technician_id]
+
+
+def test_pick_ticket_race(db, claimers):
+    results = race(pick(claimers["service"]), claimers["technicians"])
+
+    assert set(results) <= {200, 400, 409}
+    winners = [technician_id for technician_id, result in zip(claimers["technicians"], results) if result == 200]
+    rows = assignment_rows(db, claimers["service"])
+    assert 1 <= len(winners) <= 3
+    assert sorted(row.technician_id for row in rows) == sorted(winners)
+    assert sorted(row.order for row in rows) == list(range(len(rows)))
+    assert sum(row.is_primary for row in rows) == 1
+
+
+def test_join_repair_race(db, claimers):
+    def claim(session, technician_id):
+        try:
+            join_repair(claimers["repair"], db=session, current_user=session.get(models.User, technician_id))
+            return 200
+        except HTTPException as exc:
+            return exc.status_code
+
+    results = race(claim, claimers["technicians"])
+
+    assert set(results) <= {200, 409}
+    winners = [technician_id for technician_id, result in zip(claimers["technicians"], results) if result == 200]
+    repair = db.get(models.Repair, claimers["repair"])
+    assert winners and sorted(repair.technicians) == sorted(winners)
+    assert repair.version == len(winners)
+
+
+def test_edits_outside_claims_skip_the_version_check(client, db, claimers):
+    # An admin edit of a repair read before a technician joined it still saves
+    repair = db.get(models.Repair, claimers["repair"])
+    technician = db.get(models.User, claimers["technicians"][1])
+    with SessionLocal() as session:
+        join_repair(claimers["repair"], db=session, current_user=session.get(models.User, technician.id))
+
+    repair.notes = "Bring the long ladder"
+    db.commit()
+
+    db.expire_all()
+    repair = db.get(models.Repair, claimers["repair"])
+    assert repair.notes == "Bring the long ladder"
+    assert repair.technicians == [technician.id]
+    assert repair.version == 1
@@ -0,0 +1,45 @@
+"""
+Customer sheet uploads: unreadable files are the uploader's problem, bugs are not
+"""
+import io
+import zipfile
+
+import pytest
+
+from app.api.endpoints import customers
+
+API = "/api/v1"
+
+CSV_SHEET = "Job No,Site Name,Area,Route\nJOB-900,Lake View,North,2\n"
+
+
+def upload(client, headers, filename, content):
+    return client.post(
+        f"{API}/customers/bulk-import", headers=headers, params={"dry_run": True},
+        files={"file": (filename, content)},
+    )
+
+
+def test_zip_without_a_workbook_is_a_bad_upload(client, admin_headers):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("notes.txt", "not a workbook")
+
+    response = upload(client, admin_headers, "customers.xlsx", archive.getvalue())
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Could not read the uploaded file"
+
+
+def test_csv_is_imported(client, admin_headers):
+    response = upload(client, admin_headers, "customers.csv", CSV_SHEET.encode())
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 1
+
+
+def test_errors_outside_the_reader_are_not_reported_as_bad_uploads(client, admin_headers, monkeypatch):
+    def broken_mapper(raw):
+        return raw["missing"]
+
+    monkeypatch.setattr(customers, "build_customer_fields", broken_mapper)
+    with pytest.raises(KeyError):
+        upload(client, admin_headers, "customers.csv", CSV_SHEET.encode())
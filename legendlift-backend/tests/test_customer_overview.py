@@ -0,0 +1,29 @@
+"""
+The customer overview accounts for every open service the listing shows
+"""
+from conftest import auth_headers, technician_email
+
+API = "/api/v1"
+
+
+def test_overview_counts_services_without_a_scheduled_date(client, seed, admin_headers):
+    customer_id = seed["customers"][0]
+    # Ad-hoc services are registered without a scheduled date
+    response = client.post(f"{API}/technician/register-service", headers=auth_headers(technician_email(0)), json={
+        "customer_id": customer_id, "service_type": "SERVICE",
+    })
+    assert response.status_code == 201, response.text
+    adhoc_id = response.json()["id"]
+
+    response = client.get(f"{API}/services/schedules", headers=admin_headers, params={"customer_id": customer_id})
+    assert response.status_code == 200, response.text
+    open_ids = {row["id"] for row in response.json() if row["status"] != "completed"}
+
+    response = client.get(f"{API}/customers/{customer_id}/overview", headers=admin_headers, params={"include": "services"})
+    assert response.status_code == 200, response.text
+    overview = response.json()
+    summary = overview["summary"]
+
+    assert [row["id"] for row in overview["services"]["unscheduled"]] == [adhoc_id]
+    assert summary["services_overdue"] + summary["services_upcoming"] + summary["services_unscheduled"] == len(open_ids)
+    assert {row["id"] for rows in overview["services"].values() for row in rows} == open_ids
@@ -0,0 +1,47 @@
+"""
+Job and payment listings run a fixed number of queries however many rows
+they return (customer and technician names are loaded in one batch)
+"""
+import uuid
+
+import app.models as models
+from conftest import assert_constant_queries
+
+API = "/api/v1"
+
+
+def test_payments(count_queries, admin_headers):
+    assert_constant_queries(count_queries, f"{API}/payments/", admin_headers)
+
+
+def test_repairs(count_queries, admin_headers):
+    assert_constant_queries(count_queries, f"{API}/repairs/", admin_headers)
+
+
+def test_my_repairs(count_queries, technician_headers):
+    assert_constant_queries(count_queries, f"{API}/repairs/technician/my-repairs", technician_headers)
+
+
+def test_complaints(count_queries, admin_headers):
+    assert_constant_queries(count_queries, f"{API}/complaints/", admin_headers)
+
+
+def test_my_callbacks(count_queries, technician_headers):
+    assert_constant_queries(count_queries, f"{API}/callbacks/technician/my-callbacks", technician_headers)
+
+
+def test_my_complaint_callbacks(count_queries, db, seed, technician_headers):
+    # Not paginated: compare the seeded list with one 27 complaints longer
+    url = f"{API}/complaints/my-callbacks"
+    small, small_rows = count_queries(url, technician_headers)
+    for i in range(27):
+        db.add(models.Complaint(
+            id=str(uuid.uuid4()), complaint_id=f"CMP-EXTRA-{i:03d}", customer_id=seed["customers"][i % 10],
+            title="Door fault", description="Door reopens", issue_type="door_issue",
+            priority=models.ComplaintPriority.MEDIUM, status=models.ComplaintStatus.IN_PROGRESS,
+            assigned_to_id=seed["technicians"][0],
+        ))
+    db.commit()
+    large, large_rows = count_queries(url, technician_headers)
+    assert len(large_rows) - len(small_rows) == 27
+    assert small == large
@@ -0,0 +1,64 @@
+"""
+Callback location pings and ETAs across workers
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.models as models
+from app.api.endpoints import callbacks
+from app.utils.location_tracking import LocationTracker
+from conftest import auth_headers, technician_email
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    """This worker's in-memory positions, empty for each test"""
+    tracker = LocationTracker()
+    monkeypatch.setattr(callbacks, "location_tracker", tracker)
+    return tracker
+
+
+@pytest.fixture
+def callback(db, seed):
+    """A callback assigned to technicians 0 and 1"""
+    technicians = seed["technicians"][:2]
+    return next(
+        callback for callback in db.query(models.CallBack).all() if callback.technicians == technicians
+    )
+
+
+def ping(client, callback_id, technician_index, latitude=12.95, longitude=77.55):
+    return client.post(
+        f"{API}/callbacks/{callback_id}/locations",
+        headers=auth_headers(technician_email(technician_index)),
+        json={"samples": [{"latitude": latitude, "longitude": longitude, "speed": 8.0}]},
+    )
+
+
+def test_unassigned_technician_cannot_ping(client, tracker, callback):
+    response = ping(client, callback.id, 2)
+    assert response.status_code == 403, response.text
+    assert tracker.latest_positions() == []
+
+    assert ping(client, callback.id, 0).status_code == 202
+    assert [position["technician_id"] for position in tracker.latest_positions()] == [callback.technicians[0]]
+
+
+def test_eta_merges_positions_held_by_other_workers(client, db, seed, tracker, callback, admin_headers):
+    # Technician 0 pinged this worker; technician 1's pings went to another
+    # worker and only reached the table
+    assert ping(client, callback.id, 0).status_code == 202
+    db.add(models.TechnicianLocation(
+        id=str(uuid.uuid4()), recorded_at=datetime.utcnow() - timedelta(minutes=1),
+        technician_id=seed["technicians"][1], callback_id=callback.id,
+        latitude=12.97, longitude=77.57, speed=10.0,
+    ))
+    db.commit()
+
+    response = client.get(f"{API}/callbacks/{callback.id}/eta", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert {eta["technician_id"] for eta in response.json()["etas"]} == set(seed["technicians"][:2])
@@ -0,0 +1,80 @@
+"""
+Material ledger rows follow job closure and reopening
+"""
+import uuid
+from datetime import datetime
+
+import app.models as models
+
+API = "/api/v1"
+
+
+def ledger_rows(db, callback_id=None, repair_id=None, service_id=None):
+    db.expire_all()
+    query = db.query(models.MaterialUsage)
+    if callback_id:
+        query = query.filter(models.MaterialUsage.callback_id == callback_id)
+    if repair_id:
+        query = query.filter(models.MaterialUsage.repair_id == repair_id)
+    if service_id:
+        query = query.filter(models.MaterialUsage.service_id == service_id)
+    return query.all()
+
+
+def close_callback(client, callback, headers):
+    result = {
+        "issue_faced": "Door sensor fault",
+        "customer_reporting_person": "Manager",
+        "problem_solved": "Sensor replaced",
+        "lift_status_on_closure": "RUNNING_WITH_ERROR",
+        "materials_changed": [{"name": "Door sensor", "quantity": 1, "cost": 1200}],
+    }
+    response = client.post(f"{API}/callbacks/{callback.id}/mark-result", headers=headers, json=result)
+    assert response.status_code == 200, response.text
+
+
+def test_reopened_callback_drops_its_ledger_rows(client, db, seed, technician_headers, admin_headers):
+    callback = db.query(models.CallBack).filter(models.CallBack.status == models.CallBackStatus.IN_PROGRESS).first()
+    close_callback(client, callback, technician_headers)
+    assert [row.material_name for row in ledger_rows(db, callback.id)] == ["Door sensor"]
+
+    response = client.post(f"{API}/callbacks/{callback.id}/reopen", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert ledger_rows(db, callback.id) == []
+
+
+def test_callback_updated_out_of_completed_drops_its_ledger_rows(client, db, seed, technician_headers, admin_headers):
+    callback = db.query(models.CallBack).filter(models.CallBack.status == models.CallBackStatus.IN_PROGRESS).first()
+    close_callback(client, callback, technician_headers)
+
+    response = client.put(f"{API}/callbacks/{callback.id}", headers=admin_headers, json={"status": "IN_PROGRESS"})
+    assert response.status_code == 200, response.text
+    assert ledger_rows(db, callback_id=callback.id) == []
+
+
+def test_repair_updated_out_of_completed_drops_its_ledger_rows(client, db, seed, admin_headers):
+    repair = db.query(models.Repair).first()
+    response = client.put(f"{API}/repairs/{repair.id}", headers=admin_headers, json={
+        "status": "COMPLETED", "materials_used": [{"name": "Rope", "quantity": 2, "cost": 500}],
+    })
+    assert response.status_code == 200, response.text
+    assert [row.material_name for row in ledger_rows(db, repair_id=repair.id)] == ["Rope"]
+
+    response = client.put(f"{API}/repairs/{repair.id}", headers=admin_headers, json={"status": "IN_PROGRESS"})
+    assert response.status_code == 200, response.text
+    assert ledger_rows(db, repair_id=repair.id) == []
+
+
+def test_service_updated_out_of_completed_drops_its_ledger_rows(client, db, seed, admin_headers):
+    service = db.query(models.ServiceSchedule).filter(
+        models.ServiceSchedule.status == models.ServiceStatus.COMPLETED
+    ).first()
+    db.add(models.MaterialUsage(
+        id=str(uuid.uuid4()), service_id=service.id, customer_id=service.customer_id,
+        material_name="Oil", quantity=1, total_cost=150, used_date=datetime.now(),
+    ))
+    db.commit()
+
+    response = client.put(f"{API}/services/schedules/{service.id}", headers=admin_headers, json={"status": "in_progress"})
+    assert response.status_code == 200, response.text
+    assert ledger_rows(db, service_id=service.id) == []
@@ -0,0 +1,35 @@
+"""
+Lazy routers are imported off the event loop
+"""
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers import install_lazy_routers
+
+
+def test_routers_load_in_the_threadpool(monkeypatch):
+    app = FastAPI()
+    routers = install_lazy_routers(app, "/api/v1")
+    load_threads = []
+    load_prefix = routers._load_prefix
+
+    def recording_load_prefix(prefix):
+        load_threads.append(threading.get_ident())
+        load_prefix(prefix)
+
+    monkeypatch.setattr(routers, "_load_prefix", recording_load_prefix)
+
+    @app.get("/loop-thread")
+    async def loop_thread():
+        return threading.get_ident()
+
+    # One portal for both requests, so the event loop stays on one live thread
+    with TestClient(app) as client:
+        event_loop_thread = client.get("/loop-thread").json()
+
+        # Loaded on first use: the route exists and asks for credentials
+        assert client.get("/api/v1/sync").status_code == 401
+    assert load_threads and event_loop_thread not in load_threads
+    assert routers.unloaded_prefixes("/api/v1/sync") == []
@@ -0,0 +1,52 @@
+"""
+Service listings run a fixed number of queries however many rows they return
+"""
+from conftest import assert_constant_queries, auth_headers, technician_email
+
+API = "/api/v1"
+
+
+def test_schedules_admin(count_queries, admin_headers):
+    assert_constant_queries(count_queries, f"{API}/services/schedules", admin_headers)
+
+
+def test_schedules_technician(count_queries, technician_headers):
+    assert_constant_queries(count_queries, f"{API}/services/schedules", technician_headers)
+
+
+def test_service_history(count_queries, technician_headers):
+    assert_constant_queries(count_queries, f"{API}/technician/service-history", technician_headers)
+
+
+def test_available_tickets(count_queries, seed):
+    # Technician 3 holds a share of the seeded jobs, so the rest are available
+    assert_constant_queries(count_queries, f"{API}/technician/available-tickets", auth_headers(technician_email(3)))
+
+
+def assert_constant_as_rows_grow(count_queries, add_today_services, url, headers):
+    """Query count of url before and after 27 more of today's services appear"""
+    add_today_services(3, technician_indexes=(0, 1))
+    small, small_rows = count_queries(url, headers)
+    add_today_services(27, technician_indexes=(0, 2, 4))
+    large, large_rows = count_queries(url, headers)
+    assert len(large_rows) - len(small_rows) == 27
+    assert small == large, f"{url}: {small} queries for {len(small_rows)} rows, {large} for {len(large_rows)}"
+
+
+def test_schedules_today(count_queries, add_today_services, technician_headers):
+    assert_constant_as_rows_grow(count_queries, add_today_services, f"{API}/services/schedules/today", technician_headers)
+
+
+def test_my_services_today(count_queries, add_today_services, technician_headers):
+    assert_constant_as_rows_grow(
+        count_queries, add_today_services, f"{API}/technician/my-services/today", technician_headers
+    )
+
+
+def test_schedule_detail(count_queries, add_today_services, admin_headers):
+    single, = add_today_services(1, technician_indexes=(0,))
+    crew, = add_today_services(1, technician_indexes=(0, 1, 2))
+    single_queries, single_row = count_queries(f"{API}/services/schedules/{single.id}", admin_headers)
+    crew_queries, crew_row = count_queries(f"{API}/services/schedules/{crew.id}", admin_headers)
+    assert single_row["id"] == single.id and crew_row["id"] == crew.id
+    assert single_queries == crew_queries
@@ -0,0 +1,77 @@
+"""
+Delta sync: deletions and lost visibility reach the right clients
+"""
+import uuid
+
+import app.models as models
+from conftest import auth_headers, technician_email
+
+API = "/api/v1"
+
+
+def sync(client, headers, since=None):
+    params = {"since": since} if since else {}
+    response = client.get(f"{API}/sync", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_unpicked_technician_gets_a_revocation(client, db, add_today_services, seed):
+    service, = add_today_services(1, technician_indexes=(0, 1))
+    leaving, staying = auth_headers(technician_email(0)), auth_headers(technician_email(1))
+    assert service.id in {row["id"] for row in sync(client, leaving)["changes"]["services"]}
+
+    response = client.delete(f"{API}/technician/unpick-ticket/{service.id}", headers=leaving)
+    assert response.status_code == 200, response.text
+
+    assert service.id in sync(client, leaving)["deleted"]["services"]
+    assert service.id not in sync(client, staying)["deleted"]["services"]
+    assert service.id not in {row["id"] for row in sync(client, leaving)["changes"]["services"]}
+
+
+def test_picking_again_drops_the_revocation(client, db, add_today_services, seed):
+    service, = add_today_services(1, technician_indexes=(0,))
+    technician = auth_headers(technician_email(0))
+    assert client.delete(f"{API}/technician/unpick-ticket/{service.id}", headers=technician).status_code == 200
+    assert service.id in sync(client, technician)["deleted"]["services"]
+
+    assert client.post(f"{API}/technician/pick-ticket/{service.id}", headers=technician).status_code == 200
+
+    payload = sync(client, technician)
+    assert service.id not in payload["deleted"]["services"]
+    assert service.id in {row["id"] for row in payload["changes"]["services"]}
+
+
+def test_bulk_delete_writes_tombstones(client, db, seed, admin_headers):
+    callback_ids = [callback.id for callback in db.query(models.CallBack).limit(3)]
+    db.query(models.CallBack).filter(models.CallBack.id.in_(callback_ids)).delete(synchronize_session=False)
+    db.commit()
+
+    assert sorted(sync(client, admin_headers)["deleted"]["callbacks"]) == sorted(callback_ids)
+
+
+def test_customer_account_syncs_what_the_complaint_listing_shows(client, db, seed):
+    # Two accounts of the same company; only the other one filed complaints
+    accounts = [
+        models.User(
+            id=str(uuid.uuid4()), name=f"Customer user {i}", email=f"customer{i}@test.legendlift.com",
+            phone="9200000000", hashed_password="not-used", role=models.UserRole.CUSTOMER, active=True,
+            customer_id=seed["customers"][0],
+        )
+        for i in range(2)
+    ]
+    db.add_all(accounts)
+    db.flush()
+    db.query(models.Complaint).filter(models.Complaint.customer_id == seed["customers"][0]).update(
+        {models.Complaint.user_id: accounts[1].id}, synchronize_session=False
+    )
+    db.commit()
+    headers = auth_headers(accounts[0].email)
+
+    response = client.get(f"{API}/complaints/", headers=headers)
+    assert response.status_code == 200, response.text
+    listed = {row["id"] for row in response.json()}
+    assert listed
+
+    payload = sync(client, headers)
+    assert {row["id"] for row in payload["changes"]["complaints"]} == listed
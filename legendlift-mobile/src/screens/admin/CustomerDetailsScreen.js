@@ -20,15 +20,17 @@ const CustomerDetailsScreen = ({ route, navigation }) => {
   const [loading, setLoading] = useState(true);
   const [customer, setCustomer] = useState(null);
   const [services, setServices] = useState([]);
+  const [serviceCount, setServiceCount] = useState(0);
 
   useEffect(() => {
-    fetchCustomerDetails();
-    fetchCustomerServices();
+    fetchCustomerOverview();
   }, [customerId]);
 
-  const fetchCustomerDetails = async () => {
+  // Customer and its open services in one request; the lists are capped,
+  // the summary has the full counts
+  const fetchCustomerOverview = async () => {
     try {
-      const response = await fetch(`${API_CONFIG.BASE_URL}/customers/${customerId}`, {
+      const response = await fetch(`${API_CONFIG.BASE_URL}/customers/${customerId}/overview?include=services`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
@@ -37,33 +39,19 @@ const CustomerDetailsScreen = ({ route, navigation }) => {
 
       if (response.ok) {
         const data = await response.json();
-        setCustomer(data);
+        setCustomer(data.customer);
+        setServices([...data.services.overdue, ...data.services.upcoming, ...data.services.unscheduled]);
+        setServiceCount(
+          data.summary.services_overdue + data.summary.services_upcoming + data.summary.services_unscheduled
+        );
       }
     } catch (error) {
-      console.error('Error fetching customer details:', error);
+      console.error('Error fetching customer overview:', error);
     } finally {
       setLoading(false);
     }
   };
 
-  const fetchCustomerServices = async () => {
-    try {
-      const response = await fetch(`${API_CONFIG.BASE_URL}/services/schedules?customer_id=${customerId}`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json',
-        },
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        setServices(data);
-      }
-    } catch (error) {
-      console.error('Error fetching services:', error);
-    }
-  };
-
   const getStatusColor = (status) => {
     if (status === 'ACTIVE') return theme.colors.success;
     return theme.colors.error;
@@ -239,14 +227,16 @@ const CustomerDetailsScreen = ({ route, navigation }) => {
           <Card style={styles.section}>
             <View style={styles.sectionHeader}>
               <Icon name="clipboard-list" size={24} color={theme.colors.primary} />
-              <Text style={styles.sectionTitle}>Scheduled Services ({services.length})</Text>
+              <Text style={styles.sectionTitle}>Scheduled Services ({serviceCount})</Text>
             </View>
 
             {services.slice(0, 5).map((service, index) => (
               <View key={service.id} style={styles.serviceItem}>
                 <View style={styles.serviceLeft}>
                   <Text style={styles.serviceName}>{service.service_id}</Text>
-                  <Text style={styles.serviceDate}>{formatDate(service.scheduled_date)}</Text>
+                  <Text style={styles.serviceDate}>
+                    {service.scheduled_date ? formatDate(service.scheduled_date) : 'Unscheduled'}
+                  </Text>
                 </View>
                 <View style={[
                   styles.serviceStatus,
@@ -268,9 +258,9 @@ const CustomerDetailsScreen = ({ route, navigation }) => {
               </View>
             ))}
 
-            {services.length > 5 && (
+            {serviceCount > 5 && (
               <TouchableOpacity style={styles.viewAllButton}>
-                <Text style={styles.viewAllText}>View All Services ({services.length})</Text>
+                <Text style={styles.viewAllText}>View All Services ({serviceCount})</Text>
                 <Icon name="chevron-right" size={16} color={theme.colors.primary} />
               </TouchableOpacity>
             )}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   View,
   Text,
@@ -26,6 +26,8 @@ const ServiceCheckInScreen = ({ route, navigation }) => {
   const [customers, setCustomers] = useState([]);
   const [selectedCustomer, setSelectedCustomer] = useState(customer || null);
   const [searchQuery, setSearchQuery] = useState('');
+  // Reused across retries of the same check-in so the server never creates duplicates
+  const idempotencyKey = useRef(null);
 
   useEffect(() => {
     getLocation();
@@ -34,6 +36,11 @@ const ServiceCheckInScreen = ({ route, navigation }) => {
     }
   }, []);
 
+  useEffect(() => {
+    // A different customer is a new check-in, not a retry
+    idempotencyKey.current = null;
+  }, [selectedCustomer?.id]);
+
   const getLocation = async () => {
     try {
       let { status } = await Location.requestForegroundPermissionsAsync();
@@ -76,6 +83,10 @@ const ServiceCheckInScreen = ({ route, navigation }) => {
 
     setLoading(true);
 
+    if (!idempotencyKey.current) {
+      idempotencyKey.current = `${user?.id || 'tech'}-${Date.now()}-${Math.random().toString(36).slice(2, 10)}`;
+    }
+
     try {
       const response = await axios.post(
         `${API_CONFIG.BASE_URL}/technician/check-in`,
@@ -86,9 +97,13 @@ const ServiceCheckInScreen = ({ route, navigation }) => {
           service_type: serviceType,
         },
         {
-          headers: { Authorization: `Bearer ${token}` },
+          headers: {
+            Authorization: `Bearer ${token}`,
+            'Idempotency-Key': idempotencyKey.current,
+          },
         }
       );
+      idempotencyKey.current = null;
 
       Alert.alert(
         'Success',
@@ -0,0 +1,98 @@
+"""
+Streaming NDJSON backup format shared by export_sqlite_data.py and import_data_orm.py
+
+File layout ({table}.ndjson or {table}.ndjson.gz):
+  line 1: {"__schema__": {"format_version": 1, "table": ..., "columns": [{"name", "type"}], ...}}
+  line 2+: one JSON object per row
+
+Rows are written and read one at a time, so memory use does not grow with table size.
+"""
+import gzip
+import json
+import os
+from itertools import islice
+
+FORMAT_VERSION = 1
+SCHEMA_KEY = "__schema__"
+
+
+def backup_path(backup_dir, table_name):
+    """Find the backup file for a table (gzip'd NDJSON, NDJSON, or legacy JSON)"""
+    for suffix in (".ndjson.gz", ".ndjson", ".json"):
+        path = os.path.join(backup_dir, f"{table_name}{suffix}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def open_backup(path, mode="rt"):
+    """Open a backup file, transparently handling gzip"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_schema(f, table_name, columns, **extra):
+    """Write the schema header line; columns is a list of (name, declared type)"""
+    schema = {
+        "format_version": FORMAT_VERSION,
+        "table": table_name,
+        "columns": [{"name": name, "type": column_type} for name, column_type in columns],
+    }
+    schema.update(extra)
+    f.write(json.dumps({SCHEMA_KEY: schema}) + "\n")
+
+
+def write_row(f, row):
+    """Write one row as a JSON line"""
+    f.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+
+
+def read_backup(path):
+    """
+    Open a backup and return (schema, rows)
+    rows is a generator that yields one dict per row and closes the file when exhausted
+    Legacy whole-table .json files are still accepted (loaded in one go, schema is None)
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return None, iter(data)
+
+    f = open_backup(path)
+    first_line = f.readline()
+    schema = None
+    pending = None
+    if first_line.strip():
+        first = json.loads(first_line)
+        if SCHEMA_KEY in first:
+            schema = first[SCHEMA_KEY]
+            if schema.get("format_version", FORMAT_VERSION) > FORMAT_VERSION:
+                f.close()
+                raise ValueError(f"{path}: unsupported backup format version {schema['format_version']}")
+        else:
+            pending = first
+
+    def rows():
+        with f:
+            if pending is not None:
+                yield pending
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    return schema, rows()
+
+
+def iter_batches(rows, batch_size, skip=0):
+    """
+    Yield lists of at most batch_size rows
+    skip drops rows already imported by a previous run (resume)
+    """
+    if skip:
+        rows = islice(rows, skip, None)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
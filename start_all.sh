@@ -15,6 +15,16 @@ NC='\033[0m' # No Color
 cd /home/minnal/source/LegendLift
 
 echo -e "${BLUE}Step 1: Cleaning up existing processes...${NC}"
+PIDFILE=/home/minnal/source/LegendLift/legendlift-backend/gunicorn.pid
+if [ -f "$PIDFILE" ]; then
+    # Graceful stop: workers finish in-flight requests
+    MASTER_PID=$(cat "$PIDFILE")
+    kill -TERM "$MASTER_PID" 2>/dev/null
+    for i in $(seq 1 35); do
+        kill -0 "$MASTER_PID" 2>/dev/null || break
+        sleep 1
+    done
+fi
 pkill -f "uvicorn" 2>/dev/null
 pkill -f "localtunnel" 2>/dev/null
 pkill -f "npx lt" 2>/dev/null
@@ -24,7 +34,10 @@ echo ""
 
 echo -e "${BLUE}Step 2: Starting Backend Server (Port 9000)...${NC}"
 cd /home/minnal/source/LegendLift/legendlift-backend
-nohup python run.py > backend.log 2>&1 &
+# Stops on a database built before Alembic instead of re-creating its tables
+python -m app.db.schema_check || exit 1
+alembic upgrade head || exit 1
+nohup python run.py --prod > backend.log 2>&1 &
 BACKEND_PID=$!
 sleep 3
 
@@ -77,10 +90,13 @@ echo "   Admin:      admin@legendlift.com / admin123"
 echo "   Technician: john@legendlift.com / tech123"
 echo ""
 echo "📋 Process IDs:"
-echo "   Backend PID: $(pgrep -f 'uvicorn.*app.main')"
+echo "   Backend PID: $(cat "$PIDFILE" 2>/dev/null)"
 echo "   Tunnel PID:  $(pgrep -f 'localtunnel')"
 echo ""
 echo "🛑 To stop all services:"
-echo "   pkill -f uvicorn && pkill -f localtunnel"
+echo "   kill -TERM \$(cat $PIDFILE) && pkill -f localtunnel"
+echo ""
+echo "🔄 To restart the backend workers without downtime:"
+echo "   kill -HUP \$(cat $PIDFILE)"
 echo ""
 echo "=========================================="
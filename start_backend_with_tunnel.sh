@@ -15,6 +15,16 @@ cd /home/minnal/source/LegendLift/legendlift-backend
 
 # Step 1: Stop existing services
 echo -e "${BLUE}Step 1: Stopping existing services...${NC}"
+PIDFILE=/home/minnal/source/LegendLift/legendlift-backend/gunicorn.pid
+if [ -f "$PIDFILE" ]; then
+    # Graceful stop: workers finish in-flight requests
+    MASTER_PID=$(cat "$PIDFILE")
+    kill -TERM "$MASTER_PID" 2>/dev/null
+    for i in $(seq 1 35); do
+        kill -0 "$MASTER_PID" 2>/dev/null || break
+        sleep 1
+    done
+fi
 pkill -f "uvicorn" 2>/dev/null
 pkill -f "localtunnel" 2>/dev/null
 sleep 2
@@ -23,7 +33,10 @@ echo ""
 
 # Step 2: Start backend
 echo -e "${BLUE}Step 2: Starting backend on port 9000...${NC}"
-nohup python run.py > backend.log 2>&1 &
+# Stops on a database built before Alembic instead of re-creating its tables
+python -m app.db.schema_check || exit 1
+alembic upgrade head || exit 1
+nohup python run.py --prod > backend.log 2>&1 &
 sleep 4
 
 if curl -s http://localhost:9000/health > /dev/null 2>&1; then
@@ -92,7 +105,10 @@ echo "🔐 Login:"
 echo "   Admin: admin@legendlift.com / admin123"
 echo ""
 echo "🛑 To stop:"
-echo "   pkill -f uvicorn && pkill -f localtunnel"
+echo "   kill -TERM \$(cat $PIDFILE) && pkill -f localtunnel"
+echo ""
+echo "🔄 To restart the backend workers without downtime:"
+echo "   kill -HUP \$(cat $PIDFILE)"
 echo ""
 echo "=========================================="
 